@@ -25,6 +25,21 @@ until PGPASSWORD=$DB_PASSWORD psql -h "$DB_HOST" -U "$DB_USER" -d "$DB_NAME" -c
 done
 echo "✅ PostgreSQL conectado exitosamente"
 
+# Con DB_POOL=pgbouncer las conexiones de Django pasan por PgBouncer
+if [ "$DB_POOL" = "pgbouncer" ]; then
+  echo "⏳ Esperando PgBouncer en ${PGBOUNCER_HOST:-pgbouncer}:${PGBOUNCER_PORT:-6432}..."
+  RETRY_COUNT=0
+  until PGPASSWORD=$DB_PASSWORD psql -h "${PGBOUNCER_HOST:-pgbouncer}" -p "${PGBOUNCER_PORT:-6432}" -U "$DB_USER" -d "$DB_NAME" -c '\q' 2>/dev/null; do
+    RETRY_COUNT=$((RETRY_COUNT + 1))
+    if [ $RETRY_COUNT -ge $MAX_RETRIES ]; then
+      echo "❌ ERROR: PgBouncer no disponible. ¿Se levantó con --profile pgbouncer?"
+      exit 1
+    fi
+    sleep 2
+  done
+  echo "✅ PgBouncer conectado exitosamente"
+fi
+
 # Ejecutar migraciones con verificación completa
 echo "🔧 Ejecutando migraciones de base de datos..."
 
@@ -65,6 +80,10 @@ MIGRATE_CHECK
 python manage.py migrate --noinput
 echo "✅ Migraciones completadas"
 
+# Resúmenes diarios (incremental: desde el último día resumido)
+echo "📊 Actualizando resúmenes diarios..."
+python manage.py actualizar_resumenes
+
 # Recolectar archivos estáticos
 echo "📦 Recolectando archivos estáticos..."
 python manage.py collectstatic --noinput --clear
@@ -87,9 +106,22 @@ echo "🎉 Backend iniciado correctamente"
 echo "=========================================="
 
 # Iniciar servidor con Gunicorn
+# SERVIDOR=asgi: workers uvicorn (async); un request lento no bloquea el worker
+if [ "$SERVIDOR" = "asgi" ]; then
+  echo "⚡ Modo ASGI (workers uvicorn)"
+  exec gunicorn inventario_ferreteria.asgi:application \
+      --worker-class uvicorn.workers.UvicornWorker \
+      --bind 0.0.0.0:8000 \
+      --workers ${GUNICORN_WORKERS:-2} \
+      --timeout 120 \
+      --access-logfile - \
+      --error-logfile - \
+      --log-level info
+fi
+
 exec gunicorn inventario_ferreteria.wsgi:application \
     --bind 0.0.0.0:8000 \
-    --workers 3 \
+    --workers ${GUNICORN_WORKERS:-3} \
     --timeout 120 \
     --access-logfile - \
     --error-logfile - \
@@ -1,6 +1,6 @@
 import os
+import sys
 import django
-import pandas as pd
 from pathlib import Path
 
 # Cargar variables de entorno desde .env (si existe)
@@ -16,32 +16,9 @@ if env_path.exists():
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventario_ferreteria.settings')
 django.setup()
 
-from inventario.models import Categoria, Producto
+from django.core.management import call_command
 
-# Cambia el nombre del archivo por el tuyo
-df = pd.read_excel('Inventario_Repuestos.xlsx')
-
-for _, row in df.iterrows():
-    # Crea o busca la categoría
-    categoria, _ = Categoria.objects.get_or_create(nombre=row['Categoría'])
-
-    Producto.objects.update_or_create(
-        codigo=row['Código'],
-        defaults={
-            'nombre': row['Nombre del repuesto'],
-            'modelo_compatible': row.get('Modelo compatible', ''),
-            'descripcion': row.get('Descripción', ''),
-            'categoria': categoria,
-            'marca': row.get('Marca', ''),
-            'unidad_medida': '',  # Si tienes este campo en el Excel, cámbialo aquí
-            'stock_disponible': row.get('Stock actual', 0),
-            'stock_minimo': row.get('Stock mínimo', 0),
-            'precio_costo': row.get('Precio de costo', 0),
-            'precio_unitario': row.get('Precio de venta', 0),
-            'proveedor_texto': row.get('Proveedor', ''),  # Cambiado de 'proveedor' a 'proveedor_texto'
-            'fecha_actualizacion': row.get('Fecha de ingreso', None),
-            'ubicacion_fisica': row.get('Ubicación física', ''),
-        }
-    )
-
-print("¡Importación completada!")
\ No newline at end of file
+# Equivale a: python manage.py importar_catalogo <archivo>
+# Cambia el nombre del archivo por el tuyo (o pásalo como argumento)
+archivo = sys.argv[1] if len(sys.argv) > 1 else 'Inventario_Repuestos.xlsx'
+call_command('importar_catalogo', archivo, *sys.argv[2:])
@@ -3,7 +3,7 @@ from .models import (
     Categoria, Subcategoria, Producto, Movimiento, Cliente,
     Factura, DetalleFactura, Proveedor, OrdenCompra, 
     DetalleOrdenCompra, RecepcionMercaderia, DetalleRecepcion,
-    ProductoProveedor, FacturaCompra, DetalleFacturaCompra
+    ProductoProveedor, FacturaCompra, DetalleFacturaCompra, SerieNumeracion
 )
 
 # Configuración de administración para modelos básicos
@@ -25,6 +25,12 @@ class FacturaAdmin(admin.ModelAdmin):
     search_fields = ['numero_factura', 'nombre_cliente', 'numero_documento']
     inlines = [DetalleFacturaInline]
 
+@admin.register(SerieNumeracion)
+class SerieNumeracionAdmin(admin.ModelAdmin):
+    list_display = ['codigo', 'prefijo', 'digitos', 'timbrado', 'activo']
+    list_filter = ['activo']
+    search_fields = ['codigo', 'prefijo', 'timbrado']
+
 # Administración de proveedores y compras
 @admin.register(Proveedor)
 class ProveedorAdmin(admin.ModelAdmin):
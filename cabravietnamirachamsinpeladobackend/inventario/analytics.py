@@ -0,0 +1,266 @@
+"""
+Agregaciones para el dashboard de analytics.
+
+Todo se resuelve en la base de datos con GROUP BY (values().annotate()) y
+agregados condicionales; las respuestas son series ya resumidas, así el
+costo no depende del tamaño del historial ni de la paginación de la API.
+Las agregaciones por producto leen VentaDiaria (una fila por día, producto
+y vendedor) en lugar de recorrer DetalleFactura.
+
+Rangos: `desde` y `hasta` son fechas inclusivas. Se filtran como
+fecha >= desde 00:00 y fecha < (hasta + 1 día) 00:00 para que el índice
+sobre Factura.fecha siga sirviendo (sin castear la columna a date).
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import Factura, Producto, VentaDiaria
+
+DIAS_POR_DEFECTO = 30
+DIAS_MAXIMO = 366
+LIMITE_POR_DEFECTO = 10
+
+CERO = Value(Decimal('0'), output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+def _inicio_del_dia(dia):
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def _a_float(valor):
+    return float(valor or 0)
+
+
+def rango_fechas(params, hoy=None):
+    """
+    Lee ?desde=AAAA-MM-DD&hasta=AAAA-MM-DD (o ?dias=N).
+    Por defecto: los últimos 30 días incluyendo hoy.
+    Lanza ValueError si el rango es inválido.
+    """
+    hoy = hoy or timezone.localdate()
+    hasta = date.fromisoformat(params['hasta']) if params.get('hasta') else hoy
+
+    if params.get('desde'):
+        desde = date.fromisoformat(params['desde'])
+    else:
+        dias = int(params.get('dias') or DIAS_POR_DEFECTO)
+        if dias < 1:
+            raise ValueError("'dias' debe ser mayor a cero")
+        desde = hasta - timedelta(days=dias - 1)
+
+    if desde > hasta:
+        raise ValueError("'desde' no puede ser posterior a 'hasta'")
+    if (hasta - desde).days >= DIAS_MAXIMO:
+        raise ValueError(f"El rango no puede superar {DIAS_MAXIMO} días")
+    return desde, hasta
+
+
+def parametros(params):
+    """(desde, hasta, limite) de los query params. Lanza ValueError si son inválidos."""
+    desde, hasta = rango_fechas(params)
+    limite = int(params.get('limite') or LIMITE_POR_DEFECTO)
+    if not 1 <= limite <= 100:
+        raise ValueError("'limite' debe estar entre 1 y 100")
+    return desde, hasta, limite
+
+
+def _filtro_rango(campo, desde, hasta):
+    return Q(**{
+        f'{campo}__gte': _inicio_del_dia(desde),
+        f'{campo}__lt': _inicio_del_dia(hasta + timedelta(days=1)),
+    })
+
+
+def ventas_por_dia(desde, hasta):
+    """
+    Serie diaria continua (días sin ventas en 0):
+    [{fecha, total, facturas, cantidad_productos}]
+    """
+    facturas = (
+        Factura.objects.filter(_filtro_rango('fecha', desde, hasta))
+        .annotate(dia=TruncDate('fecha'))
+        .values('dia')
+        .annotate(total=Sum('total'), facturas=Count('id'))
+    )
+    unidades = (
+        VentaDiaria.objects.filter(fecha__range=(desde, hasta))
+        .values('fecha')
+        .annotate(cantidad=Sum('cantidad'))
+    )
+    por_dia = {fila['dia']: fila for fila in facturas}
+    unidades_por_dia = {fila['fecha']: fila['cantidad'] for fila in unidades}
+
+    serie = []
+    dia = desde
+    while dia <= hasta:
+        fila = por_dia.get(dia, {})
+        serie.append({
+            'fecha': dia.isoformat(),
+            'total': _a_float(fila.get('total')),
+            'facturas': fila.get('facturas', 0),
+            'cantidad_productos': unidades_por_dia.get(dia, 0),
+        })
+        dia += timedelta(days=1)
+    return serie
+
+
+def top_productos(desde, hasta, limite=LIMITE_POR_DEFECTO):
+    """Productos más vendidos del rango, ordenados por unidades vendidas."""
+    filas = (
+        VentaDiaria.objects.filter(fecha__range=(desde, hasta))
+        .values('producto_id', 'producto__nombre', 'producto__marca')
+        .annotate(cantidad_vendida=Sum('cantidad'), ingresos_totales=Sum('total'))
+        .order_by('-cantidad_vendida', '-ingresos_totales')[:limite]
+    )
+    return [{
+        'id': fila['producto_id'],
+        'nombre': fila['producto__nombre'],
+        'marca': fila['producto__marca'] or '',
+        'cantidad_vendida': fila['cantidad_vendida'],
+        'ingresos_totales': _a_float(fila['ingresos_totales']),
+    } for fila in filas]
+
+
+def marcas_populares(desde, hasta, limite=LIMITE_POR_DEFECTO):
+    filas = (
+        VentaDiaria.objects.filter(fecha__range=(desde, hasta))
+        .values(marca=Coalesce('producto__marca', Value('Sin marca')))
+        .annotate(productos_vendidos=Sum('cantidad'), ingresos_totales=Sum('total'))
+        .order_by('-ingresos_totales')[:limite]
+    )
+    return [{
+        'marca': fila['marca'],
+        'productos_vendidos': fila['productos_vendidos'],
+        'ingresos_totales': _a_float(fila['ingresos_totales']),
+    } for fila in filas]
+
+
+def clientes_frecuentes(desde, hasta, limite=LIMITE_POR_DEFECTO):
+    """Clientes con más compras del rango (se excluyen ventas sin cliente)."""
+    filas = (
+        Factura.objects.filter(_filtro_rango('fecha', desde, hasta))
+        .exclude(nombre_cliente__isnull=True).exclude(nombre_cliente='')
+        .values('nombre_cliente')
+        .annotate(total_compras=Count('id'), total_gastado=Sum('total'), ultima_compra=Max('fecha'))
+        .order_by('-total_compras', '-total_gastado')[:limite]
+    )
+    return [{
+        'nombre': fila['nombre_cliente'],
+        'total_compras': fila['total_compras'],
+        'total_gastado': _a_float(fila['total_gastado']),
+        'ultima_compra': timezone.localtime(fila['ultima_compra']).date().isoformat(),
+    } for fila in filas]
+
+
+def margen_por_categoria(desde, hasta):
+    """
+    Ingresos, costo y margen por categoría (la del producto al vender).
+    El costo se calcula con el precio_costo actual del producto (costo
+    promedio ponderado, ver stock.py).
+    """
+    costo_linea = ExpressionWrapper(
+        F('cantidad') * F('producto__precio_costo'),
+        output_field=DecimalField(max_digits=14, decimal_places=2)
+    )
+    filas = (
+        VentaDiaria.objects.filter(fecha__range=(desde, hasta))
+        .values('categoria_id', 'categoria__nombre')
+        .annotate(unidades=Sum('cantidad'), ingresos=Sum('total'), costo=Sum(costo_linea))
+        .order_by('-ingresos')
+    )
+    resultado = []
+    for fila in filas:
+        ingresos = fila['ingresos'] or Decimal('0')
+        margen = ingresos - (fila['costo'] or Decimal('0'))
+        resultado.append({
+            'categoria_id': fila['categoria_id'],
+            'categoria': fila['categoria__nombre'],
+            'unidades': fila['unidades'],
+            'ingresos': _a_float(ingresos),
+            'costo': _a_float(fila['costo']),
+            'margen': _a_float(margen),
+            'margen_porcentaje': round(float(margen / ingresos * 100), 2) if ingresos else 0.0,
+        })
+    return resultado
+
+
+def valorizacion_stock():
+    """Valor del inventario activo por categoría, a costo y a precio de venta."""
+    decimal = DecimalField(max_digits=16, decimal_places=2)
+    filas = (
+        Producto.objects.filter(activo=True)
+        .values('categoria_id', 'categoria__nombre')
+        .annotate(
+            productos=Count('id'),
+            unidades=Sum('stock_disponible'),
+            valor_costo=Sum(ExpressionWrapper(F('stock_disponible') * F('precio_costo'), output_field=decimal)),
+            valor_venta=Sum(ExpressionWrapper(F('stock_disponible') * F('precio_unitario'), output_field=decimal)),
+        )
+        .order_by('-valor_costo')
+    )
+    categorias = [{
+        'categoria_id': fila['categoria_id'],
+        'categoria': fila['categoria__nombre'],
+        'productos': fila['productos'],
+        'unidades': fila['unidades'] or 0,
+        'valor_costo': _a_float(fila['valor_costo']),
+        'valor_venta': _a_float(fila['valor_venta']),
+    } for fila in filas]
+    return {
+        'categorias': categorias,
+        'total_unidades': sum(c['unidades'] for c in categorias),
+        'total_costo': sum(c['valor_costo'] for c in categorias),
+        'total_venta': sum(c['valor_venta'] for c in categorias),
+    }
+
+
+def resumen(hoy=None):
+    """
+    Indicadores del dashboard (DashboardStats del frontend).
+    Hoy y mes en curso con agregados condicionales: una consulta por tabla.
+    """
+    hoy = hoy or timezone.localdate()
+    inicio_hoy = _inicio_del_dia(hoy)
+    inicio_mes = _inicio_del_dia(hoy.replace(day=1))
+    fin_hoy = _inicio_del_dia(hoy + timedelta(days=1))
+    en_mes = Q(fecha__gte=inicio_mes, fecha__lt=fin_hoy)
+
+    facturas = Factura.objects.filter(en_mes).aggregate(
+        ventas_hoy=Coalesce(Sum('total', filter=Q(fecha__gte=inicio_hoy)), CERO),
+        ventas_mes=Coalesce(Sum('total'), CERO),
+        facturas_hoy=Count('id', filter=Q(fecha__gte=inicio_hoy)),
+        clientes_unicos_mes=Count('nombre_cliente', distinct=True),
+    )
+    vendidos_hoy = VentaDiaria.objects.filter(fecha=hoy).aggregate(total=Sum('cantidad'))['total']
+
+    mas_vendido = top_productos(hoy.replace(day=1), hoy, limite=1)
+    marca = marcas_populares(hoy.replace(day=1), hoy, limite=1)
+
+    return {
+        'ventas_hoy': _a_float(facturas['ventas_hoy']),
+        'ventas_mes': _a_float(facturas['ventas_mes']),
+        'facturas_hoy': facturas['facturas_hoy'],
+        'productos_vendidos_hoy': vendidos_hoy or 0,
+        'clientes_unicos_mes': facturas['clientes_unicos_mes'],
+        'producto_mas_vendido': mas_vendido[0]['nombre'] if mas_vendido else '',
+        'marca_mas_popular': marca[0]['marca'] if marca else '',
+    }
+
+
+def dashboard(desde, hasta, limite=LIMITE_POR_DEFECTO):
+    """Todo el dashboard en una sola respuesta."""
+    return {
+        'desde': desde.isoformat(),
+        'hasta': hasta.isoformat(),
+        'resumen': resumen(),
+        'ventas_por_dia': ventas_por_dia(desde, hasta),
+        'top_productos': top_productos(desde, hasta, limite),
+        'marcas_populares': marcas_populares(desde, hasta, limite),
+        'clientes_frecuentes': clientes_frecuentes(desde, hasta, limite),
+        'margen_por_categoria': margen_por_categoria(desde, hasta),
+        'valorizacion_stock': valorizacion_stock(),
+    }
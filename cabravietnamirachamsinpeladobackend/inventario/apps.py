@@ -5,4 +5,5 @@ class InventarioConfig(AppConfig):
     name = 'inventario'
 
     def ready(self):
-        import inventario.signals
\ No newline at end of file
+        import inventario.signals
+        import inventario.conexiones  # contadores de conexiones para /api/health/
@@ -0,0 +1,100 @@
+"""
+Búsqueda de productos para el autocompletado de la pantalla de ventas.
+
+PostgreSQL: la columna generada `busqueda` (tsvector ponderado sobre
+nombre (A), código (A), marca (B) y modelos compatibles (C), ver migración
+0016) tiene un índice GIN (idx_producto_busqueda). No es un campo del
+modelo, por eso se consulta con SQL directo. Cada palabra escrita se busca
+como prefijo ('torn' -> 'torn:*'), así sirve mientras se escribe.
+
+Si la extensión pg_trgm está instalada, además se aceptan coincidencias
+aproximadas sobre el nombre (errores de tipeo) con word_similarity,
+usando el índice GIN trigram idx_producto_nombre_trgm.
+
+Otros motores: icontains sobre los mismos campos.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Producto, Categoria
+
+LIMITE_POR_DEFECTO = 20
+LIMITE_MAXIMO = 50
+
+CAMPOS = ['id', 'codigo', 'nombre', 'marca', 'categoria', 'precio_unitario', 'stock_disponible', 'stock_minimo']
+
+_trigramas = {}
+
+
+def _trigramas_disponibles():
+    """pg_trgm instalado en la base (se consulta una vez por proceso)."""
+    alias = connection.alias
+    if alias not in _trigramas:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT EXISTS(SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+            _trigramas[alias] = cursor.fetchone()[0]
+    return _trigramas[alias]
+
+
+def consulta_prefijos(texto):
+    """'llave tubo 14' -> 'llave:* & tubo:* & 14:*' (solo caracteres de palabra)."""
+    palabras = re.findall(r'\w+', texto.lower())
+    return ' & '.join(f"{palabra}:*" for palabra in palabras)
+
+
+def buscar_productos(texto, limite=LIMITE_POR_DEFECTO, solo_activos=True):
+    """
+    Productos que coinciden con `texto`, mejor coincidencia primero:
+    código exacto, luego rango full-text, luego similitud del nombre.
+    Retorna una lista de dicts con CAMPOS.
+    """
+    texto = (texto or '').strip()
+    consulta = consulta_prefijos(texto)
+    if not consulta:
+        return []
+
+    if connection.vendor != 'postgresql':
+        return _buscar_icontains(texto, limite, solo_activos)
+
+    trigramas = _trigramas_disponibles()
+    condiciones = ["p.busqueda @@ q.consulta", "p.codigo = %(texto)s"]
+    orden = ["p.codigo = %(texto)s DESC NULLS LAST", "ts_rank(p.busqueda, q.consulta) DESC"]
+    if trigramas:
+        condiciones.append("%(texto)s <%% p.nombre")
+        orden.append("word_similarity(%(texto)s, p.nombre) DESC")
+    orden.append("p.nombre")
+
+    tabla = connection.ops.quote_name(Producto._meta.db_table)
+    categorias = connection.ops.quote_name(Categoria._meta.db_table)
+    sql = (
+        f"SELECT p.id, p.codigo, p.nombre, p.marca, c.nombre, p.precio_unitario, "
+        f"       p.stock_disponible, p.stock_minimo "
+        f"FROM {tabla} p "
+        f"JOIN {categorias} c ON c.id = p.categoria_id "
+        f"CROSS JOIN to_tsquery('spanish', %(consulta)s) AS q(consulta) "
+        f"WHERE ({' OR '.join(condiciones)})"
+        f"{' AND p.activo' if solo_activos else ''} "
+        f"ORDER BY {', '.join(orden)} "
+        f"LIMIT %(limite)s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {'consulta': consulta, 'texto': texto, 'limite': limite})
+        return [dict(zip(CAMPOS, fila)) for fila in cursor.fetchall()]
+
+
+def _buscar_icontains(texto, limite, solo_activos):
+    productos = Producto.objects.all()
+    if solo_activos:
+        productos = productos.filter(activo=True)
+    for palabra in texto.split():
+        productos = productos.filter(
+            Q(nombre__icontains=palabra) | Q(codigo__icontains=palabra) |
+            Q(marca__icontains=palabra) | Q(modelo_compatible__icontains=palabra)
+        )
+    filas = productos.order_by('nombre').values_list(
+        'id', 'codigo', 'nombre', 'marca', 'categoria__nombre',
+        'precio_unitario', 'stock_disponible', 'stock_minimo'
+    )[:limite]
+    return [dict(zip(CAMPOS, fila)) for fila in filas]
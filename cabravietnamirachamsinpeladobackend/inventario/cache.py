@@ -0,0 +1,218 @@
+"""
+Caché compartida de las lecturas más frecuentes.
+
+Con REDIS_URL la caché es Redis y la comparten todos los workers de
+gunicorn; sin REDIS_URL (desarrollo, tests) es memoria local del proceso
+(ver CACHES en settings.py). Se cachea:
+
+  categorias   lista del dropdown (con su sello ETag, ver condicional.py)
+  proveedores  lista del dropdown (ídem)
+  producto     detalle por id (GET /api/productos/<id>/) y por código
+  cliente      búsqueda por documento (facturación)
+  facturas     datos de impresión por número (ver impresion.py)
+  facturas_compra  estadísticas del día (ver cuentas_por_pagar.py)
+
+Invalidación (signals.py, stock.py, catalogo.py):
+  - save/delete de cada modelo borra sus claves
+  - cada movimiento de stock borra el detalle de los productos tocados
+  - renombrar categoría/subcategoría/proveedor o importar el catálogo
+    invalida todo el espacio `producto` (cambia su generación)
+
+Las claves se borran en el momento y otra vez al confirmar la transacción,
+para que una lectura concurrente no vuelva a guardar el valor anterior.
+Las búsquedas por código/documento guardan solo el id: si el código o el
+documento cambiaron, el detalle ya no coincide y se vuelve a consultar.
+
+Si Redis no responde se consulta la base directamente (se cuenta como error).
+"""
+import logging
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_AUSENTE = object()
+_contadores = defaultdict(lambda: {'aciertos': 0, 'fallos': 0, 'errores': 0})
+
+
+# ==========================================
+# PRIMITIVAS
+# ==========================================
+
+def _generacion(espacio):
+    """Generación vigente del espacio (cambia al invalidarlo entero)."""
+    clave = f'gen:{espacio}'
+    generacion = cache.get(clave)
+    if generacion is None:
+        # Nueva (o desalojada): nunca coincide con claves anteriores
+        cache.add(clave, time.time_ns(), None)
+        generacion = cache.get(clave)
+    return generacion
+
+
+def _clave(espacio, clave):
+    return f'{espacio}:{_generacion(espacio)}:{clave}'
+
+
+def obtener(espacio, clave, calcular):
+    """Valor cacheado de espacio/clave; si no está, calcular() y guardarlo (None incluido)."""
+    contadores = _contadores[espacio]
+    try:
+        completa = _clave(espacio, clave)
+        valor = cache.get(completa, _AUSENTE)
+    except Exception:
+        logger.warning("Caché no disponible, se consulta la base", exc_info=True)
+        contadores['errores'] += 1
+        return calcular()
+
+    if valor is not _AUSENTE:
+        contadores['aciertos'] += 1
+        return valor
+
+    contadores['fallos'] += 1
+    valor = calcular()
+    try:
+        cache.set(completa, valor, settings.CACHE_TTL)
+    except Exception:
+        contadores['errores'] += 1
+    return valor
+
+
+def obtener_varios(espacio, claves, calcular_faltantes):
+    """
+    Como obtener() para varias claves con un solo get_many/set_many.
+    calcular_faltantes(claves_faltantes) -> {clave: valor}.
+    Retorna {clave: valor} (solo las claves con valor).
+    """
+    contadores = _contadores[espacio]
+    try:
+        generacion = _generacion(espacio)
+        completas = {f'{espacio}:{generacion}:{clave}': clave for clave in claves}
+        encontrados = {completas[completa]: valor for completa, valor in cache.get_many(list(completas)).items()}
+    except Exception:
+        logger.warning("Caché no disponible, se consulta la base", exc_info=True)
+        contadores['errores'] += 1
+        return calcular_faltantes(list(claves))
+
+    faltantes = [clave for clave in claves if clave not in encontrados]
+    contadores['aciertos'] += len(encontrados)
+    contadores['fallos'] += len(faltantes)
+    if not faltantes:
+        return encontrados
+
+    calculados = calcular_faltantes(faltantes)
+    try:
+        cache.set_many({f'{espacio}:{generacion}:{clave}': valor for clave, valor in calculados.items()},
+                       settings.CACHE_TTL)
+    except Exception:
+        contadores['errores'] += 1
+    return {**encontrados, **calculados}
+
+
+def _ahora_y_al_confirmar(espacio, borrar):
+    """
+    Ejecuta borrar() ahora y al confirmar. Los errores de la caché solo se
+    registran: la escritura ya está (o va a estar) confirmada y un 500 haría
+    que el cliente la reintente.
+    """
+    def seguro():
+        try:
+            borrar()  # incluye _generacion(): también consulta la caché
+        except Exception:
+            logger.warning("No se pudo invalidar la caché", exc_info=True)
+            _contadores[espacio]['errores'] += 1
+
+    seguro()
+    transaction.on_commit(seguro)
+
+
+def invalidar(espacio, *claves):
+    """Borra claves del espacio (ahora y al confirmar la transacción)."""
+    _ahora_y_al_confirmar(espacio, lambda: cache.delete_many([_clave(espacio, clave) for clave in claves]))
+
+
+def invalidar_espacio(espacio):
+    """Invalida todas las claves del espacio de una vez."""
+    _ahora_y_al_confirmar(espacio, lambda: cache.set(f'gen:{espacio}', time.time_ns(), None))
+
+
+def metricas():
+    """Aciertos/fallos por espacio en este proceso (se publican en /api/health/)."""
+    espacios = {}
+    for espacio, valores in sorted(_contadores.items()):
+        total = valores['aciertos'] + valores['fallos']
+        espacios[espacio] = {**valores, 'tasa_aciertos': round(valores['aciertos'] / total, 3) if total else None}
+    return {'backend': cache.__class__.__name__, 'espacios': espacios}
+
+
+# ==========================================
+# LECTURAS CACHEADAS
+# ==========================================
+
+def producto(pk):
+    """Detalle del producto (ProductoSerializer) o None si no existe."""
+    from .models import Producto
+    from .serializers import ProductoSerializer
+
+    def calcular():
+        instancia = Producto.objects.select_related(
+            'categoria', 'subcategoria', 'proveedor_principal'
+        ).filter(pk=pk).first()
+        return dict(ProductoSerializer(instancia).data) if instancia else None
+
+    return obtener('producto', f'id:{pk}', calcular)
+
+
+def _indirecto(espacio, clave, buscar_id, detalle, vigente):
+    """clave -> id (cacheado) -> detalle (cacheado), verificando que siga vigente."""
+    for _ in range(2):
+        pk = obtener(espacio, clave, buscar_id)
+        if pk is None:
+            return None
+        datos = detalle(pk)
+        if datos is not None and vigente(datos):
+            return datos
+        # El id apunta a un registro borrado o que cambió de código/documento
+        invalidar(espacio, clave)
+    return None
+
+
+def producto_por_codigo(codigo):
+    from .models import Producto
+    return _indirecto(
+        'producto', f'codigo:{codigo}',
+        lambda: Producto.objects.filter(codigo=codigo).values_list('id', flat=True).first(),
+        producto,
+        lambda datos: datos['codigo'] == codigo,
+    )
+
+
+def _cliente(pk):
+    from .models import Cliente
+    from .serializers import ClienteDropdownSerializer
+
+    def calcular():
+        instancia = Cliente.objects.filter(pk=pk, activo=True).first()
+        return dict(ClienteDropdownSerializer(instancia).data) if instancia else None
+
+    return obtener('cliente', f'id:{pk}', calcular)
+
+
+def cliente_por_documento(documento):
+    """
+    Cliente activo con ese documento (ClienteDropdownSerializer) o None.
+    Se compara normalizado: '80.012.345-6' encuentra a '80012345-6'.
+    """
+    from .models import Cliente
+    from .clientes import normalizar
+    documento = normalizar(documento)
+    return _indirecto(
+        'cliente', f'documento:{documento}',
+        lambda: Cliente.objects.filter(documento_normalizado=documento, activo=True).values_list('id', flat=True).first(),
+        _cliente,
+        lambda datos: normalizar(datos['numero_documento']) == documento,
+    )
@@ -0,0 +1,150 @@
+"""
+Campos a pedido (sparse fieldsets) para los ViewSets de views.py.
+
+    ?fields=id,numero_factura,total   solo esas claves en la respuesta
+    ?expand=detalles                  agrega al listado las relaciones
+                                      anidadas que omite por defecto
+
+Se aplica en la consulta, no solo en la salida:
+
+  - .only() con las columnas de los campos que se van a mostrar (más las
+    que usan los campos calculados, `campos_dependencias`, y las del orden
+    para la paginación keyset). Si un campo no se puede traducir a
+    columnas se leen todas: la respuesta es la misma, sin el ahorro.
+  - las relaciones anidadas (`campos_anidados`: campo -> prefetch) y los
+    agregados (`campos_anotados`: campo -> expresión) solo se consultan si
+    el campo se muestra.
+  - los select_related de FK que no se muestran se descartan.
+
+Los listados usan `serializer_class_listado` (sin anidados) salvo que se
+pida expandir o se incluya un anidado en ?fields. Solo afecta a lecturas
+(GET de list/retrieve); el resto de las acciones usan el serializer
+completo con todos los anidados.
+"""
+from django.core.exceptions import FieldDoesNotExist
+
+PARAMETRO_CAMPOS = 'fields'
+PARAMETRO_EXPANDIR = 'expand'
+
+
+def _lista(valor):
+    return {parte.strip() for parte in (valor or '').split(',') if parte.strip()}
+
+
+def _rutas(arbol, prefijo=''):
+    """{'a': {'b': {}}} (query.select_related) -> ['a__b']"""
+    rutas = []
+    for nombre, hijos in arbol.items():
+        ruta = f'{prefijo}{nombre}'
+        rutas += _rutas(hijos, f'{ruta}__') if hijos else [ruta]
+    return rutas
+
+
+class CamposMixin:
+    """?fields= y ?expand= para un ModelViewSet (ver docstring del módulo)."""
+    serializer_class_listado = None
+    campos_anidados = {}
+    campos_anotados = {}
+    campos_dependencias = {}
+
+    # -- parámetros -----------------------------------------------------
+
+    def _es_lectura(self):
+        return self.request is not None and self.request.method == 'GET' and self.action in ('list', 'retrieve')
+
+    def _campos_pedidos(self):
+        if not self._es_lectura():
+            return None
+        return _lista(self.request.query_params.get(PARAMETRO_CAMPOS)) or None
+
+    def _expandidos(self):
+        pedidos = self._campos_pedidos() or set()
+        return (_lista(self.request.query_params.get(PARAMETRO_EXPANDIR)) | pedidos) & set(self.campos_anidados)
+
+    # -- serializer -----------------------------------------------------
+
+    def get_serializer_class(self):
+        if self.action == 'list' and self.serializer_class_listado and not self._expandidos():
+            return self.serializer_class_listado
+        return super().get_serializer_class()
+
+    def _visibles(self, campos):
+        """Nombres de los campos que se muestran, respetando ?fields."""
+        pedidos = self._campos_pedidos()
+        return [
+            nombre for nombre, campo in campos.items()
+            if not campo.write_only and (pedidos is None or nombre in pedidos)
+        ]
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self._campos_pedidos() is not None:
+            destino = getattr(serializer, 'child', serializer)
+            visibles = set(self._visibles(destino.fields))
+            for nombre in list(destino.fields):
+                if nombre not in visibles:
+                    destino.fields.pop(nombre)
+        return serializer
+
+    def recortar(self, datos):
+        """?fields sobre un dict ya serializado (respuestas desde la caché)."""
+        pedidos = self._campos_pedidos()
+        if pedidos is None:
+            return datos
+        return {clave: valor for clave, valor in datos.items() if clave in pedidos}
+
+    # -- consulta -------------------------------------------------------
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self._es_lectura():
+            # Acciones que responden con el serializer completo
+            return queryset.prefetch_related(*self.campos_anidados.values())
+
+        campos = self.get_serializer_class()().fields
+        visibles = self._visibles(campos)
+        for nombre, prefetch in self.campos_anidados.items():
+            if nombre in visibles:
+                queryset = queryset.prefetch_related(prefetch)
+        anotados = {nombre: expresion for nombre, expresion in self.campos_anotados.items() if nombre in visibles}
+        if anotados:
+            queryset = queryset.annotate(**anotados)
+
+        columnas = self._columnas(queryset.model, campos, visibles)
+        if columnas is None:
+            return queryset
+        if isinstance(queryset.query.select_related, dict):
+            rutas = [ruta for ruta in _rutas(queryset.query.select_related) if ruta.split('__')[0] in columnas]
+            queryset = queryset.select_related(None)
+            if rutas:  # select_related() sin argumentos sigue todas las FK
+                queryset = queryset.select_related(*rutas)
+        return queryset.only(*columnas)
+
+    def _columnas(self, modelo, campos, visibles):
+        """Campos del modelo que necesitan los campos visibles, o None si no se sabe."""
+        columnas = {modelo._meta.pk.name}
+        for nombre in visibles:
+            if nombre in self.campos_anidados or nombre in self.campos_anotados:
+                continue
+            if nombre in self.campos_dependencias:
+                columnas.update(self.campos_dependencias[nombre])
+                continue
+            fuente = campos[nombre].source.split('.')[0]
+            if not self._es_columna(modelo, fuente):
+                return None
+            columnas.add(fuente)
+
+        # La paginación keyset y el ordenamiento leen estos campos de cada fila
+        orden = list(getattr(self.pagination_class, 'ordering', ()) or ())
+        orden += list(getattr(self, 'ordering', None) or ())
+        orden += list(_lista(self.request.query_params.get('ordering')))
+        columnas.update(campo.lstrip('-') for campo in orden if self._es_columna(modelo, campo.lstrip('-')))
+        return columnas
+
+    @staticmethod
+    def _es_columna(modelo, nombre):
+        try:
+            campo = modelo._meta.get_field(nombre)
+        except FieldDoesNotExist:
+            return False
+        return campo.concrete and not campo.many_to_many
@@ -0,0 +1,244 @@
+"""
+Importación masiva del catálogo de productos desde una planilla.
+
+En lugar de get_or_create/update_or_create por fila:
+  1. Se normalizan todas las filas en memoria (una fila por código; si un
+     código se repite gana la última).
+  2. Las categorías se resuelven de una vez: un SELECT de las existentes y
+     un bulk_create de las que faltan.
+  3. Se leen los productos existentes por código y se compara fila contra
+     fila: solo se escriben los nuevos y los que cambiaron.
+  4. Se aplica bulk_create(update_conflicts=True) sobre `codigo` en lotes
+     (INSERT ... ON CONFLICT (codigo) DO UPDATE).
+
+El stock y el precio de costo de productos existentes NO se pisan: los
+mantiene el motor de stock (movimientos; precio_costo es el costo
+promedio ponderado, ver stock.py). Los de la planilla solo se usan al
+crear.
+
+Columnas reconocidas (encabezados de la planilla de inventario):
+Código, Nombre del repuesto, Categoría, Modelo compatible, Descripción,
+Marca, Stock actual, Stock mínimo, Precio de costo, Precio de venta,
+Proveedor, Ubicación física.
+"""
+import csv
+import math
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import cache
+from .models import Categoria, Producto
+from .sincronizacion import registrar_cambios
+
+LOTE = 2000
+
+COLUMNAS = {
+    'codigo': 'Código',
+    'nombre': 'Nombre del repuesto',
+    'categoria': 'Categoría',
+    'modelo_compatible': 'Modelo compatible',
+    'descripcion': 'Descripción',
+    'marca': 'Marca',
+    'stock_disponible': 'Stock actual',
+    'stock_minimo': 'Stock mínimo',
+    'precio_costo': 'Precio de costo',
+    'precio_unitario': 'Precio de venta',
+    'proveedor_texto': 'Proveedor',
+    'ubicacion_fisica': 'Ubicación física',
+}
+
+# Campos que se actualizan en productos existentes (y que se comparan).
+# Sin stock_disponible ni precio_costo: solo se cargan al crear.
+CAMPOS_ACTUALIZABLES = [
+    'nombre', 'categoria_id', 'modelo_compatible', 'descripcion', 'marca', 'stock_minimo',
+    'precio_unitario', 'proveedor_texto', 'ubicacion_fisica',
+]
+
+CATEGORIA_POR_DEFECTO = 'SIN CATEGORÍA'
+MARGEN_VENTA = Decimal('1.30')
+
+
+class ErrorPlanilla(Exception):
+    """La planilla no se puede leer o le faltan columnas obligatorias."""
+
+
+# ==========================================
+# LECTURA Y NORMALIZACIÓN
+# ==========================================
+
+def leer_planilla(ruta):
+    """Filas (dicts por encabezado) de un .csv o .xlsx/.xls."""
+    ruta = Path(ruta)
+    if not ruta.exists():
+        raise ErrorPlanilla(f"No existe el archivo {ruta}")
+    if ruta.suffix.lower() == '.csv':
+        with open(ruta, encoding='utf-8-sig', newline='') as archivo:
+            filas = list(csv.DictReader(archivo))
+    else:
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ErrorPlanilla("Leer Excel requiere pandas (pip install pandas openpyxl) o exportar la planilla a CSV")
+        df = pd.read_excel(ruta, dtype=object)
+        filas = df.astype(object).where(df.notna(), None).to_dict('records')
+
+    faltantes = [COLUMNAS[c] for c in ('codigo', 'nombre') if filas and COLUMNAS[c] not in filas[0]]
+    if faltantes:
+        raise ErrorPlanilla(f"Faltan columnas obligatorias: {', '.join(faltantes)}")
+    return filas
+
+
+def _texto(valor):
+    if valor is None or (isinstance(valor, float) and math.isnan(valor)):
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)  # Excel entrega los códigos numéricos como float
+    valor = str(valor).strip()
+    return valor or None
+
+
+def _entero(valor):
+    valor = _texto(valor)
+    if valor is None:
+        return 0
+    try:
+        return max(0, int(Decimal(valor.replace(',', '.'))))
+    except InvalidOperation:
+        return 0
+
+
+def _decimal(valor):
+    valor = _texto(valor)
+    if valor is None:
+        return Decimal('0.00')
+    try:
+        return Decimal(valor.replace(',', '.')).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        return Decimal('0.00')
+
+
+def normalizar(filas):
+    """
+    {codigo: datos} con los valores ya convertidos a los tipos del modelo,
+    y la cantidad de filas omitidas (sin código o sin nombre).
+    """
+    productos = {}
+    omitidas = 0
+    for fila in filas:
+        codigo = _texto(fila.get(COLUMNAS['codigo']))
+        nombre = _texto(fila.get(COLUMNAS['nombre']))
+        if not codigo or not nombre:
+            omitidas += 1
+            continue
+        precio_costo = _decimal(fila.get(COLUMNAS['precio_costo']))
+        precio_unitario = _decimal(fila.get(COLUMNAS['precio_unitario']))
+        if not precio_unitario and precio_costo:
+            precio_unitario = (precio_costo * MARGEN_VENTA).quantize(Decimal('0.01'))
+        productos[codigo] = _recortar({
+            'nombre': nombre,
+            'categoria': (_texto(fila.get(COLUMNAS['categoria'])) or CATEGORIA_POR_DEFECTO)[:100],
+            'modelo_compatible': _texto(fila.get(COLUMNAS['modelo_compatible'])),
+            'descripcion': _texto(fila.get(COLUMNAS['descripcion'])),
+            'marca': _texto(fila.get(COLUMNAS['marca'])),
+            'stock_disponible': _entero(fila.get(COLUMNAS['stock_disponible'])),
+            'stock_minimo': _entero(fila.get(COLUMNAS['stock_minimo'])),
+            'precio_costo': precio_costo,
+            'precio_unitario': precio_unitario,
+            'proveedor_texto': _texto(fila.get(COLUMNAS['proveedor_texto'])),
+            'ubicacion_fisica': _texto(fila.get(COLUMNAS['ubicacion_fisica'])),
+        })
+    return productos, omitidas
+
+
+def _recortar(datos):
+    """Corta los textos al max_length de cada campo del modelo."""
+    for campo, valor in datos.items():
+        if isinstance(valor, str) and campo != 'categoria':
+            largo = Producto._meta.get_field(campo).max_length
+            if largo:
+                datos[campo] = valor[:largo]
+    return datos
+
+
+# ==========================================
+# IMPORTACIÓN
+# ==========================================
+
+def _categorias(nombres, aplicar):
+    """{nombre: id} de todas las categorías usadas; crea las que faltan."""
+    existentes = dict(Categoria.objects.filter(nombre__in=nombres).values_list('nombre', 'id'))
+    nuevas = sorted(set(nombres) - set(existentes))
+    if nuevas and aplicar:
+        Categoria.objects.bulk_create([Categoria(nombre=nombre) for nombre in nuevas], ignore_conflicts=True)
+        existentes = dict(Categoria.objects.filter(nombre__in=nombres).values_list('nombre', 'id'))
+    return existentes, len(nuevas)
+
+
+def _existentes(codigos):
+    """{codigo: {campo: valor}} de los productos ya cargados, leídos en lotes."""
+    existentes = {}
+    for inicio in range(0, len(codigos), LOTE):
+        filas = Producto.objects.filter(codigo__in=codigos[inicio:inicio + LOTE]).values(
+            'codigo', *CAMPOS_ACTUALIZABLES
+        )
+        for fila in filas:
+            existentes[fila.pop('codigo')] = fila
+    return existentes
+
+
+def importar_catalogo(filas, aplicar=True, progreso=None):
+    """
+    Importa las filas de la planilla. Con aplicar=False solo calcula qué
+    cambiaría (dry-run). `progreso(procesadas, total)` se llama por lote.
+    Retorna un dict con los contadores.
+    """
+    productos, omitidas = normalizar(filas)
+    codigos = list(productos)
+
+    with transaction.atomic():
+        categorias, categorias_nuevas = _categorias({p['categoria'] for p in productos.values()}, aplicar)
+        existentes = _existentes(codigos)
+
+        ahora = timezone.now()
+        pendientes = []
+        nuevos = actualizados = sin_cambios = 0
+        for codigo in codigos:
+            datos = productos[codigo]
+            datos['categoria_id'] = categorias.get(datos.pop('categoria'))
+            actual = existentes.get(codigo)
+            if actual is None:
+                nuevos += 1
+            elif all(actual[campo] == datos[campo] for campo in CAMPOS_ACTUALIZABLES):
+                sin_cambios += 1
+                continue
+            else:
+                actualizados += 1
+            pendientes.append(Producto(codigo=codigo, fecha_actualizacion=ahora, **datos))
+
+        if aplicar:
+            for inicio in range(0, len(pendientes), LOTE):
+                lote = Producto.objects.bulk_create(
+                    pendientes[inicio:inicio + LOTE],
+                    update_conflicts=True,
+                    unique_fields=['codigo'],
+                    update_fields=CAMPOS_ACTUALIZABLES + ['fecha_actualizacion'],
+                )
+                # bulk_create no dispara signals: el registro de cambios va aquí
+                registrar_cambios([producto.pk for producto in lote], 'modificacion')
+                if progreso:
+                    progreso(min(inicio + LOTE, len(pendientes)), len(pendientes))
+            if pendientes or categorias_nuevas:
+                cache.invalidar('categorias', 'dropdown')
+                cache.invalidar_espacio('producto')
+
+    return {
+        'filas': len(filas),
+        'omitidas': omitidas,
+        'categorias_nuevas': categorias_nuevas,
+        'nuevos': nuevos,
+        'actualizados': actualizados,
+        'sin_cambios': sin_cambios,
+    }
@@ -0,0 +1,185 @@
+"""
+Clientes: documento normalizado, autocompletado y estadísticas de compras
+(Cliente.total_compras y Cliente.monto_total_compras).
+
+DOCUMENTO NORMALIZADO
+Cliente.documento_normalizado es una columna calculada por PostgreSQL:
+el documento sin guiones, puntos ni espacios y en mayúsculas, así
+"80012345-6", "80.012.345-6" y "800123456" son el mismo RUC. Todas las
+búsquedas por documento comparan contra esa columna (ver normalizar()).
+
+autocompletar    -> hasta 10 clientes activos por prefijo de documento o
+                    de teléfono (índices varchar_pattern_ops) o por nombre
+                    (índice GIN trigram si pg_trgm está instalada, como en
+                    busqueda.py). Reemplaza a descargar todos los clientes.
+
+ESTADÍSTICAS
+Factura no tiene FK a Cliente: guarda el documento como texto. Las
+estadísticas se asocian por documento normalizado (facturas con tipo de
+documento 'ninguno' o sin número no suman a nadie).
+
+registrar_compra -> al crear una factura (FacturaSerializer.create) y,
+                    con signo -1, al eliminarla (signal post_delete).
+                    Un UPDATE con F(): sin leer ni reescribir el cliente,
+                    sin carreras entre cajas.
+recalcular       -> reconstrucción completa en una sola sentencia
+                    (manage.py recalcular_estadisticas_clientes).
+top              -> ranking leyendo los contadores (índices por monto y
+                    por cantidad), sin agregar facturas.
+"""
+from django.db import connection
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from .busqueda import _trigramas_disponibles
+from .models import Cliente, Factura
+
+SEPARADORES = ('-', '.', ' ')
+CAMPOS_AUTOCOMPLETAR = ['id', 'tipo_documento', 'numero_documento', 'nombre', 'email', 'telefono', 'direccion']
+LIMITE_AUTOCOMPLETAR = 10
+MINIMO_CARACTERES = 2
+
+LIMITE_POR_DEFECTO = 10
+LIMITE_MAXIMO = 100
+ORDENES = {
+    'monto': ('-monto_total_compras', '-total_compras', 'id'),
+    'compras': ('-total_compras', '-monto_total_compras', 'id'),
+}
+
+
+def normalizar(documento):
+    """Mismo cálculo que Cliente.documento_normalizado: '80.012.345-6' -> '800123456'."""
+    documento = documento or ''
+    for separador in SEPARADORES:
+        documento = documento.replace(separador, '')
+    return documento.upper()
+
+
+def _sql_normalizado(columna):
+    """normalizar() en SQL, para columnas sin versión normalizada (Factura)."""
+    expresion = f"COALESCE({columna}, '')"
+    for separador in SEPARADORES:
+        expresion = f"REPLACE({expresion}, '{separador}', '')"
+    return f"UPPER({expresion})"
+
+
+def _documento(factura):
+    if factura.tipo_documento == 'ninguno':
+        return None
+    return normalizar(factura.numero_documento) or None
+
+
+def registrar_compra(factura, signo=1):
+    """Suma (o resta, signo=-1) la factura a los clientes con su documento."""
+    documento = _documento(factura)
+    if documento is None:
+        return 0
+    if signo > 0:
+        cambios = {
+            'total_compras': F('total_compras') + 1,
+            'monto_total_compras': F('monto_total_compras') + factura.total,
+        }
+    else:
+        # Nunca por debajo de cero (contadores previos a este registro)
+        cambios = {
+            'total_compras': Greatest(F('total_compras') - 1, Value(0)),
+            'monto_total_compras': Greatest(F('monto_total_compras') - factura.total, Value(0)),
+        }
+    return Cliente.objects.filter(documento_normalizado=documento).update(**cambios)
+
+
+def recalcular():
+    """
+    Recalcula los contadores de todos los clientes con un GROUP BY de
+    Factura por documento. Solo escribe las filas que cambian.
+    Retorna la cantidad de clientes actualizados.
+    """
+    qn = connection.ops.quote_name
+    clientes = qn(Cliente._meta.db_table)
+    facturas = qn(Factura._meta.db_table)
+    documento, total_compras, monto = qn('numero_documento'), qn('total_compras'), qn('monto_total_compras')
+    documento_factura = _sql_normalizado(documento)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {clientes} c SET {total_compras} = COALESCE(f.compras, 0), {monto} = COALESCE(f.monto, 0) "
+            f"FROM {clientes} c2 LEFT JOIN ("
+            f"  SELECT {documento_factura} AS documento, COUNT(*) AS compras, SUM({qn('total')}) AS monto "
+            f"  FROM {facturas} WHERE {qn('tipo_documento')} <> 'ninguno' AND {documento_factura} <> '' "
+            f"  GROUP BY 1"
+            f") f ON f.documento = c2.{qn('documento_normalizado')} "
+            f"WHERE c.{qn('id')} = c2.{qn('id')} "
+            f"AND (c.{total_compras}, c.{monto}) IS DISTINCT FROM (COALESCE(f.compras, 0), COALESCE(f.monto, 0))"
+        )
+        return cursor.rowcount
+
+
+def parametros(params):
+    """(limite, orden) de los query params. Lanza ValueError si son inválidos."""
+    limite = int(params.get('limite') or LIMITE_POR_DEFECTO)
+    if not 1 <= limite <= LIMITE_MAXIMO:
+        raise ValueError(f"'limite' debe estar entre 1 y {LIMITE_MAXIMO}")
+    orden = params.get('orden') or 'monto'
+    if orden not in ORDENES:
+        raise ValueError(f"'orden' debe ser uno de: {', '.join(ORDENES)}")
+    return limite, orden
+
+
+def top(limite=LIMITE_POR_DEFECTO, orden='monto'):
+    """Clientes activos con más compras según los contadores."""
+    return list(
+        Cliente.objects.filter(activo=True, total_compras__gt=0)
+        .order_by(*ORDENES[orden])
+        .values('id', 'nombre', 'tipo_documento', 'numero_documento', 'total_compras', 'monto_total_compras')
+        [:limite]
+    )
+
+
+def _escapar_like(texto):
+    return texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def autocompletar(texto, limite=LIMITE_AUTOCOMPLETAR):
+    """
+    Clientes activos cuyo documento o teléfono empiezan con `texto`
+    (sin separadores) o cuyo nombre lo contiene. Orden: documento
+    exacto, prefijo de documento, prefijo de teléfono, similitud del
+    nombre, nombre. Retorna dicts con CAMPOS_AUTOCOMPLETAR.
+    """
+    texto = (texto or '').strip()
+    documento = normalizar(texto)
+    if len(texto) < MINIMO_CARACTERES or not documento:
+        return []
+
+    trigramas = _trigramas_disponibles()
+    condiciones = [
+        "c.documento_normalizado LIKE %(prefijo)s",
+        "c.telefono_normalizado LIKE %(prefijo)s",
+        "c.nombre ILIKE %(contiene)s",
+    ]
+    orden = [
+        "c.documento_normalizado = %(documento)s DESC",
+        "c.documento_normalizado LIKE %(prefijo)s DESC",
+        "c.telefono_normalizado LIKE %(prefijo)s DESC",
+    ]
+    if trigramas:
+        condiciones.append("%(texto)s <%% c.nombre")
+        orden.append("word_similarity(%(texto)s, c.nombre) DESC")
+    orden += ["c.nombre", "c.id"]
+
+    tabla = connection.ops.quote_name(Cliente._meta.db_table)
+    sql = (
+        f"SELECT {', '.join(f'c.{campo}' for campo in CAMPOS_AUTOCOMPLETAR)} "
+        f"FROM {tabla} c "
+        f"WHERE c.activo AND ({' OR '.join(condiciones)}) "
+        f"ORDER BY {', '.join(orden)} "
+        f"LIMIT %(limite)s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {
+            'texto': texto,
+            'documento': documento,
+            'prefijo': _escapar_like(documento) + '%',
+            'contiene': '%' + _escapar_like(texto) + '%',
+            'limite': limite,
+        })
+        return [dict(zip(CAMPOS_AUTOCOMPLETAR, fila)) for fila in cursor.fetchall()]
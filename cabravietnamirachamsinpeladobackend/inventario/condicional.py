@@ -0,0 +1,86 @@
+"""
+GET condicional (ETag / Last-Modified) para los endpoints de dropdown.
+
+Los dropdowns devuelven la lista completa sin paginar cada vez que se
+abre una pantalla. En lugar de serializarla de nuevo, se calcula primero
+un sello barato de la tabla (un solo SELECT con agregados):
+
+    count(*), max(id), max(fecha_actualizacion)
+
+- un alta cambia count y max(id)
+- una baja cambia count
+- una edición (o un movimiento de stock, ver stock.py) cambia
+  max(fecha_actualizacion)
+
+Si el cliente manda el ETag que ya tiene (If-None-Match) y el sello no
+cambió se responde 304 sin cuerpo. If-Modified-Since también se respeta,
+pero tiene resolución de segundos y no ve las bajas: el navegador manda
+ambos y el ETag tiene prioridad.
+
+El ETag es débil (W/"...") para que sobreviva al gzip de nginx y del
+GZipMiddleware. Cache-Control: private, no-cache obliga al navegador a
+revalidar en cada apertura, así nunca se muestra una lista vieja.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+AGREGADOS = {
+    'cantidad': Count('id'),
+    'ultimo_id': Max('id'),
+    'ultima_modificacion': Max('fecha_actualizacion'),
+}
+
+
+def version(agregados):
+    """(etag, last_modified) a partir del resultado de AGREGADOS."""
+    ultima = agregados['ultima_modificacion']
+    clave = f"{agregados['cantidad']}:{agregados['ultimo_id']}:{ultima.isoformat() if ultima else ''}"
+    etag = f'W/"{hashlib.md5(clave.encode()).hexdigest()}"'
+    return etag, int(ultima.timestamp()) if ultima else None
+
+
+def sello(modelo):
+    return version(modelo.objects.aggregate(**AGREGADOS))
+
+
+async def asello(modelo):
+    return version(await modelo.objects.aaggregate(**AGREGADOS))
+
+
+def no_modificado(request, etag, ultima):
+    """HttpResponseNotModified si la copia del cliente sigue vigente, si no None."""
+    return get_conditional_response(request, etag=etag, last_modified=ultima)
+
+
+def marcar(respuesta, etag, ultima):
+    """Agrega ETag, Last-Modified y Cache-Control a la respuesta (200 o 304)."""
+    respuesta['ETag'] = etag
+    if ultima:
+        respuesta['Last-Modified'] = http_date(ultima)
+    patch_cache_control(respuesta, private=True, no_cache=True)
+    return respuesta
+
+
+def respuesta_condicional(request, modelo, datos, espacio=None):
+    """
+    304 si el cliente ya tiene la versión actual de `modelo`; si no,
+    Response(datos()). `datos` solo se evalúa cuando hace falta.
+
+    Con `espacio`, sello y datos se guardan juntos en la caché compartida
+    (ver cache.py) y la respuesta no consulta la base hasta que se
+    invalide; solo para modelos cuyas escrituras pasan por los signals.
+    """
+    if espacio:
+        from . import cache
+        etag, ultima, lista = cache.obtener(espacio, 'dropdown', lambda: (*sello(modelo), datos()))
+        datos = lambda: lista
+    else:
+        etag, ultima = sello(modelo)
+    respuesta = no_modificado(request, etag, ultima)
+    if respuesta is None:
+        respuesta = Response(datos())
+    return marcar(respuesta, etag, ultima)
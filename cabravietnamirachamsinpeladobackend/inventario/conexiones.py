@@ -0,0 +1,59 @@
+"""
+Métricas de conexiones a PostgreSQL (se publican en /api/health/).
+
+- proceso: conexiones abiertas y requests atendidos por este worker desde
+  que arrancó. Con conexiones persistentes `requests_por_conexion` debe
+  ser alto; con DB_POOL=ninguno es ~1 (una conexión nueva por request).
+- servidor: conexiones a la base vistas desde PostgreSQL (pg_stat_activity).
+  Con PgBouncer son las conexiones del pool, no las de los workers.
+"""
+import os
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_contadores = {'conexiones_abiertas': 0, 'requests': 0}
+
+
+@receiver(connection_created)
+def contar_conexion(sender, connection, **kwargs):
+    _contadores['conexiones_abiertas'] += 1
+
+
+@receiver(request_finished)
+def contar_request(sender, **kwargs):
+    _contadores['requests'] += 1
+
+
+def metricas():
+    """Estado del pool de conexiones (hace una consulta a pg_stat_activity)."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FILTER (WHERE state = 'active'), "
+            "       count(*) FILTER (WHERE state LIKE 'idle%'), "
+            "       count(*), "
+            "       current_setting('max_connections')::int "
+            "FROM pg_stat_activity WHERE datname = current_database()"
+        )
+        activas, inactivas, total, maximo = cursor.fetchone()
+
+    abiertas = _contadores['conexiones_abiertas']
+    return {
+        'modo': settings.DB_POOL,
+        'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+        'proceso': {
+            'pid': os.getpid(),
+            'conexiones_abiertas': abiertas,
+            'requests': _contadores['requests'],
+            'requests_por_conexion': round(_contadores['requests'] / abiertas, 1) if abiertas else None,
+        },
+        'servidor': {
+            'activas': activas,
+            'inactivas': inactivas,
+            'total': total,
+            'max_connections': maximo,
+        },
+    }
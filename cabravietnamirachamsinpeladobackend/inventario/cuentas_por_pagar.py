@@ -0,0 +1,103 @@
+"""
+Estadísticas de facturas de compra (cuentas por pagar).
+
+Todo sale de UNA consulta: GROUP BY proveedor con agregados condicionales
+(Count/Sum con filter=Q(...)). Los totales generales son la suma de las
+filas por proveedor, que son pocas.
+
+Antigüedad de lo pendiente, por días desde la emisión:
+0-30, 31-60, 61-90 y más de 90.
+
+El resultado se cachea por día (las categorías de antigüedad y de
+vencimiento dependen de la fecha) y se invalida al guardar o borrar
+cualquier factura de compra (ver signals.py).
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import FacturaCompra
+
+CERO = Value(Decimal('0'), output_field=DecimalField(max_digits=15, decimal_places=2))
+
+DIAS_PROXIMAS_VENCER = 7
+
+# (clave, días mínimos, días máximos) de antigüedad desde la emisión
+TRAMOS = [
+    ('0_30', 0, 30),
+    ('31_60', 31, 60),
+    ('61_90', 61, 90),
+    ('mas_90', 91, None),
+]
+
+CONTADORES = [
+    'total_facturas', 'facturas_pendientes', 'facturas_pagadas',
+    'facturas_vencidas', 'facturas_proximas_vencer',
+]
+MONTOS = ['monto_total_pendiente', 'monto_total_pagado', 'monto_vencido']
+
+
+def _monto(condicion):
+    return Coalesce(Sum('total', filter=condicion), CERO)
+
+
+def _agregados(hoy):
+    pendiente = Q(estado='pendiente')
+    vencida = pendiente & Q(fecha_vencimiento__lt=hoy)
+    agregados = {
+        'total_facturas': Count('id'),
+        'facturas_pendientes': Count('id', filter=pendiente),
+        'facturas_pagadas': Count('id', filter=Q(estado='pagada')),
+        'facturas_vencidas': Count('id', filter=vencida),
+        'facturas_proximas_vencer': Count('id', filter=pendiente & Q(
+            fecha_vencimiento__gte=hoy, fecha_vencimiento__lte=hoy + timedelta(days=DIAS_PROXIMAS_VENCER)
+        )),
+        'monto_total_pendiente': _monto(pendiente),
+        'monto_total_pagado': _monto(Q(estado='pagada')),
+        'monto_vencido': _monto(vencida),
+    }
+    for clave, minimo, maximo in TRAMOS:
+        # emitida hace entre `minimo` y `maximo` días
+        tramo = pendiente & Q(fecha_emision__lte=hoy - timedelta(days=minimo))
+        if maximo is not None:
+            tramo &= Q(fecha_emision__gte=hoy - timedelta(days=maximo))
+        agregados[f'facturas_{clave}'] = Count('id', filter=tramo)
+        agregados[f'monto_{clave}'] = _monto(tramo)
+    return agregados
+
+
+def estadisticas(hoy=None):
+    """Totales, antigüedad de lo pendiente y saldo por proveedor."""
+    hoy = hoy or timezone.localdate()
+    filas = list(
+        FacturaCompra.objects.order_by()
+        .values('proveedor_id', proveedor_nombre=F('proveedor__nombre'))
+        .annotate(**_agregados(hoy))
+    )
+
+    resultado = {campo: sum(fila[campo] for fila in filas) for campo in CONTADORES}
+    resultado.update({campo: sum((fila[campo] for fila in filas), Decimal('0')) for campo in MONTOS})
+    resultado['antiguedad'] = {
+        clave: {
+            'facturas': sum(fila[f'facturas_{clave}'] for fila in filas),
+            'monto': sum((fila[f'monto_{clave}'] for fila in filas), Decimal('0')),
+        }
+        for clave, _, _ in TRAMOS
+    }
+    resultado['por_proveedor'] = [
+        {
+            'proveedor_id': fila['proveedor_id'],
+            'proveedor': fila['proveedor_nombre'],
+            'facturas_pendientes': fila['facturas_pendientes'],
+            'monto_pendiente': fila['monto_total_pendiente'],
+            'monto_vencido': fila['monto_vencido'],
+            'antiguedad': {clave: fila[f'monto_{clave}'] for clave, _, _ in TRAMOS},
+        }
+        for fila in sorted(filas, key=lambda f: f['monto_total_pendiente'], reverse=True)
+        if fila['facturas_pendientes']
+    ]
+    resultado['fecha'] = hoy
+    return resultado
@@ -0,0 +1,176 @@
+"""
+Exportación de datos a CSV por streaming.
+
+Las filas se leen con values_list().iterator(chunk_size=...) (en
+PostgreSQL, un cursor del lado del servidor) y se van escribiendo en un
+StreamingHttpResponse a medida que llegan: la memoria del worker no
+depende del tamaño del rango y la descarga empieza con el primer bloque.
+
+El archivo lleva BOM UTF-8 para que Excel lo abra con los acentos bien.
+
+Rangos: `desde` y `hasta` (AAAA-MM-DD, inclusivas) son opcionales; sin
+ellos se exporta todo el historial.
+"""
+import csv
+from datetime import date, datetime, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Producto, Movimiento, DetalleFactura, FacturaCompra
+
+CHUNK_SIZE = 2000     # filas por viaje al cursor del servidor
+FILAS_POR_BLOQUE = 500  # filas por escritura al socket
+
+
+class _Eco:
+    """Pseudo-archivo para csv.writer: devuelve la línea en lugar de guardarla."""
+    def write(self, valor):
+        return valor
+
+
+def _celda(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return 'Sí' if valor else 'No'
+    if isinstance(valor, datetime):
+        return timezone.localtime(valor).strftime('%Y-%m-%d %H:%M:%S')
+    return valor
+
+
+def lineas_csv(encabezados, filas):
+    """Genera el CSV en bloques de FILAS_POR_BLOQUE filas."""
+    escritor = csv.writer(_Eco())
+    yield '\ufeff' + escritor.writerow(encabezados)
+    bloque = []
+    for fila in filas:
+        bloque.append(escritor.writerow([_celda(valor) for valor in fila]))
+        if len(bloque) >= FILAS_POR_BLOQUE:
+            yield ''.join(bloque)
+            bloque = []
+    if bloque:
+        yield ''.join(bloque)
+
+
+def rango_opcional(params):
+    """(desde, hasta) como fechas o None. Lanza ValueError si son inválidas."""
+    desde = date.fromisoformat(params['desde']) if params.get('desde') else None
+    hasta = date.fromisoformat(params['hasta']) if params.get('hasta') else None
+    if desde and hasta and desde > hasta:
+        raise ValueError("'desde' no puede ser posterior a 'hasta'")
+    return desde, hasta
+
+
+def _filtro_fecha_hora(campo, desde, hasta):
+    """fecha >= desde 00:00 y fecha < (hasta + 1 día) 00:00, sin castear la columna."""
+    filtro = Q()
+    if desde:
+        filtro &= Q(**{f'{campo}__gte': timezone.make_aware(datetime.combine(desde, datetime.min.time()))})
+    if hasta:
+        siguiente = hasta + timedelta(days=1)
+        filtro &= Q(**{f'{campo}__lt': timezone.make_aware(datetime.combine(siguiente, datetime.min.time()))})
+    return filtro
+
+
+def _filtro_fecha(campo, desde, hasta):
+    filtro = Q()
+    if desde:
+        filtro &= Q(**{f'{campo}__gte': desde})
+    if hasta:
+        filtro &= Q(**{f'{campo}__lte': hasta})
+    return filtro
+
+
+# ==========================================
+# DEFINICIÓN DE CADA EXPORTACIÓN
+# ==========================================
+# Cada una retorna (encabezados, queryset de values_list ya ordenado)
+
+def productos(params, desde=None, hasta=None):
+    columnas = [
+        ('Código', 'codigo'),
+        ('Nombre', 'nombre'),
+        ('Categoría', 'categoria__nombre'),
+        ('Subcategoría', 'subcategoria__nombre'),
+        ('Marca', 'marca'),
+        ('Modelos compatibles', 'modelo_compatible'),
+        ('Unidad', 'unidad_medida'),
+        ('Ubicación', 'ubicacion_fisica'),
+        ('Stock', 'stock_disponible'),
+        ('Stock mínimo', 'stock_minimo'),
+        ('Precio costo', 'precio_costo'),
+        ('Precio venta', 'precio_unitario'),
+        ('Proveedor principal', 'proveedor_principal__nombre'),
+        ('Activo', 'activo'),
+    ]
+    queryset = Producto.objects.all()
+    if params.get('activos', '').lower() == 'true':
+        queryset = queryset.filter(activo=True)
+    return _consulta(queryset.order_by('id'), columnas)
+
+
+def movimientos(params, desde=None, hasta=None):
+    columnas = [
+        ('Fecha', 'fecha'),
+        ('Tipo', 'tipo'),
+        ('Código', 'producto__codigo'),
+        ('Producto', 'producto__nombre'),
+        ('Cantidad', 'cantidad'),
+        ('Descripción', 'descripcion'),
+        ('Usuario', 'usuario__username'),
+    ]
+    queryset = Movimiento.objects.filter(_filtro_fecha_hora('fecha', desde, hasta))
+    return _consulta(queryset.order_by('fecha', 'id'), columnas)
+
+
+def facturas(params, desde=None, hasta=None):
+    """Una fila por línea de factura, con los datos de cabecera repetidos."""
+    columnas = [
+        ('Factura', 'factura__numero_factura'),
+        ('Fecha', 'factura__fecha'),
+        ('Tipo documento', 'factura__tipo_documento'),
+        ('Documento', 'factura__numero_documento'),
+        ('Cliente', 'factura__nombre_cliente'),
+        ('Código', 'producto__codigo'),
+        ('Producto', 'producto__nombre'),
+        ('Cantidad', 'cantidad'),
+        ('Precio unitario', 'precio_unitario'),
+        ('Subtotal línea', 'subtotal'),
+        ('Total factura', 'factura__total'),
+        ('Vendedor', 'factura__usuario__username'),
+    ]
+    queryset = DetalleFactura.objects.filter(_filtro_fecha_hora('factura__fecha', desde, hasta))
+    return _consulta(queryset.order_by('factura__fecha', 'factura_id', 'id'), columnas)
+
+
+def facturas_compra(params, desde=None, hasta=None):
+    columnas = [
+        ('Factura', 'numero_factura'),
+        ('Proveedor', 'proveedor__nombre'),
+        ('Fecha emisión', 'fecha_emision'),
+        ('Fecha vencimiento', 'fecha_vencimiento'),
+        ('Tipo', 'tipo_factura'),
+        ('Estado', 'estado'),
+        ('Subtotal', 'subtotal'),
+        ('Descuento', 'descuento'),
+        ('Impuestos', 'impuestos'),
+        ('Total', 'total'),
+        ('Timbrado', 'timbrado'),
+    ]
+    queryset = FacturaCompra.objects.filter(_filtro_fecha('fecha_emision', desde, hasta))
+    return _consulta(queryset.order_by('fecha_emision', 'id'), columnas)
+
+
+def _consulta(queryset, columnas):
+    encabezados = [titulo for titulo, _ in columnas]
+    filas = queryset.values_list(*[campo for _, campo in columnas]).iterator(chunk_size=CHUNK_SIZE)
+    return encabezados, filas
+
+
+EXPORTACIONES = {
+    'productos': productos,
+    'movimientos': movimientos,
+    'facturas': facturas,
+    'facturas-compra': facturas_compra,
+}
@@ -0,0 +1,120 @@
+"""
+Datos de impresión de facturas (FacturaViewSet.datos_completos).
+
+El frontend arma el PDF con este payload. Se construye con tres consultas
+como máximo, sin importar la cantidad de líneas ni de facturas:
+
+  1. número de cada factura pedida (la clave de la caché)
+  2. facturas faltantes en la caché con su usuario (select_related)
+  3. sus líneas con producto y categoría (Prefetch con select_related)
+
+Una factura emitida no cambia: el payload se guarda en la caché compartida
+(espacio `facturas`, clave por número) y se invalida solo si la factura o
+sus líneas se modifican o se anulan (signals.py).
+"""
+from django.db.models import Prefetch
+
+from . import cache
+from .models import Factura, DetalleFactura
+
+MAXIMO_POR_LOTE = 200
+
+
+def ids_de_parametro(valor):
+    """'1,2,3' -> [1, 2, 3] sin repetir. Lanza ValueError si es inválido."""
+    partes = [parte.strip() for parte in (valor or '').split(',') if parte.strip()]
+    if not all(parte.isdigit() for parte in partes):
+        raise ValueError("'ids' debe ser una lista de números separados por coma")
+    ids = list(dict.fromkeys(int(parte) for parte in partes))
+    if not ids:
+        raise ValueError("'ids' es requerido (ej: ?ids=1,2,3)")
+    if len(ids) > MAXIMO_POR_LOTE:
+        raise ValueError(f"Máximo {MAXIMO_POR_LOTE} facturas por pedido")
+    return ids
+
+
+def _vendedor(usuario):
+    if usuario is None:
+        return {'nombre': '', 'username': ''}
+    return {
+        'nombre': f"{usuario.first_name} {usuario.last_name}".strip() or usuario.username,
+        'username': usuario.username,
+    }
+
+
+def _payload(factura):
+    return {
+        'numero_factura': factura.numero_factura,
+        'fecha': factura.fecha.strftime('%d/%m/%Y'),
+        'hora': factura.fecha.strftime('%H:%M:%S'),
+
+        # Datos del cliente
+        'cliente': {
+            'tipo_documento': factura.get_tipo_documento_display(),
+            'numero_documento': factura.numero_documento,
+            'nombre': factura.nombre_cliente,
+            'email': factura.email_cliente,
+            'telefono': factura.telefono_cliente,
+            'direccion': factura.direccion_cliente,
+        },
+
+        # Detalles de productos
+        'detalles': [
+            {
+                'producto': detalle.producto.nombre,
+                'codigo': detalle.producto.codigo,
+                'descripcion': detalle.producto.descripcion,
+                'cantidad': int(detalle.cantidad),
+                'precio_unitario': float(detalle.precio_unitario),
+                'subtotal': float(detalle.subtotal),
+                'categoria': detalle.producto.categoria.nombre if detalle.producto.categoria else '',
+                'marca': detalle.producto.marca or '',
+            }
+            for detalle in factura.detalles.all()
+        ],
+
+        # Totales
+        'subtotal': float(factura.subtotal),
+        'descuento_total': float(factura.descuento_total),
+        'impuesto_total': float(factura.impuesto_total),
+        'total': float(factura.total),
+        'observaciones': factura.observaciones,
+
+        # Usuario que creó la factura
+        'vendedor': _vendedor(factura.usuario),
+    }
+
+
+def _construir(numeros):
+    """Payload de las facturas con esos números (consultas 2 y 3)."""
+    facturas = (
+        Factura.objects.filter(numero_factura__in=numeros)
+        .select_related('usuario')
+        .prefetch_related(Prefetch(
+            'detalles',
+            queryset=DetalleFactura.objects.select_related('producto__categoria').order_by('id'),
+        ))
+    )
+    return {f'numero:{factura.numero_factura}': _payload(factura) for factura in facturas}
+
+
+def datos_facturas(ids):
+    """Payloads de las facturas con esos ids, en el mismo orden (omite las inexistentes)."""
+    numeros = dict(Factura.objects.filter(pk__in=ids).values_list('id', 'numero_factura'))
+    claves = [f'numero:{numeros[pk]}' for pk in ids if pk in numeros]
+    if not claves:
+        return []
+    payloads = cache.obtener_varios(
+        'facturas', claves, lambda faltantes: _construir([clave.split(':', 1)[1] for clave in faltantes])
+    )
+    return [payloads[clave] for clave in claves if clave in payloads]
+
+
+def datos_factura(pk):
+    """Payload de una factura o None si no existe."""
+    datos = datos_facturas([pk])
+    return datos[0] if datos else None
+
+
+def invalidar(*numeros):
+    cache.invalidar('facturas', *[f'numero:{numero}' for numero in numeros if numero])
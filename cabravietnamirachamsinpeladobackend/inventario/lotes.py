@@ -0,0 +1,148 @@
+"""
+Lotes de stock con asignación FIFO por vencimiento.
+
+Cada entrada por compra (recepción de mercadería o factura de compra)
+deja un LoteStock con su número de lote, vencimiento y saldo. Toda
+salida de stock (ventas y movimientos manuales, ver stock.py) consume
+los lotes del producto en este orden:
+
+    fecha_vencimiento (los sin vencimiento al final), fecha_ingreso, id
+
+que es el del índice parcial idx_lote_fifo (solo lotes con saldo). La
+asignación de un lote de salidas (toda una factura) son tres consultas:
+un SELECT ... FOR UPDATE de los lotes con saldo de sus productos, un
+UPDATE de saldos (bulk_update) y un INSERT de AsignacionLote
+(trazabilidad lote -> movimiento y, en las ventas, línea de factura).
+
+Lo que los lotes no cubren (stock previo a los lotes o de entradas
+manuales) queda sin asignar: el stock del producto sigue siendo
+Producto.stock_disponible (ver stock.py).
+"""
+from datetime import timedelta
+
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import LoteStock, AsignacionLote
+
+DIAS_POR_DEFECTO = 30
+DIAS_MAXIMO = 365
+
+ORDEN_FIFO = (F('fecha_vencimiento').asc(nulls_last=True), 'fecha_ingreso', 'id')
+
+
+def parametros(params):
+    """Días hacia adelante del reporte de vencimientos. Lanza ValueError si es inválido."""
+    dias = int(params.get('dias') or DIAS_POR_DEFECTO)
+    if not 0 <= dias <= DIAS_MAXIMO:
+        raise ValueError(f"'dias' debe estar entre 0 y {DIAS_MAXIMO}")
+    return dias
+
+
+def registrar_ingresos(entradas, origen=''):
+    """
+    Un LoteStock por entrada, con bulk_create.
+    entradas: [(producto_id, cantidad, lote, fecha_vencimiento)]
+    """
+    ahora = timezone.now()
+    return LoteStock.objects.bulk_create([
+        LoteStock(
+            producto_id=producto_id,
+            lote=lote or '',
+            fecha_vencimiento=fecha_vencimiento,
+            fecha_ingreso=ahora,
+            cantidad_inicial=cantidad,
+            cantidad_disponible=cantidad,
+            origen=origen[:150],
+        )
+        for producto_id, cantidad, lote, fecha_vencimiento in entradas
+        if cantidad > 0
+    ])
+
+
+def asignar(movimientos, detalles=None):
+    """
+    Consume lotes FIFO para movimientos de salida ya insertados (con id).
+    detalles: las DetalleFactura de esos movimientos, en el mismo orden
+    (ventas). Debe correr dentro de la transacción de la salida; lo llama
+    stock.py. Retorna las AsignacionLote creadas.
+    """
+    detalles = detalles or [None] * len(movimientos)
+    ids = {movimiento.producto_id for movimiento in movimientos}
+    disponibles = {}
+    for lote in (LoteStock.objects.select_for_update()
+                 .filter(producto_id__in=ids, cantidad_disponible__gt=0)
+                 .order_by('producto_id', *ORDEN_FIFO)):
+        disponibles.setdefault(lote.producto_id, []).append(lote)
+    if not disponibles:
+        return []
+
+    asignaciones = []
+    tocados = {}
+    for movimiento, detalle in zip(movimientos, detalles):
+        cola = disponibles.get(movimiento.producto_id, [])
+        restante = movimiento.cantidad
+        while restante and cola:
+            lote = cola[0]
+            cantidad = min(restante, lote.cantidad_disponible)
+            lote.cantidad_disponible -= cantidad
+            restante -= cantidad
+            tocados[lote.id] = lote
+            asignaciones.append(AsignacionLote(lote=lote, movimiento=movimiento, detalle_factura=detalle,
+                                               cantidad=cantidad))
+            if not lote.cantidad_disponible:
+                cola.pop(0)
+
+    if tocados:
+        LoteStock.objects.bulk_update(list(tocados.values()), ['cantidad_disponible'])
+        AsignacionLote.objects.bulk_create(asignaciones)
+    return asignaciones
+
+
+def por_vencer(dias=DIAS_POR_DEFECTO, hoy=None):
+    """Lotes con saldo que vencen hasta dentro de `dias` días (incluye vencidos)."""
+    hoy = hoy or timezone.localdate()
+    return LoteStock.objects.filter(
+        cantidad_disponible__gt=0, fecha_vencimiento__isnull=False,
+        fecha_vencimiento__lte=hoy + timedelta(days=dias)
+    ).order_by('fecha_vencimiento', 'id').values(
+        'id', 'lote', 'fecha_vencimiento', 'cantidad_disponible', 'origen',
+        'producto_id', producto_codigo=F('producto__codigo'), producto_nombre=F('producto__nombre')
+    )
+
+
+def con_dias(lotes, hoy=None):
+    """Agrega dias_para_vencer y vencido a una página de por_vencer()."""
+    hoy = hoy or timezone.localdate()
+    return [
+        {**lote, 'dias_para_vencer': (lote['fecha_vencimiento'] - hoy).days,
+         'vencido': lote['fecha_vencimiento'] < hoy}
+        for lote in lotes
+    ]
+
+
+def trazabilidad(numero):
+    """
+    Lotes con ese número y las salidas que los consumieron (dos consultas).
+    En las salidas manuales los datos de factura quedan en None.
+    """
+    lotes = list(
+        LoteStock.objects.filter(lote=numero).order_by(*ORDEN_FIFO).values(
+            'id', 'lote', 'fecha_vencimiento', 'fecha_ingreso', 'cantidad_inicial', 'cantidad_disponible',
+            'origen', 'producto_id', producto_codigo=F('producto__codigo'), producto_nombre=F('producto__nombre')
+        )
+    )
+    ventas = {}
+    for asignacion in (AsignacionLote.objects.filter(lote_id__in=[l['id'] for l in lotes])
+                       .order_by('id')
+                       .values('lote_id', 'cantidad', 'movimiento_id',
+                               factura_id=F('detalle_factura__factura_id'),
+                               numero_factura=F('detalle_factura__factura__numero_factura'),
+                               fecha=Coalesce('detalle_factura__factura__fecha', 'movimiento__fecha'),
+                               cliente=F('detalle_factura__factura__nombre_cliente'),
+                               descripcion=F('movimiento__descripcion'))):
+        ventas.setdefault(asignacion.pop('lote_id'), []).append(asignacion)
+    for lote in lotes:
+        lote['ventas'] = ventas.get(lote['id'], [])
+    return lotes
@@ -0,0 +1,50 @@
+"""
+Reconstruye los resúmenes diarios (VentaDiaria, StockDiario).
+
+Uso:
+    python manage.py actualizar_resumenes                  # desde el último día resumido
+    python manage.py actualizar_resumenes --desde 2025-01-01
+    python manage.py actualizar_resumenes --completo       # todo el historial
+"""
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+
+from inventario.models import VentaDiaria, StockDiario
+from inventario.resumenes import reconstruir
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los resúmenes diarios de ventas y stock a partir de facturas y movimientos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help='Fecha inicial AAAA-MM-DD (inclusive)')
+        parser.add_argument('--completo', action='store_true', help='Reconstruir todo el historial')
+
+    def handle(self, *args, **options):
+        if options['completo']:
+            desde = None
+        elif options['desde']:
+            try:
+                desde = date.fromisoformat(options['desde'])
+            except ValueError:
+                raise CommandError(f"Fecha inválida: {options['desde']} (formato AAAA-MM-DD)")
+        else:
+            # Incremental: el último día resumido puede estar incompleto
+            ultimos = [
+                VentaDiaria.objects.aggregate(m=Max('fecha'))['m'],
+                StockDiario.objects.aggregate(m=Max('fecha'))['m'],
+            ]
+            ultimos = [d for d in ultimos if d]
+            desde = min(ultimos) if ultimos else None
+
+        inicio = time.monotonic()
+        ventas, stock = reconstruir(desde)
+        segundos = time.monotonic() - inicio
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Resúmenes actualizados desde {desde or 'el inicio'}: "
+            f"{ventas} filas de ventas, {stock} filas de stock ({segundos:.1f}s)"
+        ))
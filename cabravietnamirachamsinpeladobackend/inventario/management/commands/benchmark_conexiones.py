@@ -0,0 +1,69 @@
+"""
+Compara la latencia de requests con y sin conexiones persistentes.
+
+Atiende N requests a /api/health/ con el handler WSGI real (las señales
+de inicio/fin de request abren y cierran la conexión igual que gunicorn),
+primero con CONN_MAX_AGE=0 (una conexión por request) y después con
+conexiones persistentes.
+
+Uso:
+    python manage.py benchmark_conexiones
+    python manage.py benchmark_conexiones --requests 500 --ruta /api/productos/dropdown/
+"""
+import statistics
+import time
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = 'Mide la latencia por request con una conexión nueva por request vs conexiones persistentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests por modo (por defecto 200)')
+        parser.add_argument('--ruta', default='/api/health/', help='Ruta a medir (por defecto /api/health/)')
+
+    def handle(self, *args, **options):
+        handler = WSGIHandler()
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS and settings.ALLOWED_HOSTS[0] != '*' else 'localhost'
+        max_age_original = connection.settings_dict['CONN_MAX_AGE']
+        persistente = max_age_original or 60
+
+        try:
+            for nombre, max_age in (('Conexión por request (CONN_MAX_AGE=0)', 0),
+                                    (f'Persistente (CONN_MAX_AGE={persistente})', persistente)):
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = max_age
+                tiempos = self._medir(handler, options['ruta'], host, options['requests'])
+                self._informe(nombre, tiempos)
+        finally:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = max_age_original
+
+    def _medir(self, handler, ruta, host, cantidad):
+        tiempos = []
+        for _ in range(cantidad):
+            environ = {'PATH_INFO': ruta, 'HTTP_HOST': host, 'wsgi.input': BytesIO()}
+            setup_testing_defaults(environ)
+            inicio = time.perf_counter()
+            respuesta = handler(environ, lambda estado, encabezados: None)
+            b''.join(respuesta)
+            respuesta.close()  # dispara request_finished, como el servidor WSGI
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+            if respuesta.status_code >= 400:
+                self.stderr.write(f"{ruta} respondió {respuesta.status_code}")
+                break
+        return tiempos
+
+    def _informe(self, nombre, tiempos):
+        tiempos = sorted(tiempos)
+        p95 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))]
+        self.stdout.write(
+            f"{nombre}: {len(tiempos)} requests, media {statistics.mean(tiempos):.2f} ms, "
+            f"p50 {statistics.median(tiempos):.2f} ms, p95 {p95:.2f} ms"
+        )
@@ -0,0 +1,45 @@
+"""
+Importa el catálogo de productos desde una planilla (.xlsx o .csv).
+
+Uso:
+    python manage.py importar_catalogo Inventario_Repuestos.xlsx
+    python manage.py importar_catalogo catalogo.csv --dry-run   # solo muestra qué cambiaría
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.catalogo import ErrorPlanilla, importar_catalogo, leer_planilla
+
+
+class Command(BaseCommand):
+    help = 'Importa o actualiza productos por código desde una planilla, en lotes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Planilla .xlsx/.xls o .csv')
+        parser.add_argument('--dry-run', action='store_true', help='No escribe nada, solo informa')
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        try:
+            filas = leer_planilla(options['archivo'])
+        except ErrorPlanilla as e:
+            raise CommandError(str(e))
+        lectura = time.monotonic() - inicio
+        self.stdout.write(f"{len(filas)} filas leídas en {lectura:.1f}s")
+
+        def progreso(procesadas, total):
+            self.stdout.write(f"  {procesadas}/{total} productos escritos")
+
+        inicio = time.monotonic()
+        resultado = importar_catalogo(filas, aplicar=not options['dry_run'], progreso=progreso)
+        segundos = time.monotonic() - inicio
+        por_segundo = resultado['filas'] / segundos if segundos else 0
+
+        prefijo = '[dry-run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefijo}{resultado['nuevos']} nuevos, {resultado['actualizados']} actualizados, "
+            f"{resultado['sin_cambios']} sin cambios, {resultado['omitidas']} omitidas, "
+            f"{resultado['categorias_nuevas']} categorías nuevas "
+            f"({segundos:.1f}s, {por_segundo:.0f} filas/s)"
+        ))
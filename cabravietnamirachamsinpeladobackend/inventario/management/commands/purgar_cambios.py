@@ -0,0 +1,27 @@
+"""
+Purga el registro de cambios del catálogo (CambioProducto).
+
+Cada venta deja una fila por producto, así que conviene correrlo
+periódicamente (cron). Los clientes que no sincronizaron dentro del
+período retenido reciben el catálogo completo la próxima vez.
+
+Uso:
+    python manage.py purgar_cambios              # conserva 30 días
+    python manage.py purgar_cambios --dias 7
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.sincronizacion import purgar
+
+
+class Command(BaseCommand):
+    help = 'Borra los cambios del catálogo más viejos que N días (sincronización incremental)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=30, help='Días a conservar (por defecto 30)')
+
+    def handle(self, *args, **options):
+        if options['dias'] < 1:
+            raise CommandError('--dias debe ser al menos 1')
+        borrados = purgar(options['dias'])
+        self.stdout.write(self.style.SUCCESS(f"{borrados} cambios borrados"))
@@ -0,0 +1,21 @@
+"""
+Recalcula total_compras y monto_total_compras de todos los clientes a
+partir de las facturas (un GROUP BY por documento, ver clientes.py).
+
+Las facturas nuevas ya actualizan los contadores al crearse; este
+comando es para la carga inicial o para corregir desvíos.
+
+Uso:
+    python manage.py recalcular_estadisticas_clientes
+"""
+from django.core.management.base import BaseCommand
+
+from inventario.clientes import recalcular
+
+
+class Command(BaseCommand):
+    help = 'Recalcula las estadísticas de compras de los clientes desde las facturas'
+
+    def handle(self, *args, **options):
+        actualizados = recalcular()
+        self.stdout.write(self.style.SUCCESS(f"{actualizados} clientes actualizados"))
@@ -0,0 +1,65 @@
+# Generated by Django 5.0.7 on 2026-10-18 17:25
+
+from django.db import migrations, models
+
+
+def crear_serie_fac(apps, schema_editor):
+    """
+    Crea la serie por defecto 'FAC' continuando desde el último FAC-NNNNNN
+    emitido y, en PostgreSQL, su SEQUENCE.
+    """
+    SerieNumeracion = apps.get_model('inventario', 'SerieNumeracion')
+    Factura = apps.get_model('inventario', 'Factura')
+
+    ultimo = 0
+    for numero in Factura.objects.filter(numero_factura__startswith='FAC-').values_list('numero_factura', flat=True).iterator():
+        try:
+            ultimo = max(ultimo, int(numero.split('-')[-1]))
+        except ValueError:
+            pass
+
+    serie = SerieNumeracion.objects.create(codigo='FAC', prefijo='FAC', digitos=6, ultimo_numero=ultimo)
+
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f"CREATE SEQUENCE IF NOT EXISTS inventario_serie_{serie.pk} START WITH {ultimo + 1}"
+        )
+
+
+def eliminar_secuencias(apps, schema_editor):
+    SerieNumeracion = apps.get_model('inventario', 'SerieNumeracion')
+    if schema_editor.connection.vendor == 'postgresql':
+        for pk in SerieNumeracion.objects.values_list('pk', flat=True):
+            schema_editor.execute(f"DROP SEQUENCE IF EXISTS inventario_serie_{pk}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0013_alter_producto_codigo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SerieNumeracion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codigo', models.CharField(help_text='Identificador de la serie (ej: FAC, CAJA2)', max_length=20, unique=True)),
+                ('prefijo', models.CharField(help_text='Prefijo del número (ej: FAC, 001-002)', max_length=20)),
+                ('digitos', models.PositiveSmallIntegerField(default=6, help_text='Cantidad de dígitos con ceros a la izquierda')),
+                ('ultimo_numero', models.PositiveBigIntegerField(default=0, help_text='Último número emitido (en PostgreSQL solo es el valor inicial de la secuencia)')),
+                ('timbrado', models.CharField(blank=True, max_length=50, null=True)),
+                ('activo', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name': 'Serie de Numeración',
+                'verbose_name_plural': 'Series de Numeración',
+            },
+        ),
+        migrations.AddField(
+            model_name='factura',
+            name='serie',
+            field=models.CharField(default='FAC', help_text='Serie de numeración (SerieNumeracion.codigo)', max_length=20),
+        ),
+        migrations.RunPython(crear_serie_fac, eliminar_secuencias),
+    ]
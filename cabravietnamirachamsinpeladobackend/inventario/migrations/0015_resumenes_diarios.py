@@ -0,0 +1,61 @@
+# Generated by Django 5.0.7 on 2026-10-18 17:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0014_serienumeracion_factura_serie'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VentaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('cantidad', models.IntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=0, help_text='Suma de subtotales de las líneas', max_digits=14)),
+                ('lineas', models.IntegerField(default=0)),
+                ('categoria', models.ForeignKey(blank=True, help_text='Categoría del producto al momento de la venta', null=True, on_delete=django.db.models.deletion.SET_NULL, to='inventario.categoria')),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_diarias', to='inventario.producto')),
+                ('usuario', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Venta Diaria',
+                'verbose_name_plural': 'Ventas Diarias',
+            },
+        ),
+        migrations.CreateModel(
+            name='StockDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('entradas', models.IntegerField(default=0)),
+                ('salidas', models.IntegerField(default=0)),
+                ('stock_cierre', models.IntegerField(default=0)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_diario', to='inventario.producto')),
+            ],
+            options={
+                'verbose_name': 'Stock Diario',
+                'verbose_name_plural': 'Stock Diario',
+                'indexes': [models.Index(fields=['fecha'], name='idx_stock_diario_fecha')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='stockdiario',
+            constraint=models.UniqueConstraint(fields=('fecha', 'producto'), name='uniq_stock_diario'),
+        ),
+        migrations.AddIndex(
+            model_name='ventadiaria',
+            index=models.Index(fields=['fecha'], name='idx_venta_diaria_fecha'),
+        ),
+        migrations.AddConstraint(
+            model_name='ventadiaria',
+            constraint=models.UniqueConstraint(fields=('fecha', 'producto', 'usuario'), name='uniq_venta_diaria', nulls_distinct=False),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Búsqueda de productos (ver inventario/busqueda.py)
+#
+# - Columna generada inventario_producto.busqueda (tsvector STORED) con
+#   nombre, código, marca y modelos compatibles. No está en el modelo:
+#   la calcula PostgreSQL en cada INSERT/UPDATE y solo la lee busqueda.py.
+#   Guardarla evita recalcular to_tsvector por fila al ordenar por ts_rank.
+# - idx_producto_busqueda (GIN sobre la columna) reemplaza a
+#   idx_producto_nombre_gin, que solo cubría el nombre.
+# - pg_trgm + idx_producto_nombre_trgm solo si la extensión está disponible
+#   en el servidor (la búsqueda funciona sin ella, sin tolerancia a typos).
+
+from django.db import migrations, transaction
+
+
+VECTOR = (
+    "setweight(to_tsvector('spanish', coalesce(nombre, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(codigo, '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(marca, '')), 'B') || "
+    "setweight(to_tsvector('spanish', coalesce(modelo_compatible, '')), 'C')"
+)
+
+
+def crear_indice_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if not cursor.fetchone():
+            return
+        try:
+            # pg_trgm es "trusted": el dueño de la base puede instalarla
+            with transaction.atomic():
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except Exception:
+            return
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_producto_nombre_trgm "
+            "ON inventario_producto USING gin (nombre gin_trgm_ops)"
+        )
+
+
+def eliminar_indice_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP INDEX IF EXISTS idx_producto_nombre_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0015_resumenes_diarios'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                'DROP INDEX IF EXISTS idx_producto_nombre_gin;',
+                f'ALTER TABLE inventario_producto ADD COLUMN busqueda tsvector GENERATED ALWAYS AS ({VECTOR}) STORED;',
+                'CREATE INDEX idx_producto_busqueda ON inventario_producto USING gin(busqueda);',
+            ],
+            reverse_sql=[
+                'DROP INDEX IF EXISTS idx_producto_busqueda;',
+                'ALTER TABLE inventario_producto DROP COLUMN IF EXISTS busqueda;',
+                'CREATE INDEX idx_producto_nombre_gin ON inventario_producto USING gin(to_tsvector(\'spanish\', nombre));',
+            ]
+        ),
+        migrations.RunPython(crear_indice_trigramas, eliminar_indice_trigramas),
+    ]
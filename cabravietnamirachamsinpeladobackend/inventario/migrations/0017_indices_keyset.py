@@ -0,0 +1,27 @@
+# Generated by Django 5.0.7 on 2026-10-18 17:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0016_busqueda_productos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='factura',
+            index=models.Index(fields=['-fecha', '-id'], name='idx_factura_fecha_id'),
+        ),
+        migrations.AddIndex(
+            model_name='facturacompra',
+            index=models.Index(fields=['-fecha_emision', '-id'], name='idx_fc_emision_id'),
+        ),
+        migrations.AddIndex(
+            model_name='movimiento',
+            index=models.Index(fields=['-fecha', '-id'], name='idx_mov_fecha_id'),
+        ),
+    ]
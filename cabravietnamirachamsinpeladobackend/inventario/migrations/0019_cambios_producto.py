@@ -0,0 +1,28 @@
+# Generated by Django 5.0.7 on 2026-10-18 17:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0018_versiones_dropdown'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CambioProducto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('alta', 'Alta'), ('modificacion', 'Modificación'), ('baja', 'Baja'), ('stock', 'Stock')], max_length=15)),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('producto', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='inventario.producto')),
+            ],
+            options={
+                'verbose_name': 'Cambio de Producto',
+                'verbose_name_plural': 'Cambios de Productos',
+            },
+        ),
+    ]
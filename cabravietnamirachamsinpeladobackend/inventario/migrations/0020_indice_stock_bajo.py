@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 18:01
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0019_cambios_producto'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(django.db.models.expressions.CombinedExpression(models.F('stock_disponible'), '-', models.F('stock_minimo')), models.F('id'), condition=models.Q(('activo', True), ('stock_disponible__lte', models.F('stock_minimo'))), name='idx_producto_stock_bajo'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.7 on 2026-10-18 18:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0020_indice_stock_bajo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movimiento',
+            name='costo_unitario',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Costo de compra de la entrada (actualiza el costo promedio).', max_digits=15, null=True),
+        ),
+        migrations.AlterField(
+            model_name='producto',
+            name='precio_costo',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Costo promedio ponderado del repuesto (lo recalcula cada entrada con costo, ver stock.py).', max_digits=10),
+        ),
+    ]
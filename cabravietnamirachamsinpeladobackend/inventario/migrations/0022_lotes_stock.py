@@ -0,0 +1,57 @@
+# Generated by Django 5.0.7 on 2026-10-18 18:23
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0021_costo_promedio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoteStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lote', models.CharField(blank=True, default='', help_text='Número de lote del proveedor', max_length=100)),
+                ('fecha_vencimiento', models.DateField(blank=True, null=True)),
+                ('fecha_ingreso', models.DateTimeField(default=django.utils.timezone.now)),
+                ('cantidad_inicial', models.PositiveIntegerField()),
+                ('cantidad_disponible', models.PositiveIntegerField()),
+                ('origen', models.CharField(blank=True, default='', help_text='Documento de ingreso (recepción o factura de compra)', max_length=150)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lotes', to='inventario.producto')),
+            ],
+            options={
+                'verbose_name': 'Lote de Stock',
+                'verbose_name_plural': 'Lotes de Stock',
+            },
+        ),
+        migrations.CreateModel(
+            name='AsignacionLote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cantidad', models.PositiveIntegerField()),
+                ('detalle_factura', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asignaciones_lote', to='inventario.detallefactura')),
+                ('lote', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asignaciones', to='inventario.lotestock')),
+            ],
+            options={
+                'verbose_name': 'Asignación de Lote',
+                'verbose_name_plural': 'Asignaciones de Lotes',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='lotestock',
+            index=models.Index(models.F('producto'), models.F('fecha_vencimiento'), models.F('fecha_ingreso'), models.F('id'), condition=models.Q(('cantidad_disponible__gt', 0)), name='idx_lote_fifo'),
+        ),
+        migrations.AddIndex(
+            model_name='lotestock',
+            index=models.Index(models.F('fecha_vencimiento'), models.F('id'), condition=models.Q(('cantidad_disponible__gt', 0), ('fecha_vencimiento__isnull', False)), name='idx_lote_vencimiento'),
+        ),
+        migrations.AddIndex(
+            model_name='lotestock',
+            index=models.Index(fields=['lote'], name='idx_lote_numero'),
+        ),
+    ]
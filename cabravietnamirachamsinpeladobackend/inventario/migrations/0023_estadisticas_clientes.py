@@ -0,0 +1,25 @@
+# Generated by Django 5.0.7 on 2026-10-18 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0022_lotes_stock'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['numero_documento'], name='idx_cliente_documento'),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(condition=models.Q(('activo', True), ('total_compras__gt', 0)), fields=['-monto_total_compras', '-total_compras', 'id'], name='idx_cliente_top_monto'),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(condition=models.Q(('activo', True), ('total_compras__gt', 0)), fields=['-total_compras', '-monto_total_compras', 'id'], name='idx_cliente_top_compras'),
+        ),
+    ]
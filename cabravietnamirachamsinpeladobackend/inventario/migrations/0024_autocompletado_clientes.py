@@ -0,0 +1,69 @@
+# Autocompletado de clientes (ver inventario/clientes.py)
+#
+# - documento_normalizado / telefono_normalizado: columnas generadas sin
+#   guiones, puntos ni espacios, con índices varchar_pattern_ops para
+#   LIKE 'prefijo%'. idx_cliente_doc_prefijo también cubre la igualdad,
+#   por eso reemplaza a idx_cliente_documento.
+# - idx_cliente_nombre_trgm solo si pg_trgm está disponible (como 0016).
+
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models, transaction
+
+
+def crear_indice_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if not cursor.fetchone():
+            return
+        try:
+            with transaction.atomic():
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except Exception:
+            return
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cliente_nombre_trgm "
+            "ON inventario_cliente USING gin (nombre gin_trgm_ops)"
+        )
+
+
+def eliminar_indice_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP INDEX IF EXISTS idx_cliente_nombre_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0023_estadisticas_clientes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='cliente',
+            name='idx_cliente_documento',
+        ),
+        migrations.AddField(
+            model_name='cliente',
+            name='documento_normalizado',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Upper(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.comparison.Coalesce('numero_documento', models.Value('')), models.Value('-'), models.Value('')), models.Value('.'), models.Value('')), models.Value(' '), models.Value(''))), help_text='Documento sin guiones, puntos ni espacios (80012345-6 -> 800123456)', output_field=models.CharField(max_length=30)),
+        ),
+        migrations.AddField(
+            model_name='cliente',
+            name='telefono_normalizado',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.comparison.Coalesce('telefono', models.Value('')), models.Value('-'), models.Value('')), models.Value('.'), models.Value('')), models.Value(' '), models.Value('')), output_field=models.CharField(max_length=30)),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['documento_normalizado'], name='idx_cliente_doc_prefijo', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['telefono_normalizado'], name='idx_cliente_tel_prefijo', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(crear_indice_trigramas, eliminar_indice_trigramas),
+    ]
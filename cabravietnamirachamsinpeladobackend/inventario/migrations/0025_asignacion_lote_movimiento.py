@@ -0,0 +1,28 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0024_autocompletado_clientes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asignacionlote',
+            name='movimiento',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='asignaciones_lote', to='inventario.movimiento'),
+        ),
+        migrations.AlterField(
+            model_name='asignacionlote',
+            name='detalle_factura',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='asignaciones_lote', to='inventario.detallefactura'),
+        ),
+        migrations.AddConstraint(
+            model_name='asignacionlote',
+            constraint=models.CheckConstraint(check=models.Q(('movimiento__isnull', False), ('detalle_factura__isnull', False), _connector='OR'), name='asignacion_lote_con_origen'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0025_asignacion_lote_movimiento'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cliente',
+            name='monto_total_compras',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=17),
+        ),
+    ]
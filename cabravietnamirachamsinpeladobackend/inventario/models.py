@@ -1,7 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, Replace, Upper
+from django.utils import timezone
 
 class Categoria(models.Model):
     nombre = models.CharField(max_length=100, unique=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, null=True)
 
     def __str__(self):
         return self.nombre
@@ -28,7 +31,7 @@ class Producto(models.Model):
     unidad_medida = models.CharField(max_length=50, blank=True, null=True)
     stock_disponible = models.PositiveIntegerField(default=0)
     stock_minimo = models.PositiveIntegerField(default=0, help_text="Cantidad mínima recomendada en inventario.")
-    precio_costo = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text="Costo al que compras el repuesto.")
+    precio_costo = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text="Costo promedio ponderado del repuesto (lo recalcula cada entrada con costo, ver stock.py).")
     precio_unitario = models.DecimalField(max_digits=10, decimal_places=2)
     impuesto = models.DecimalField(max_digits=5, decimal_places=2, default=0)
     descuento = models.DecimalField(max_digits=5, decimal_places=2, default=0)
@@ -37,9 +40,28 @@ class Producto(models.Model):
     proveedor_texto = models.CharField(max_length=100, blank=True, null=True, 
                                      help_text="Campo de texto para compatibilidad (deprecated)")
 
-    fecha_actualizacion = models.DateTimeField(null=True, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, null=True, blank=True)
     activo = models.BooleanField(default=True, help_text="Indica si el producto está activo o inactivo.")
 
+    class Meta:
+        indexes = [
+            # Reporte de stock bajo (reposicion.py): índice parcial que solo
+            # contiene los productos activos bajo mínimo, ordenados por faltante
+            models.Index(
+                models.F('stock_disponible') - models.F('stock_minimo'), models.F('id'),
+                name='idx_producto_stock_bajo',
+                condition=models.Q(activo=True, stock_disponible__lte=models.F('stock_minimo')),
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # fecha_actualizacion versiona el dropdown (ver condicional.py): se
+        # escribe también en los save(update_fields=[...])
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'fecha_actualizacion' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'fecha_actualizacion']
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.codigo} - {self.nombre}"
 
@@ -55,6 +77,19 @@ class Movimiento(models.Model):
     fecha = models.DateTimeField(auto_now_add=True)
     descripcion = models.TextField(blank=True, null=True)
     usuario = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, blank=True, help_text="Usuario que realizó el movimiento.")
+    costo_unitario = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True,
+                                         help_text="Costo de compra de la entrada (actualiza el costo promedio).")
+
+    class Meta:
+        indexes = [
+            # Paginación keyset del historial (ver pagination.KeysetPagination)
+            models.Index(fields=['-fecha', '-id'], name='idx_mov_fecha_id'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # El signal post_save aplica el stock; si lo rechaza, se revierte también el INSERT
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.tipo.capitalize()} - {self.producto.nombre} ({self.cantidad})"
@@ -63,6 +98,14 @@ class Movimiento(models.Model):
 # Modelos para facturación interna
 from django.contrib.auth.models import User
 
+def _sin_separadores(campo):
+    """Texto del campo sin guiones, puntos ni espacios ('' si es NULL)."""
+    expresion = Coalesce(campo, models.Value(''))
+    for separador in ('-', '.', ' '):
+        expresion = Replace(expresion, models.Value(separador), models.Value(''))
+    return expresion
+
+
 class Cliente(models.Model):
     """
     Modelo para gestionar clientes recurrentes.
@@ -93,16 +136,29 @@ class Cliente(models.Model):
     telefono = models.CharField(max_length=30, blank=True, null=True)
     direccion = models.TextField(blank=True, null=True)
     
+    # Búsqueda (columnas calculadas por PostgreSQL, ver clientes.py)
+    documento_normalizado = models.GeneratedField(
+        expression=Upper(_sin_separadores('numero_documento')),
+        output_field=models.CharField(max_length=30),
+        db_persist=True,
+        help_text='Documento sin guiones, puntos ni espacios (80012345-6 -> 800123456)'
+    )
+    telefono_normalizado = models.GeneratedField(
+        expression=_sin_separadores('telefono'),
+        output_field=models.CharField(max_length=30),
+        db_persist=True
+    )
+    
     # Control
     activo = models.BooleanField(default=True)
     fecha_registro = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
     
-    # Estadisticas (se actualizan automaticamente)
+    # Estadisticas (se actualizan al facturar, ver clientes.py)
     total_compras = models.PositiveIntegerField(default=0)
     monto_total_compras = models.DecimalField(
-        max_digits=15, 
-        decimal_places=0, 
+        max_digits=17, 
+        decimal_places=2,  # como Factura.total (el IVA lleva centavos)
         default=0
     )
     
@@ -110,6 +166,23 @@ class Cliente(models.Model):
         ordering = ['nombre']
         verbose_name = 'Cliente'
         verbose_name_plural = 'Clientes'
+        indexes = [
+            # Autocompletado por prefijo (LIKE 'abc%') y búsqueda exacta por
+            # documento (contadores de cada factura, buscar_por_documento)
+            models.Index(fields=['documento_normalizado'], name='idx_cliente_doc_prefijo',
+                         opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['telefono_normalizado'], name='idx_cliente_tel_prefijo',
+                         opclasses=['varchar_pattern_ops']),
+            # Ranking de clientes (clientes.top): solo los que compraron
+            models.Index(
+                fields=['-monto_total_compras', '-total_compras', 'id'], name='idx_cliente_top_monto',
+                condition=models.Q(activo=True, total_compras__gt=0)
+            ),
+            models.Index(
+                fields=['-total_compras', '-monto_total_compras', 'id'], name='idx_cliente_top_compras',
+                condition=models.Q(activo=True, total_compras__gt=0)
+            ),
+        ]
     
     def __str__(self):
         if self.numero_documento:
@@ -117,6 +190,37 @@ class Cliente(models.Model):
         return self.nombre
 
 
+class SerieNumeracion(models.Model):
+    """
+    Serie de numeración de facturas (ej: una por caja o por timbrado).
+    En PostgreSQL cada serie usa su propia SEQUENCE (ver numeracion.py);
+    en otros motores se incrementa ultimo_numero con UPDATE ... RETURNING.
+    """
+    codigo = models.CharField(max_length=20, unique=True, help_text="Identificador de la serie (ej: FAC, CAJA2)")
+    prefijo = models.CharField(max_length=20, help_text="Prefijo del número (ej: FAC, 001-002)")
+    digitos = models.PositiveSmallIntegerField(default=6, help_text="Cantidad de dígitos con ceros a la izquierda")
+    ultimo_numero = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Último número emitido (en PostgreSQL solo es el valor inicial de la secuencia)"
+    )
+    timbrado = models.CharField(max_length=50, blank=True, null=True)
+    activo = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = 'Serie de Numeración'
+        verbose_name_plural = 'Series de Numeración'
+
+    @property
+    def nombre_secuencia(self):
+        return f"inventario_serie_{self.pk}"
+
+    def formatear(self, numero):
+        return f"{self.prefijo}-{numero:0{self.digitos}d}"
+
+    def __str__(self):
+        return f"{self.codigo} ({self.prefijo})"
+
+
 class Factura(models.Model):
     TIPO_DOCUMENTO_CHOICES = [
         ('ninguno', 'Sin documento'),
@@ -127,6 +231,7 @@ class Factura(models.Model):
     # Datos básicos
     numero_factura = models.CharField(max_length=50, unique=True, blank=True, null=True, 
                                     help_text="Número correlativo de factura")
+    serie = models.CharField(max_length=20, default='FAC', help_text="Serie de numeración (SerieNumeracion.codigo)")
     fecha = models.DateTimeField(auto_now_add=True)
     
     # Datos del cliente
@@ -151,23 +256,16 @@ class Factura(models.Model):
     usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     observaciones = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-fecha', '-id'], name='idx_factura_fecha_id'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.numero_factura:
-            # Generar número correlativo automático
-            ultimo_numero = Factura.objects.filter(
-                numero_factura__isnull=False
-            ).order_by('id').last()
-            
-            if ultimo_numero and ultimo_numero.numero_factura:
-                try:
-                    ultimo_num = int(ultimo_numero.numero_factura.split('-')[-1])
-                    nuevo_num = ultimo_num + 1
-                except (ValueError, IndexError):
-                    nuevo_num = 1
-            else:
-                nuevo_num = 1
-                
-            self.numero_factura = f"FAC-{nuevo_num:06d}"
+            # Número correlativo desde la secuencia de la serie (sin carreras entre workers)
+            from .numeracion import siguiente_numero
+            self.numero_factura = siguiente_numero(self.serie)
         
         super().save(*args, **kwargs)
 
@@ -204,6 +302,7 @@ class Proveedor(models.Model):
     contacto = models.CharField(max_length=100, blank=True, null=True, help_text="Persona de contacto")
     activo = models.BooleanField(default=True)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, null=True)
 
     def __str__(self):
         return self.nombre
@@ -432,6 +531,7 @@ class FacturaCompra(models.Model):
             models.Index(fields=['proveedor', '-fecha_emision']),
             models.Index(fields=['estado', '-fecha_emision']),
             models.Index(fields=['fecha_vencimiento']),
+            models.Index(fields=['-fecha_emision', '-id'], name='idx_fc_emision_id'),
         ]
     
     def __str__(self):
@@ -519,4 +619,168 @@ class DetalleFacturaCompra(models.Model):
     def save(self, *args, **kwargs):
         # Calcular subtotal automáticamente
         self.subtotal = self.cantidad * self.precio_unitario
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+# ==========================================
+# RESÚMENES DIARIOS (mantenidos por resumenes.py)
+# ==========================================
+
+class VentaDiaria(models.Model):
+    """
+    Ventas acumuladas por día, producto y vendedor (rollup de DetalleFactura).
+    Se actualiza al facturar; `manage.py actualizar_resumenes` lo reconstruye.
+    """
+    fecha = models.DateField()
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='ventas_diarias')
+    categoria = models.ForeignKey(Categoria, on_delete=models.SET_NULL, null=True, blank=True,
+                                  help_text="Categoría del producto al momento de la venta")
+    # Se conserva el id aunque se elimine el usuario (no rompe la clave única)
+    usuario = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True)
+    cantidad = models.IntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0,
+                                help_text="Suma de subtotales de las líneas")
+    lineas = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Venta Diaria'
+        verbose_name_plural = 'Ventas Diarias'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fecha', 'producto', 'usuario'],
+                name='uniq_venta_diaria',
+                nulls_distinct=False
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['fecha'], name='idx_venta_diaria_fecha'),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha} - {self.producto_id}: {self.cantidad}"
+
+
+class StockDiario(models.Model):
+    """
+    Entradas, salidas y stock al cierre por día y producto (rollup de Movimiento).
+    Solo existen filas para los días con movimientos.
+    """
+    fecha = models.DateField()
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='stock_diario')
+    entradas = models.IntegerField(default=0)
+    salidas = models.IntegerField(default=0)
+    stock_cierre = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Stock Diario'
+        verbose_name_plural = 'Stock Diario'
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'producto'], name='uniq_stock_diario'),
+        ]
+        indexes = [
+            models.Index(fields=['fecha'], name='idx_stock_diario_fecha'),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha} - {self.producto_id}: {self.stock_cierre}"
+
+
+# ==========================================
+# CAMBIOS DEL CATÁLOGO (sincronización incremental, ver sincronizacion.py)
+# ==========================================
+
+class CambioProducto(models.Model):
+    """
+    Registro de escrituras sobre Producto: altas, ediciones, bajas y
+    variaciones de stock. El id es el token de sincronización que usan
+    los clientes en /api/productos/cambios/?desde=<token>.
+    """
+    TIPOS = [
+        ('alta', 'Alta'),
+        ('modificacion', 'Modificación'),
+        ('baja', 'Baja'),
+        ('stock', 'Stock'),
+    ]
+
+    # Sin FK real: la fila tiene que sobrevivir al borrado del producto
+    producto = models.ForeignKey(Producto, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    tipo = models.CharField(max_length=15, choices=TIPOS)
+    fecha = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Cambio de Producto'
+        verbose_name_plural = 'Cambios de Productos'
+
+    def __str__(self):
+        return f"#{self.id} {self.tipo} {self.producto_id}"
+
+
+# ==========================================
+# LOTES DE STOCK (asignación FIFO, ver lotes.py)
+# ==========================================
+
+class LoteStock(models.Model):
+    """
+    Capa de stock de una entrada por compra (recepción o factura de
+    compra), con su número de lote y vencimiento. Las ventas consumen
+    primero los lotes que vencen antes y, a igual vencimiento, los más
+    antiguos. La suma de cantidad_disponible puede ser menor que el
+    stock del producto: lo ingresado antes de registrar lotes o por
+    movimientos manuales no tiene lote.
+    """
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='lotes')
+    lote = models.CharField(max_length=100, blank=True, default='', help_text="Número de lote del proveedor")
+    fecha_vencimiento = models.DateField(blank=True, null=True)
+    fecha_ingreso = models.DateTimeField(default=timezone.now)
+    cantidad_inicial = models.PositiveIntegerField()
+    cantidad_disponible = models.PositiveIntegerField()
+    origen = models.CharField(max_length=150, blank=True, default='',
+                              help_text="Documento de ingreso (recepción o factura de compra)")
+
+    class Meta:
+        verbose_name = 'Lote de Stock'
+        verbose_name_plural = 'Lotes de Stock'
+        indexes = [
+            # Orden de consumo FIFO (ASC: los sin vencimiento quedan al final); solo lotes con saldo
+            models.Index(
+                models.F('producto'), models.F('fecha_vencimiento'), models.F('fecha_ingreso'), models.F('id'),
+                name='idx_lote_fifo', condition=models.Q(cantidad_disponible__gt=0)
+            ),
+            # Reporte de vencimientos
+            models.Index(
+                models.F('fecha_vencimiento'), models.F('id'),
+                name='idx_lote_vencimiento',
+                condition=models.Q(cantidad_disponible__gt=0, fecha_vencimiento__isnull=False)
+            ),
+            models.Index(fields=['lote'], name='idx_lote_numero'),
+        ]
+
+    def __str__(self):
+        return f"{self.producto_id} - lote {self.lote or 's/n'}: {self.cantidad_disponible}"
+
+
+class AsignacionLote(models.Model):
+    """
+    Cantidad de una salida tomada de un lote (trazabilidad). Las ventas
+    tienen movimiento y línea de factura; las salidas manuales, solo el
+    movimiento.
+    """
+    lote = models.ForeignKey(LoteStock, on_delete=models.CASCADE, related_name='asignaciones')
+    movimiento = models.ForeignKey(Movimiento, on_delete=models.CASCADE, related_name='asignaciones_lote',
+                                   null=True, blank=True)
+    detalle_factura = models.ForeignKey(DetalleFactura, on_delete=models.CASCADE, related_name='asignaciones_lote',
+                                        null=True, blank=True)
+    cantidad = models.PositiveIntegerField()
+
+    class Meta:
+        verbose_name = 'Asignación de Lote'
+        verbose_name_plural = 'Asignaciones de Lotes'
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(movimiento__isnull=False) | models.Q(detalle_factura__isnull=False),
+                name='asignacion_lote_con_origen'
+            ),
+        ]
+
+    def __str__(self):
+        origen = f"detalle {self.detalle_factura_id}" if self.detalle_factura_id else f"movimiento {self.movimiento_id}"
+        return f"Lote {self.lote_id} -> {origen}: {self.cantidad}"
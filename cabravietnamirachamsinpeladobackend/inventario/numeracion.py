@@ -0,0 +1,151 @@
+"""
+Servicio de numeración de facturas por serie.
+
+PostgreSQL: cada SerieNumeracion tiene una SEQUENCE propia. nextval() no
+bloquea ni depende del commit, así que dos workers nunca reciben el mismo
+número. Si la transacción de la factura se revierte el número se pierde
+(hueco); huecos_numeracion() permite detectarlos.
+
+Otros motores (SQLite en desarrollo): UPDATE ... SET ultimo_numero =
+ultimo_numero + n RETURNING sobre la tabla de series (sin huecos, pero
+serializa las transacciones que facturan en la misma serie).
+
+Con settings.NUMERACION_BLOQUE > 1 cada worker reserva un bloque de
+números y los entrega desde memoria; los números no usados al reiniciar
+el worker quedan como huecos. Solo en PostgreSQL: en los otros motores
+el UPDATE se revierte con la factura y el bloque ya entregado a memoria
+se volvería a reservar (números repetidos).
+
+Solo las series activas emiten números (SerieInactiva). Al desactivar
+una serie se descartan los números reservados por este worker; los otros
+workers pueden entregar los que ya tenían en memoria.
+"""
+import re
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import connection
+
+from .models import SerieNumeracion, Factura
+
+_reservas = {}
+_reservas_lock = threading.Lock()
+
+
+class SerieInactiva(Exception):
+    """La serie existe pero está desactivada (no emite números)."""
+
+    def __init__(self, codigo):
+        self.codigo = codigo
+        super().__init__(f"Serie de numeración inactiva: {codigo}")
+
+
+def crear_secuencia(serie):
+    """Crea la SEQUENCE de la serie (solo PostgreSQL)."""
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE SEQUENCE IF NOT EXISTS {connection.ops.quote_name(serie.nombre_secuencia)} "
+            f"START WITH %s",
+            [serie.ultimo_numero + 1]
+        )
+
+
+def eliminar_secuencia(serie):
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP SEQUENCE IF EXISTS {connection.ops.quote_name(serie.nombre_secuencia)}")
+
+
+def descartar_reservas(codigo):
+    """Olvida los números reservados en memoria para la serie (este worker)."""
+    with _reservas_lock:
+        _reservas.pop(codigo, None)
+
+
+def reservar_bloque(codigo, cantidad=1):
+    """
+    Reserva `cantidad` números de la serie activa en una sola consulta.
+    Retorna la lista de números ya formateados (ej: ['FAC-000124']).
+    Lanza SerieNumeracion.DoesNotExist o SerieInactiva.
+    """
+    qn = connection.ops.quote_name
+    tabla = qn(SerieNumeracion._meta.db_table)
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f"SELECT nextval('inventario_serie_' || s.{qn('id')}), s.{qn('prefijo')}, s.{qn('digitos')} "
+                f"FROM {tabla} s CROSS JOIN generate_series(1, %s) "
+                f"WHERE s.{qn('codigo')} = %s AND s.{qn('activo')}",
+                [cantidad, codigo]
+            )
+            filas = cursor.fetchall()
+        else:
+            cursor.execute(
+                f"UPDATE {tabla} SET {qn('ultimo_numero')} = {qn('ultimo_numero')} + %s "
+                f"WHERE {qn('codigo')} = %s AND {qn('activo')} "
+                f"RETURNING {qn('ultimo_numero')}, {qn('prefijo')}, {qn('digitos')}",
+                [cantidad, codigo]
+            )
+            fila = cursor.fetchone()
+            filas = []
+            if fila:
+                ultimo, prefijo, digitos = fila
+                filas = [(n, prefijo, digitos) for n in range(ultimo - cantidad + 1, ultimo + 1)]
+
+    if not filas:
+        # Consulta extra solo en el caso de error, para explicar cuál es
+        if SerieNumeracion.objects.filter(codigo=codigo).exists():
+            raise SerieInactiva(codigo)
+        raise SerieNumeracion.DoesNotExist(f"Serie de numeración inexistente: {codigo}")
+
+    return [f"{prefijo}-{numero:0{digitos}d}" for numero, prefijo, digitos in sorted(filas)]
+
+
+def siguiente_numero(codigo='FAC'):
+    """Siguiente número de factura de la serie (O(1), sin leer la tabla de facturas)."""
+    bloque = getattr(settings, 'NUMERACION_BLOQUE', 1)
+    if bloque <= 1 or connection.vendor != 'postgresql':
+        return reservar_bloque(codigo)[0]
+
+    with _reservas_lock:
+        pendientes = _reservas.setdefault(codigo, deque())
+        if not pendientes:
+            pendientes.extend(reservar_bloque(codigo, bloque))
+        return pendientes.popleft()
+
+
+def huecos_numeracion(codigo='FAC'):
+    """
+    Rangos de números sin factura dentro de la serie, calculados con LAG()
+    sobre los números emitidos. Retorna [(desde, hasta), ...].
+    Ignora los números cuyo sufijo no es numérico (cargados a mano).
+    """
+    serie = SerieNumeracion.objects.get(codigo=codigo)
+    qn = connection.ops.quote_name
+    tabla = qn(Factura._meta.db_table)
+    inicio = len(serie.prefijo) + 2
+    sufijo = f"SUBSTR({qn('numero_factura')}, %s)"
+    if connection.vendor == 'postgresql':
+        numerico = f"{sufijo} ~ '^[0-9]+$'"
+    else:
+        numerico = f"{sufijo} <> '' AND {sufijo} NOT GLOB '*[^0-9]*'"
+    # El prefijo es texto literal: sus % y _ no son comodines
+    patron = re.sub(r'([\\%_])', r'\\\1', serie.prefijo) + '-%'
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT anterior + 1, numero - 1 FROM ("
+            f"  SELECT numero, LAG(numero) OVER (ORDER BY numero) AS anterior FROM ("
+            f"    SELECT CAST({sufijo} AS BIGINT) AS numero "
+            f"    FROM {tabla} WHERE {qn('serie')} = %s AND {qn('numero_factura')} LIKE %s ESCAPE '\\' "
+            f"    AND {numerico}"
+            f"  ) emitidos"
+            f") t WHERE numero - anterior > 1 ORDER BY numero",
+            [inicio, codigo, patron] + [inicio] * numerico.count('%s')
+        )
+        return cursor.fetchall()
@@ -1,4 +1,15 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connection
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class StandardPagination(PageNumberPagination):
@@ -13,3 +24,160 @@ class LargePagination(PageNumberPagination):
     page_size = 1000
     page_size_query_param = 'page_size'
     max_page_size = 5000
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación keyset (por cursor) sobre una clave única ordenada, por
+    defecto (fecha, id) descendente.
+
+    En lugar de OFFSET filtra con una comparación de filas
+    (fecha, id) < (ultima_fecha, ultimo_id) que el índice compuesto
+    resuelve directamente: la página 5000 cuesta lo mismo que la primera.
+
+    - ?cursor=...      cursor opaco tomado de `next` / `previous`
+    - ?page_size=N     tamaño de página (máximo 100)
+    - ?total=1         agrega `total_aproximado` (estimación del planner,
+                       sin COUNT(*) sobre toda la tabla)
+    - ?ordering=fecha  invierte el sentido (solo sobre el primer campo)
+
+    Compatibilidad: con ?page=N, o con ?ordering sobre otro campo, se usa
+    StandardPagination (respuesta con `count`, como antes).
+    """
+    ordering = ('-fecha', '-id')
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+
+    def _modo_paginas(self, request):
+        if 'page' in request.query_params:
+            return True
+        orden = request.query_params.get('ordering')
+        return bool(orden) and orden.lstrip('-') != self.ordering[0].lstrip('-')
+
+    def _orden(self, request):
+        orden = request.query_params.get('ordering')
+        if orden and orden.startswith('-') != self.ordering[0].startswith('-'):
+            # Mismo campo en el otro sentido: invertir toda la clave
+            return tuple(campo[1:] if campo.startswith('-') else f'-{campo}' for campo in self.ordering)
+        return self.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.legacy = None
+        if self._modo_paginas(request):
+            self.legacy = StandardPagination()
+            if not queryset.ordered:
+                queryset = queryset.order_by(*self.ordering)
+            return self.legacy.paginate_queryset(queryset, request, view)
+
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self._tamano_pagina(request)
+        self.orden = self._orden(request)
+        self.campos = [campo.lstrip('-') for campo in self.orden]
+        self.total = self._total_aproximado(queryset) if request.query_params.get('total') else None
+
+        cursor = self._decodificar(request.query_params.get(self.cursor_query_param), queryset.model)
+        self.hacia_atras = bool(cursor and cursor['atras'])
+
+        orden = self.orden
+        if self.hacia_atras:
+            orden = tuple(campo[1:] if campo.startswith('-') else f'-{campo}' for campo in orden)
+        queryset = queryset.order_by(*orden)
+        if cursor:
+            queryset = queryset.filter(self._despues_de(queryset.model, orden, cursor['valores']))
+
+        filas = list(queryset[:self.page_size + 1])
+        hay_mas = len(filas) > self.page_size
+        filas = filas[:self.page_size]
+        if self.hacia_atras:
+            filas.reverse()
+
+        # Hacia adelante: siempre hay anterior si vinimos con cursor.
+        # Hacia atrás: siempre hay siguiente (la página desde la que volvimos).
+        self.siguiente = filas[-1] if filas and (hay_mas if not self.hacia_atras else True) else None
+        self.anterior = filas[0] if filas and (hay_mas if self.hacia_atras else cursor is not None) else None
+        return filas
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        respuesta = OrderedDict([
+            ('next', self._enlace(self.siguiente, atras=False)),
+            ('previous', self._enlace(self.anterior, atras=True)),
+        ])
+        if self.total is not None:
+            respuesta['total_aproximado'] = self.total
+        respuesta['results'] = data
+        return Response(respuesta)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'total_aproximado': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+    # -- helpers --------------------------------------------------------
+
+    def _tamano_pagina(self, request):
+        try:
+            tamano = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(tamano, self.max_page_size))
+
+    def _despues_de(self, modelo, orden, valores):
+        """(c1, c2) < (v1, v2) o > según el sentido; todos los campos en el mismo sentido."""
+        qn = connection.ops.quote_name
+        tabla = qn(modelo._meta.db_table)
+        columnas = ', '.join(f"{tabla}.{qn(modelo._meta.get_field(campo).column)}" for campo in self.campos)
+        operador = '<' if orden[0].startswith('-') else '>'
+        marcadores = ', '.join(['%s'] * len(valores))
+        return RawSQL(f"({columnas}) {operador} ({marcadores})", valores, output_field=BooleanField())
+
+    def _enlace(self, fila, atras):
+        if fila is None:
+            return None
+        valores = [getattr(fila, campo) for campo in self.campos]
+        datos = {'v': [v.isoformat() if hasattr(v, 'isoformat') else v for v in valores], 'a': atras}
+        cursor = urlsafe_b64encode(json.dumps(datos).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def _decodificar(self, cursor, modelo):
+        if not cursor:
+            return None
+        try:
+            datos = json.loads(urlsafe_b64decode(cursor.encode()))
+            if len(datos['v']) != len(self.campos):
+                raise ValueError(cursor)
+            valores = [
+                modelo._meta.get_field(campo).to_python(valor)
+                for campo, valor in zip(self.campos, datos['v'])
+            ]
+            return {'valores': valores, 'atras': bool(datos.get('a'))}
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound('Cursor inválido')
+
+    def _total_aproximado(self, queryset):
+        """Filas estimadas por el planner de PostgreSQL (EXPLAIN), sin recorrer la tabla."""
+        if connection.vendor != 'postgresql':
+            return queryset.count()
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetFechaEmisionPagination(KeysetPagination):
+    """Keyset para facturas de compra: (fecha_emision, id) descendente."""
+    ordering = ('-fecha_emision', '-id')
@@ -0,0 +1,301 @@
+"""
+PDF de facturas generados en el servidor (reportlab).
+
+Reemplaza al PDF que armaba el navegador con jsPDF: mismo diseño, pero se
+dibuja una sola vez y se guarda en disco:
+
+    MEDIA_ROOT/pdf/facturas/<numero>-<huella>.pdf
+    MEDIA_ROOT/pdf/facturas-compra/<numero>-<huella>.pdf
+    MEDIA_ROOT/pdf/dia/<fecha>-<huella>.pdf|zip
+
+La huella es un hash del contenido (payload de impresion.py + VERSION del
+diseño): si la factura cambia, cambia el nombre y se vuelve a dibujar; si
+no, el archivo existente se sirve tal cual con FileResponse (el servidor
+WSGI lo envía con sendfile, sin pasar los bytes por Python). Al dibujar
+una nueva versión se borran las anteriores de la misma factura (si otra
+petición tenía la ruta borrada, views._respuesta_pdf la vuelve a pedir).
+Las respuestas llevan Content-Encoding: identity para que GZipMiddleware
+no las vuelva a comprimir.
+
+Las facturas de compra se imprimen como resumen (proveedor, líneas y
+totales).
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import zipfile
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Prefetch
+
+from .models import Factura, FacturaCompra, DetalleFacturaCompra
+
+# Cambiarla invalida todos los PDF guardados (cambio de diseño)
+VERSION = 1
+
+EMPRESA = 'J&G REPUESTOS'
+EMPRESA_RUC = 'RUC: 1234567890001'
+EMPRESA_DIRECCION = 'Dir: Av. Principal 123, Ciudad'
+
+
+class PDFNoDisponible(Exception):
+    """reportlab no está instalado."""
+
+
+# ==========================================
+# ARCHIVOS
+# ==========================================
+
+def _directorio(tipo):
+    directorio = Path(settings.MEDIA_ROOT) / 'pdf' / tipo
+    directorio.mkdir(parents=True, exist_ok=True)
+    return directorio
+
+
+def _seguro(texto):
+    return re.sub(r'[^\w.-]', '_', str(texto))
+
+
+def huella(contenido):
+    serializado = json.dumps([VERSION, contenido], sort_keys=True, default=str)
+    return hashlib.sha256(serializado.encode()).hexdigest()[:16]
+
+
+def _guardado(tipo, nombre, contenido, generar, extension='pdf'):
+    """
+    Ruta del archivo <nombre>-<huella>.<extension>; si no existe lo crea con
+    generar(archivo) (escritura atómica) y borra las versiones anteriores.
+    """
+    directorio = _directorio(tipo)
+    nombre = _seguro(nombre)
+    ruta = directorio / f'{nombre}-{huella(contenido)}.{extension}'
+    if ruta.exists():
+        return ruta
+
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as archivo:
+            generar(archivo)
+        os.replace(temporal, ruta)
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+    # Solo <nombre>-<huella>.<extension>: no otro documento cuyo número
+    # empiece con "<nombre>-"
+    version = re.compile(rf'{re.escape(nombre)}-[0-9a-f]{{16}}\.{extension}')
+    for anterior in directorio.glob(f'{nombre}-*.{extension}'):
+        if anterior != ruta and version.fullmatch(anterior.name):
+            anterior.unlink(missing_ok=True)
+    return ruta
+
+
+# ==========================================
+# DIBUJO
+# ==========================================
+
+def _guaranies(valor):
+    return f"Gs. {round(valor or 0):,}".replace(',', '.')
+
+
+def _reportlab():
+    try:
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.lib.units import mm
+        from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    except ImportError:
+        raise PDFNoDisponible("Generar PDF requiere reportlab (pip install reportlab)")
+    return colors, A4, getSampleStyleSheet(), mm, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+
+def _documento(archivo, documentos):
+    """Dibuja en `archivo` una o más facturas [(titulo, encabezado, columnas, filas, totales, pie)]."""
+    colors, A4, estilos, mm, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle = _reportlab()
+    oscuro = colors.Color(52 / 255, 58 / 255, 64 / 255)
+    ancho = 170 * mm
+
+    historia = []
+    for indice, (titulo, encabezado, columnas, filas, totales, pie) in enumerate(documentos):
+        if indice:
+            historia.append(PageBreak())
+        cabecera = Table(
+            [[EMPRESA, titulo], [EMPRESA_RUC, encabezado[0]], [EMPRESA_DIRECCION, encabezado[1]]],
+            colWidths=[ancho / 2] * 2,
+        )
+        cabecera.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), oscuro),
+            ('TEXTCOLOR', (0, 0), (0, -1), colors.white),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 14),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ]))
+        historia += [cabecera, Spacer(1, 6 * mm)]
+        historia += [Paragraph(linea, estilos['Normal']) for linea in encabezado[2:]]
+        historia.append(Spacer(1, 6 * mm))
+
+        tabla = Table([columnas] + filas, colWidths=[30 * mm, 65 * mm, 20 * mm, 27 * mm, 28 * mm], repeatRows=1)
+        tabla.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(240 / 255, 240 / 255, 240 / 255)),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),
+            ('LINEBELOW', (0, 0), (-1, 0), 0.5, colors.grey),
+        ]))
+        historia += [tabla, Spacer(1, 4 * mm)]
+
+        resumen = Table(totales, colWidths=[ancho - 55 * mm, 27 * mm, 28 * mm])
+        resumen.setStyle(TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+            ('FONTSIZE', (0, -1), (-1, -1), 12),
+            ('LINEABOVE', (0, 0), (-1, 0), 0.5, colors.grey),
+        ]))
+        historia += [resumen, Spacer(1, 8 * mm)]
+        historia += [Paragraph(linea, estilos['Italic']) for linea in pie]
+
+    SimpleDocTemplate(
+        archivo, pagesize=A4, leftMargin=20 * mm, rightMargin=20 * mm, topMargin=15 * mm, bottomMargin=15 * mm,
+        title=documentos[0][0] if len(documentos) == 1 else EMPRESA,
+    ).build(historia)
+
+
+def _escapar(texto):
+    return str(texto or '').replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _venta(datos):
+    """Payload de impresion.py -> partes de _documento()."""
+    cliente = datos['cliente']
+    encabezado = [
+        f"Fecha: {datos['fecha']}", f"Hora: {datos['hora']}",
+        f"<b>Cliente:</b> {_escapar(cliente['nombre'])} "
+        f"({_escapar(cliente['tipo_documento'])}: {_escapar(cliente['numero_documento'] or 'N/A')})",
+        f"Email: {_escapar(cliente['email'] or 'N/A')} - Teléfono: {_escapar(cliente['telefono'] or 'N/A')}",
+        f"Dirección: {_escapar(cliente['direccion'] or 'N/A')}",
+    ]
+    filas = [
+        [d['codigo'] or 'N/A', d['producto'][:40], d['cantidad'],
+         _guaranies(d['precio_unitario']), _guaranies(d['subtotal'])]
+        for d in datos['detalles']
+    ]
+    totales = [['', 'SUBTOTAL:', _guaranies(datos['subtotal'])]]
+    if datos['descuento_total']:
+        totales.append(['', 'DESCUENTO:', f"-{_guaranies(datos['descuento_total'])}"])
+    totales += [['', 'IVA:', _guaranies(datos['impuesto_total'])], ['', 'TOTAL:', _guaranies(datos['total'])]]
+    pie = []
+    if datos['observaciones']:
+        pie.append(f"Observaciones: {_escapar(datos['observaciones'])}")
+    pie += [f"Gracias por su compra - {_escapar(EMPRESA.title())}",
+            f"Vendedor: {_escapar(datos['vendedor']['nombre'] or 'Sistema')}"]
+    return (f"FACTURA: {datos['numero_factura']}", encabezado,
+            ['CÓDIGO', 'DESCRIPCIÓN', 'CANT', 'PRECIO', 'SUBTOTAL'], filas, totales, pie)
+
+
+def _compra(datos):
+    encabezado = [
+        f"Emisión: {datos['fecha_emision']}", f"Vencimiento: {datos['fecha_vencimiento'] or '-'}",
+        f"<b>Proveedor:</b> {_escapar(datos['proveedor'])}",
+        f"Timbrado: {_escapar(datos['timbrado'] or 'N/A')} - {datos['tipo_factura']} - Estado: {datos['estado']}",
+    ]
+    filas = [
+        [d['codigo'], (d['descripcion'] or d['producto'])[:40], d['cantidad'],
+         _guaranies(d['precio_unitario']), _guaranies(d['subtotal'])]
+        for d in datos['detalles']
+    ]
+    totales = [
+        ['', 'SUBTOTAL:', _guaranies(datos['subtotal'])],
+        ['', 'DESCUENTO:', f"-{_guaranies(datos['descuento'])}"],
+        ['', 'IMPUESTOS:', _guaranies(datos['impuestos'])],
+        ['', 'TOTAL:', _guaranies(datos['total'])],
+    ]
+    pie = [f"Observaciones: {_escapar(datos['observaciones'])}"] if datos['observaciones'] else []
+    return (f"COMPRA: {datos['numero_factura']}", encabezado,
+            ['CÓDIGO', 'DESCRIPCIÓN', 'CANT', 'PRECIO', 'SUBTOTAL'], filas, totales, pie)
+
+
+# ==========================================
+# FACTURAS
+# ==========================================
+
+def factura(pk):
+    """Ruta del PDF de la factura de venta o None si no existe."""
+    from .impresion import datos_factura
+    datos = datos_factura(pk)
+    if datos is None:
+        return None
+    return _guardado('facturas', datos['numero_factura'], datos, lambda archivo: _documento(archivo, [_venta(datos)]))
+
+
+def _datos_compra(pk):
+    compra = (
+        FacturaCompra.objects.select_related('proveedor')
+        .prefetch_related(Prefetch(
+            'detalles', queryset=DetalleFacturaCompra.objects.select_related('producto').order_by('id')
+        ))
+        .filter(pk=pk).first()
+    )
+    if compra is None:
+        return None
+    return {
+        'numero_factura': compra.numero_factura,
+        'proveedor': compra.proveedor.nombre,
+        'fecha_emision': compra.fecha_emision.strftime('%d/%m/%Y'),
+        'fecha_vencimiento': compra.fecha_vencimiento.strftime('%d/%m/%Y') if compra.fecha_vencimiento else None,
+        'tipo_factura': compra.get_tipo_factura_display(),
+        'estado': compra.get_estado_display(),
+        'timbrado': compra.timbrado,
+        'detalles': [
+            {
+                'codigo': detalle.producto.codigo,
+                'producto': detalle.producto.nombre,
+                'descripcion': detalle.descripcion,
+                'cantidad': float(detalle.cantidad),
+                'precio_unitario': float(detalle.precio_unitario),
+                'subtotal': float(detalle.subtotal),
+            }
+            for detalle in compra.detalles.all()
+        ],
+        'subtotal': float(compra.subtotal),
+        'descuento': float(compra.descuento),
+        'impuestos': float(compra.impuestos),
+        'total': float(compra.total),
+        'observaciones': compra.observaciones,
+    }
+
+
+def factura_compra(pk):
+    """Ruta del PDF resumen de la factura de compra o None si no existe."""
+    datos = _datos_compra(pk)
+    if datos is None:
+        return None
+    return _guardado('facturas-compra', datos['numero_factura'], datos,
+                     lambda archivo: _documento(archivo, [_compra(datos)]))
+
+
+def facturas_del_dia(fecha, formato='pdf'):
+    """
+    Todas las facturas de venta del día en un PDF (una por página) o en un
+    zip con un PDF por factura. None si no hubo facturas.
+    """
+    from .impresion import datos_facturas
+    ids = list(Factura.objects.filter(fecha__date=fecha).order_by('id').values_list('id', flat=True))
+    if not ids:
+        return None
+    facturas = datos_facturas(ids)
+
+    if formato == 'zip':
+        def generar(archivo):
+            with zipfile.ZipFile(archivo, 'w', zipfile.ZIP_STORED) as comprimido:
+                for datos in facturas:
+                    ruta = _guardado('facturas', datos['numero_factura'], datos,
+                                     lambda destino, datos=datos: _documento(destino, [_venta(datos)]))
+                    comprimido.write(ruta, f"factura-{_seguro(datos['numero_factura'])}.pdf")
+        return _guardado('dia', fecha.isoformat(), facturas, generar, extension='zip')
+
+    return _guardado('dia', fecha.isoformat(), facturas,
+                     lambda archivo: _documento(archivo, [_venta(datos) for datos in facturas]))
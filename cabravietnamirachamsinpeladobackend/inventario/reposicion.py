@@ -0,0 +1,115 @@
+"""
+Reporte de stock bajo con cantidades sugeridas de reposición.
+
+1. Productos activos con stock_disponible <= stock_minimo, ordenados por
+   faltante (stock - mínimo, el más negativo primero). El filtro y el
+   orden coinciden con el índice parcial idx_producto_stock_bajo, que
+   solo contiene esos productos: la consulta no recorre el catálogo.
+2. La página se completa con dos consultas más, solo para sus productos:
+   - salidas de los últimos `dias` días (resumen StockDiario, ver resumenes.py)
+   - proveedor del producto (ProductoProveedor: el principal o, si no hay,
+     el de menor tiempo de entrega)
+
+Cantidad sugerida:
+
+    venta_diaria = salidas del período / dias
+    objetivo     = venta_diaria * (tiempo_entrega + cobertura) + stock_minimo
+    sugerida     = objetivo - stock_disponible   (redondeada hacia arriba)
+
+Es decir: cubrir lo que se venderá mientras llega el pedido y los
+`cobertura` días siguientes, sin bajar del mínimo. Sin ventas en el
+período la sugerencia es volver al stock mínimo.
+"""
+import math
+from datetime import timedelta
+
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import Producto, ProductoProveedor, StockDiario
+
+DIAS_POR_DEFECTO = 30
+DIAS_MAXIMO = 365
+COBERTURA_POR_DEFECTO = 14
+COBERTURA_MAXIMA = 180
+# Si el producto no tiene proveedor cargado
+TIEMPO_ENTREGA_POR_DEFECTO = 7
+
+
+def parametros(params):
+    """(dias, cobertura) de los query params. Lanza ValueError si son inválidos."""
+    dias = int(params.get('dias') or DIAS_POR_DEFECTO)
+    if not 1 <= dias <= DIAS_MAXIMO:
+        raise ValueError(f"'dias' debe estar entre 1 y {DIAS_MAXIMO}")
+    cobertura = int(params.get('cobertura') or COBERTURA_POR_DEFECTO)
+    if not 0 <= cobertura <= COBERTURA_MAXIMA:
+        raise ValueError(f"'cobertura' debe estar entre 0 y {COBERTURA_MAXIMA}")
+    return dias, cobertura
+
+
+def productos_bajo_minimo():
+    """Queryset (values) de los productos activos bajo mínimo, más urgentes primero."""
+    return Producto.objects.filter(
+        activo=True, stock_disponible__lte=F('stock_minimo')
+    ).order_by(
+        F('stock_disponible') - F('stock_minimo'), 'id'
+    ).values(
+        'id', 'codigo', 'nombre', 'stock_disponible', 'stock_minimo', categoria_nombre=F('categoria__nombre')
+    )
+
+
+def _salidas(ids, dias, hoy):
+    desde = hoy - timedelta(days=dias - 1)
+    return dict(
+        StockDiario.objects.filter(producto_id__in=ids, fecha__gte=desde, fecha__lte=hoy)
+        .values('producto_id').annotate(total=Sum('salidas')).values_list('producto_id', 'total')
+    )
+
+
+def _proveedores(ids):
+    """{producto_id: ProductoProveedor} con el principal o, si no hay, el más rápido."""
+    proveedores = {}
+    relaciones = ProductoProveedor.objects.filter(
+        producto_id__in=ids, activo=True, proveedor__activo=True
+    ).select_related('proveedor').order_by('-es_principal', 'tiempo_entrega_dias', 'id')
+    for relacion in relaciones:
+        proveedores.setdefault(relacion.producto_id, relacion)
+    return proveedores
+
+
+def sugerencias(productos, dias=DIAS_POR_DEFECTO, cobertura=COBERTURA_POR_DEFECTO, hoy=None):
+    """Completa una página de productos_bajo_minimo() con la sugerencia de reposición."""
+    hoy = hoy or timezone.localdate()
+    ids = [p['id'] for p in productos]
+    salidas = _salidas(ids, dias, hoy)
+    proveedores = _proveedores(ids)
+
+    resultado = []
+    for producto in productos:
+        venta_diaria = (salidas.get(producto['id']) or 0) / dias
+        relacion = proveedores.get(producto['id'])
+        tiempo_entrega = relacion.tiempo_entrega_dias if relacion else TIEMPO_ENTREGA_POR_DEFECTO
+
+        objetivo = venta_diaria * (tiempo_entrega + cobertura) + producto['stock_minimo']
+        sugerida = max(0, math.ceil(round(objetivo - producto['stock_disponible'], 6)))
+
+        resultado.append({
+            'id': producto['id'],
+            'codigo': producto['codigo'],
+            'nombre': producto['nombre'],
+            'categoria': producto['categoria_nombre'],
+            'stock_disponible': producto['stock_disponible'],
+            'stock_minimo': producto['stock_minimo'],
+            'faltante': producto['stock_minimo'] - producto['stock_disponible'],
+            'venta_diaria': round(venta_diaria, 2),
+            'dias_restantes': round(producto['stock_disponible'] / venta_diaria, 1) if venta_diaria else None,
+            'tiempo_entrega_dias': tiempo_entrega,
+            'proveedor': {
+                'id': relacion.proveedor_id,
+                'nombre': relacion.proveedor.nombre,
+                'precio_compra': float(relacion.precio_compra),
+            } if relacion else None,
+            'cantidad_sugerida': sugerida,
+            'costo_estimado': float(relacion.precio_compra * sugerida) if relacion else None,
+        })
+    return resultado
@@ -0,0 +1,172 @@
+"""
+Mantenimiento de los resúmenes diarios (VentaDiaria y StockDiario).
+
+Al escribir: cada factura y cada lote de movimientos acumula en su fila
+del día con INSERT ... ON CONFLICT DO UPDATE (una sentencia por lote, sin
+leer la fila antes). Las filas se agregan en memoria antes del upsert
+porque ON CONFLICT no admite actualizar la misma fila dos veces.
+
+Reconstrucción: reconstruir() recalcula los días desde una fecha a partir
+de DetalleFactura y Movimiento (comando `manage.py actualizar_resumenes`).
+Sirve para cargar el historial existente y para corregir ediciones
+hechas por fuera de la API (ej: cambios de fecha con .update()).
+"""
+from collections import defaultdict
+from datetime import datetime, time
+
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DetalleFactura, Movimiento, Producto, VentaDiaria, StockDiario
+from .stock import delta_movimiento
+
+LOTE = 1000
+
+
+def _dia(fecha):
+    return timezone.localdate(fecha) if fecha else timezone.localdate()
+
+
+def _upsert(modelo, columnas, clave, acumular, reemplazar, filas):
+    """INSERT de varias filas; en conflicto suma `acumular` y pisa `reemplazar`."""
+    if not filas:
+        return
+    qn = connection.ops.quote_name
+    tabla = qn(modelo._meta.db_table)
+    valores = ", ".join(["(" + ", ".join(["%s"] * len(columnas)) + ")"] * len(filas))
+    asignaciones = [f"{qn(c)} = {tabla}.{qn(c)} + EXCLUDED.{qn(c)}" for c in acumular]
+    asignaciones += [f"{qn(c)} = EXCLUDED.{qn(c)}" for c in reemplazar]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {tabla} ({', '.join(qn(c) for c in columnas)}) VALUES {valores} "
+            f"ON CONFLICT ({', '.join(qn(c) for c in clave)}) DO UPDATE SET {', '.join(asignaciones)}",
+            [valor for fila in filas for valor in fila]
+        )
+
+
+def registrar_ventas(factura, detalles, signo=1):
+    """
+    Suma (o resta con signo=-1) las líneas de una factura en VentaDiaria.
+    `detalles` son instancias de DetalleFactura de esa factura. Al restar
+    la fila ya existe, así que no hace falta cargar la categoría.
+    """
+    acumulado = defaultdict(lambda: [None, 0, 0, 0])
+    for detalle in detalles:
+        fila = acumulado[detalle.producto_id]
+        if signo > 0:
+            fila[0] = detalle.producto.categoria_id
+        fila[1] += signo * detalle.cantidad
+        fila[2] += signo * detalle.subtotal
+        fila[3] += signo
+
+    dia = _dia(factura.fecha)
+    _upsert(
+        VentaDiaria,
+        columnas=['fecha', 'producto_id', 'usuario_id', 'categoria_id', 'cantidad', 'total', 'lineas'],
+        clave=['fecha', 'producto_id', 'usuario_id'],
+        acumular=['cantidad', 'total', 'lineas'],
+        reemplazar=[],
+        filas=[
+            (dia, producto_id, factura.usuario_id, categoria_id, cantidad, total, lineas)
+            for producto_id, (categoria_id, cantidad, total, lineas) in acumulado.items()
+        ]
+    )
+
+
+def registrar_stock(movimientos, saldos, fecha=None):
+    """
+    Acumula entradas/salidas del día y fija el stock al cierre.
+    `saldos` es {producto_id: nuevo_stock} tal como lo retorna el UPDATE
+    de stock.py (la fila del producto sigue bloqueada hasta el commit, así
+    que el último saldo escrito es el vigente).
+    """
+    acumulado = defaultdict(lambda: [0, 0])
+    for movimiento in movimientos:
+        if delta_movimiento(movimiento.tipo, movimiento.cantidad) > 0:
+            acumulado[movimiento.producto_id][0] += movimiento.cantidad
+        else:
+            acumulado[movimiento.producto_id][1] += movimiento.cantidad
+
+    dia = _dia(fecha)
+    _upsert(
+        StockDiario,
+        columnas=['fecha', 'producto_id', 'entradas', 'salidas', 'stock_cierre'],
+        clave=['fecha', 'producto_id'],
+        acumular=['entradas', 'salidas'],
+        reemplazar=['stock_cierre'],
+        filas=[
+            (dia, producto_id, entradas, salidas, saldos[producto_id])
+            for producto_id, (entradas, salidas) in acumulado.items()
+            if producto_id in saldos
+        ]
+    )
+
+
+def reconstruir(desde=None):
+    """
+    Recalcula VentaDiaria y StockDiario desde `desde` (date) hasta hoy.
+    Sin `desde` reconstruye todo el historial. Retorna (filas_ventas, filas_stock).
+    """
+    inicio = timezone.make_aware(datetime.combine(desde, time.min)) if desde else None
+
+    with transaction.atomic():
+        # Ventas: GROUP BY día, producto, vendedor
+        detalles = DetalleFactura.objects.all()
+        if desde:
+            VentaDiaria.objects.filter(fecha__gte=desde).delete()
+            detalles = detalles.filter(factura__fecha__gte=inicio)
+        else:
+            VentaDiaria.objects.all().delete()
+        filas = (
+            detalles.annotate(dia=TruncDate('factura__fecha'))
+            .values('dia', 'producto_id', 'producto__categoria_id', 'factura__usuario_id')
+            .annotate(cantidad=Sum('cantidad'), total=Sum('subtotal'), lineas=Count('id'))
+            .order_by()
+        )
+        ventas = [
+            VentaDiaria(
+                fecha=f['dia'], producto_id=f['producto_id'], usuario_id=f['factura__usuario_id'],
+                categoria_id=f['producto__categoria_id'], cantidad=f['cantidad'], total=f['total'], lineas=f['lineas']
+            )
+            for f in filas.iterator(chunk_size=LOTE)
+        ]
+        VentaDiaria.objects.bulk_create(ventas, batch_size=LOTE)
+
+        # Stock: entradas/salidas por día y saldo al cierre hacia atrás
+        # desde el stock actual (saldo_dia = saldo_siguiente - neto_siguiente)
+        movimientos = Movimiento.objects.all()
+        if desde:
+            StockDiario.objects.filter(fecha__gte=desde).delete()
+            movimientos = movimientos.filter(fecha__gte=inicio)
+        else:
+            StockDiario.objects.all().delete()
+        filas = list(
+            movimientos.annotate(dia=TruncDate('fecha'))
+            .values('dia', 'producto_id')
+            .annotate(
+                entradas=Sum('cantidad', filter=Q(tipo='entrada'), default=0),
+                salidas=Sum('cantidad', filter=Q(tipo='salida'), default=0),
+            )
+            .order_by('producto_id', '-dia')
+        )
+        actual = dict(
+            Producto.objects.filter(pk__in={f['producto_id'] for f in filas})
+            .values_list('id', 'stock_disponible')
+        )
+        stock = []
+        saldo, producto_id = 0, None
+        for f in filas:
+            if f['producto_id'] != producto_id:
+                producto_id = f['producto_id']
+                saldo = actual.get(producto_id, 0)
+            stock.append(StockDiario(
+                fecha=f['dia'], producto_id=producto_id,
+                entradas=f['entradas'], salidas=f['salidas'], stock_cierre=saldo
+            ))
+            saldo -= f['entradas'] - f['salidas']
+        StockDiario.objects.bulk_create(stock, batch_size=LOTE)
+
+    return len(ventas), len(stock)
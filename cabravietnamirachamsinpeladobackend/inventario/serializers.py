@@ -3,8 +3,11 @@ from decimal import Decimal
 from .models import (
     Categoria, Subcategoria, Producto, Movimiento, Factura, DetalleFactura, 
     Proveedor, Cliente, FacturaCompra, DetalleFacturaCompra,
-    OrdenCompra, DetalleOrdenCompra, RecepcionMercaderia, DetalleRecepcion
+    OrdenCompra, DetalleOrdenCompra, RecepcionMercaderia, DetalleRecepcion,
+    SerieNumeracion
 )
+from .stock import StockInsuficiente
+from .numeracion import SerieInactiva
 
 # ==========================================
 # SERIALIZERS DE CLIENTE
@@ -53,8 +56,23 @@ class ClienteDropdownSerializer(serializers.ModelSerializer):
 
 
 # Serializers para facturación
+class ProductoIdField(serializers.PrimaryKeyRelatedField):
+    """
+    ID de producto validado solo por tipo, sin consultar la base.
+    FacturaSerializer.create resuelve todos los productos de la factura
+    en un único SELECT ... FOR UPDATE (evita una consulta por línea).
+    """
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
 class DetalleFacturaSerializer(serializers.ModelSerializer):
-    producto = serializers.PrimaryKeyRelatedField(queryset=Producto.objects.all())
+    producto = ProductoIdField(queryset=Producto.objects.all())
 
     class Meta:
         model = DetalleFactura
@@ -86,7 +104,7 @@ class FacturaSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Factura
-        fields = ['id', 'numero_factura', 'fecha', 'tipo_documento', 'numero_documento', 
+        fields = ['id', 'numero_factura', 'serie', 'fecha', 'tipo_documento', 'numero_documento', 
                  'nombre_cliente', 'email_cliente', 'telefono_cliente', 'direccion_cliente',
                  'subtotal', 'descuento_total', 'exonerado_iva', 'impuesto_total', 'total', 'usuario', 
                  'observaciones', 'detalles']
@@ -94,12 +112,21 @@ class FacturaSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         """
-        Crea una factura con transacción atómica.
-        El stock se actualiza AUTOMÁTICAMENTE via signal post_save de Movimiento.
+        Crea una factura con transacción atómica y cantidad de consultas
+        constante (no depende del número de líneas):
+        un SELECT ... FOR UPDATE de todos los productos, un INSERT de la
+        factura, bulk_create de detalles y movimientos, un único UPDATE
+        de stock (ver stock.registrar_movimientos), un upsert por cada
+        resumen diario (ver resumenes.py), la asignación de lotes de las
+        salidas (ver lotes.py) y un UPDATE de las estadísticas del cliente
+        (ver clientes.py).
         """
         from django.db import transaction
         from decimal import Decimal, ROUND_HALF_UP
         from .models import Movimiento, DetalleFactura
+        from .stock import registrar_movimientos
+        from .resumenes import registrar_ventas
+        from .clientes import registrar_compra
         
         # ═══════════════════════════════════════════════════════════
         # CONFIGURACIÓN DE PARAGUAY
@@ -117,51 +144,48 @@ class FacturaSerializer(serializers.ModelSerializer):
             validated_data.pop('impuesto_total', None)
             
             # ═══════════════════════════════════════════════════════════
-            # FASE 1: PRE-VALIDACIÓN COMPLETA (antes de crear registros)
+            # FASE 1: BLOQUEAR PRODUCTOS (un solo SELECT ... FOR UPDATE)
+            # ═══════════════════════════════════════════════════════════
+            ids = {detalle['producto'] for detalle in detalles_data}
+            productos = {
+                p.id: p for p in Producto.objects.select_for_update().filter(pk__in=ids).order_by('id')
+            }
+            faltantes = ids - set(productos)
+            if faltantes:
+                raise serializers.ValidationError({
+                    'detalles': f"Producto inexistente: {', '.join(str(pk) for pk in sorted(faltantes))}"
+                })
+            
+            # ═══════════════════════════════════════════════════════════
+            # FASE 2: PRE-VALIDACIÓN Y CÁLCULO EN MEMORIA
             # ═══════════════════════════════════════════════════════════
+            solicitado = {}
             for detalle in detalles_data:
-                producto = detalle['producto']
-                cantidad = detalle['cantidad']
-                
-                # Refrescar desde DB (evita problemas de concurrencia)
-                producto.refresh_from_db()
-                
-                # Validar stock
+                solicitado[detalle['producto']] = solicitado.get(detalle['producto'], 0) + detalle['cantidad']
+            
+            for producto_id, cantidad in solicitado.items():
+                producto = productos[producto_id]
+                # Validar stock (filas bloqueadas: ninguna otra caja puede venderlas ahora)
                 if producto.stock_disponible < cantidad:
                     raise serializers.ValidationError({
                         'detalles': f"Stock insuficiente para '{producto.nombre}'. "
                                     f"Disponible: {producto.stock_disponible}, "
                                     f"Solicitado: {cantidad}"
                     })
-                
-                # Validar precio
-                precio = detalle.get('precio_unitario', producto.precio_unitario)
-                if not precio or precio <= 0:
-                    raise serializers.ValidationError({
-                        'detalles': f"Precio inválido para '{producto.nombre}'"
-                    })
-            
-            # ═══════════════════════════════════════════════════════════
-            # FASE 2: CREAR FACTURA (con totales temporales)
-            # ═══════════════════════════════════════════════════════════
-            factura = Factura.objects.create(
-                usuario=usuario,
-                subtotal=Decimal('0'),
-                impuesto_total=Decimal('0'),
-                total=Decimal('0'),
-                **validated_data
-            )
             
-            # ═══════════════════════════════════════════════════════════
-            # FASE 3: PROCESAR DETALLES
-            # ═══════════════════════════════════════════════════════════
+            lineas = []
             subtotal_acumulado = Decimal('0')
-            
             for detalle in detalles_data:
-                producto = detalle['producto']
+                producto = productos[detalle['producto']]
                 cantidad = detalle['cantidad']
                 precio_unitario = detalle.get('precio_unitario', producto.precio_unitario)
                 
+                # Validar precio
+                if not precio_unitario or precio_unitario <= 0:
+                    raise serializers.ValidationError({
+                        'detalles': f"Precio inválido para '{producto.nombre}'"
+                    })
+                
                 # Convertir a Decimal con precisión
                 precio_unitario = Decimal(str(precio_unitario))
                 cantidad_decimal = Decimal(str(cantidad))
@@ -171,32 +195,13 @@ class FacturaSerializer(serializers.ModelSerializer):
                     Decimal('0.01'), 
                     rounding=ROUND_HALF_UP
                 )
-                
-                # Crear detalle de factura
-                DetalleFactura.objects.create(
-                    factura=factura,
-                    producto=producto,
-                    cantidad=cantidad,
-                    precio_unitario=precio_unitario,
-                    subtotal=subtotal_detalle
-                )
-                
-                # ⚠️ CRÍTICO: NO modificar stock aquí
-                # El signal post_save de Movimiento se encarga automáticamente
-                Movimiento.objects.create(
-                    producto=producto,
-                    tipo='salida',
-                    cantidad=cantidad,
-                    descripcion=f"Venta - Factura #{factura.numero_factura}",
-                    usuario=usuario
-                )
-                
+                lineas.append((producto, cantidad, precio_unitario, subtotal_detalle))
                 subtotal_acumulado += subtotal_detalle
             
             # ═══════════════════════════════════════════════════════════
-            # FASE 4: CALCULAR TOTALES FINALES
+            # FASE 3: CALCULAR TOTALES FINALES
             # ═══════════════════════════════════════════════════════════
-            descuento_total = Decimal(str(validated_data.get('descuento_total', 0)))
+            descuento_total = Decimal(str(validated_data.pop('descuento_total', 0)))
             
             # Subtotal después de descuento (base imponible)
             base_imponible = (subtotal_acumulado - descuento_total).quantize(
@@ -205,7 +210,7 @@ class FacturaSerializer(serializers.ModelSerializer):
             )
             
             # Calcular IVA 10% sobre base imponible (solo si no está exonerado)
-            exonerado_iva = validated_data.get('exonerado_iva', False)
+            exonerado_iva = validated_data.pop('exonerado_iva', False)
             if exonerado_iva:
                 impuesto_total = Decimal('0.00')
             else:
@@ -217,17 +222,74 @@ class FacturaSerializer(serializers.ModelSerializer):
             # Total final
             total_final = base_imponible + impuesto_total
             
-            # Actualizar factura con totales calculados
-            factura.subtotal = subtotal_acumulado
-            factura.descuento_total = descuento_total
-            factura.exonerado_iva = exonerado_iva
-            factura.impuesto_total = impuesto_total
-            factura.total = total_final
-            factura.save()
+            # ═══════════════════════════════════════════════════════════
+            # FASE 4: CREAR FACTURA (un solo INSERT con totales finales)
+            # ═══════════════════════════════════════════════════════════
+            try:
+                factura = Factura.objects.create(
+                    usuario=usuario,
+                    subtotal=subtotal_acumulado,
+                    descuento_total=descuento_total,
+                    exonerado_iva=exonerado_iva,
+                    impuesto_total=impuesto_total,
+                    total=total_final,
+                    **validated_data
+                )
+            except (SerieNumeracion.DoesNotExist, SerieInactiva) as e:
+                raise serializers.ValidationError({'serie': str(e)})
+            registrar_compra(factura)
+            
+            # ═══════════════════════════════════════════════════════════
+            # FASE 5: DETALLES Y MOVIMIENTOS EN LOTE
+            # ═══════════════════════════════════════════════════════════
+            detalles = DetalleFactura.objects.bulk_create([
+                DetalleFactura(
+                    factura=factura,
+                    producto=producto,
+                    cantidad=cantidad,
+                    precio_unitario=precio_unitario,
+                    subtotal=subtotal_detalle
+                )
+                for producto, cantidad, precio_unitario, subtotal_detalle in lineas
+            ])
+            registrar_ventas(factura, detalles)
+            
+            # ⚠️ CRÍTICO: el stock se descuenta en un solo UPDATE condicional
+            # dentro de registrar_movimientos (bulk_create no dispara el signal),
+            # que también consume los lotes de cada línea (ver lotes.py)
+            try:
+                registrar_movimientos([
+                    Movimiento(
+                        producto=producto,
+                        tipo='salida',
+                        cantidad=cantidad,
+                        descripcion=f"Venta - Factura #{factura.numero_factura}",
+                        usuario=usuario
+                    )
+                    for producto, cantidad, _, _ in lineas
+                ], detalles=detalles)
+            except StockInsuficiente as e:
+                raise serializers.ValidationError({
+                    'detalles': f"Stock insuficiente para '{productos[e.producto_id].nombre}'. "
+                                f"Solicitado: {e.cantidad}"
+                })
             
             return factura
 
 
+class FacturaListSerializer(serializers.ModelSerializer):
+    """
+    Serializer de solo lectura para listados de facturas: sin las líneas
+    (?expand=detalles usa FacturaSerializer, ver campos.py).
+    """
+    class Meta:
+        model = Factura
+        fields = ['id', 'numero_factura', 'serie', 'fecha', 'tipo_documento', 'numero_documento',
+                  'nombre_cliente', 'email_cliente', 'telefono_cliente', 'direccion_cliente',
+                  'subtotal', 'descuento_total', 'exonerado_iva', 'impuesto_total', 'total',
+                  'observaciones']
+
+
 class CategoriaSerializer(serializers.ModelSerializer):
     class Meta:
         model = Categoria
@@ -299,6 +361,21 @@ class ProductoSerializer(serializers.ModelSerializer):
         
         return super().update(instance, validated_data)
 
+class ProductoListSerializer(serializers.ModelSerializer):
+    """
+    Serializer de solo lectura para listados de productos.
+    Misma salida que ProductoSerializer (nombres en lugar de IDs), pero los
+    nombres salen del select_related de la vista: ninguna consulta por fila.
+    """
+    categoria = serializers.CharField(source='categoria.nombre', read_only=True, allow_null=True)
+    subcategoria = serializers.CharField(source='subcategoria.nombre', read_only=True, allow_null=True)
+    proveedor_principal = serializers.CharField(source='proveedor_principal.nombre', read_only=True, allow_null=True)
+
+    class Meta:
+        model = Producto
+        fields = '__all__'
+
+
 class MovimientoSerializer(serializers.ModelSerializer):
     producto = serializers.StringRelatedField()
     class Meta:
@@ -317,6 +394,13 @@ class ProveedorSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class ProveedorListSerializer(serializers.ModelSerializer):
+    """Serializer ligero para listados: sin productos_suministrados."""
+    class Meta:
+        model = Proveedor
+        fields = '__all__'
+
+
 class ProductoProveedorSerializer(serializers.ModelSerializer):
     producto = serializers.StringRelatedField(read_only=True)
     proveedor = serializers.StringRelatedField(read_only=True)
@@ -375,6 +459,19 @@ class OrdenCompraSerializer(serializers.ModelSerializer):
         return orden
 
 
+class OrdenCompraListSerializer(serializers.ModelSerializer):
+    """
+    Serializer ligero para listados de órdenes: en lugar de las líneas,
+    su cantidad (cantidad_items, un COUNT anotado por la vista).
+    """
+    cantidad_items = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = OrdenCompra
+        fields = ['id', 'numero_orden', 'proveedor', 'fecha_orden', 'fecha_esperada',
+                  'estado', 'total_estimado', 'observaciones', 'cantidad_items']
+
+
 class DetalleRecepcionSerializer(serializers.ModelSerializer):
     producto = serializers.PrimaryKeyRelatedField(queryset=Producto.objects.all())
 
@@ -398,8 +495,10 @@ class RecepcionMercaderiaSerializer(serializers.ModelSerializer):
         """
         Crea una recepción de mercadería.
         El stock se actualiza AUTOMÁTICAMENTE via signal post_save de Movimiento.
+        Cada línea deja además un LoteStock (ver lotes.py).
         """
         from .models import Movimiento
+        from .lotes import registrar_ingresos
         
         detalles_data = validated_data.pop('detalles')
         usuario = self.context['request'].user if 'request' in self.context else None
@@ -414,11 +513,11 @@ class RecepcionMercaderiaSerializer(serializers.ModelSerializer):
             # Crear el detalle de recepción
             DetalleRecepcion.objects.create(recepcion=recepcion, **detalle)
             
-            # Actualizar precio de costo y recalcular precio de venta
+            # Recalcular precio de venta sobre el último costo de compra
+            # (stock_disponible y el costo promedio los maneja el signal de Movimiento)
             if precio_costo:
-                producto.precio_costo = precio_costo
                 producto.precio_unitario = precio_costo * Decimal('1.30')  # +30%
-                producto.save()
+                producto.save(update_fields=['precio_unitario'])
             
             # ⚠️ CRÍTICO: NO modificar stock aquí
             # El signal post_save de Movimiento se encarga automáticamente
@@ -428,6 +527,7 @@ class RecepcionMercaderiaSerializer(serializers.ModelSerializer):
                 producto=producto,
                 tipo='entrada',
                 cantidad=cantidad,
+                costo_unitario=precio_costo or None,
                 descripcion=f"Recepción #{recepcion.numero_recepcion}",
                 usuario=usuario
             )
@@ -444,6 +544,11 @@ class RecepcionMercaderiaSerializer(serializers.ModelSerializer):
                 except DetalleOrdenCompra.DoesNotExist:
                     pass
         
+        registrar_ingresos(
+            [(d['producto'].id, d['cantidad_recibida'], d.get('lote'), d.get('fecha_vencimiento'))
+             for d in detalles_data],
+            origen=f"Recepción #{recepcion.numero_recepcion}"
+        )
         return recepcion
 
 
@@ -453,6 +558,7 @@ class RecepcionMercaderiaSerializer(serializers.ModelSerializer):
 
 class DetalleFacturaCompraSerializer(serializers.ModelSerializer):
     """Serializer para los detalles de facturas de compra"""
+    producto = ProductoIdField(queryset=Producto.objects.all())
     producto_nombre = serializers.CharField(source='producto.nombre', read_only=True)
     producto_codigo = serializers.CharField(source='producto.codigo', read_only=True)
     
@@ -563,61 +669,99 @@ class FacturaCompraDetailSerializer(serializers.ModelSerializer):
         
         return data
     
+    def _productos(self, detalles_data):
+        """{id: Producto} de todas las líneas en un solo SELECT."""
+        ids = {detalle['producto'] for detalle in detalles_data}
+        productos = Producto.objects.in_bulk(ids)
+        faltantes = ids - set(productos)
+        if faltantes:
+            raise serializers.ValidationError({
+                'detalles': f"Producto inexistente: {', '.join(str(pk) for pk in sorted(faltantes))}"
+            })
+        return productos
+    
+    def _crear_detalles(self, factura, detalles_data, productos):
+        """bulk_create de las líneas (subtotal calculado aquí: bulk_create no llama a save)."""
+        return DetalleFacturaCompra.objects.bulk_create([
+            DetalleFacturaCompra(
+                factura_compra=factura,
+                **{
+                    **detalle_data,
+                    'producto': productos[detalle_data['producto']],
+                    'subtotal': detalle_data['cantidad'] * detalle_data['precio_unitario'],
+                }
+            )
+            for detalle_data in detalles_data
+        ])
+    
     def create(self, validated_data):
-        """Crear factura de compra con sus detalles e impactar inventario"""
-        from decimal import Decimal
+        """
+        Crea la factura de compra e ingresa la mercadería con cantidad de
+        consultas constante (no depende del número de líneas): un SELECT de
+        los productos, un INSERT de la factura, bulk_create de detalles y
+        movimientos, un único UPDATE de stock y precio_costo (ver
+        stock.registrar_movimientos), los upserts del resumen diario y
+        bulk_create de los lotes (ver lotes.py).
+        """
         from django.db import transaction
+        from django.db.models import prefetch_related_objects
         from .models import Movimiento
+        from .stock import registrar_movimientos
+        from .lotes import registrar_ingresos
         
         detalles_data = validated_data.pop('detalles')
         usuario = self.context['request'].user if 'request' in self.context else None
         validated_data.pop('usuario_registro', None)
         
         # Calcular subtotal de los detalles
-        subtotal_calculado = Decimal('0.00')
-        for detalle_data in detalles_data:
-            cantidad = Decimal(str(detalle_data['cantidad']))
-            precio = Decimal(str(detalle_data['precio_unitario']))
-            subtotal_calculado += cantidad * precio
+        subtotal_calculado = sum(
+            (detalle['cantidad'] * detalle['precio_unitario'] for detalle in detalles_data),
+            Decimal('0.00')
+        )
         
         # Si no se proporcionó subtotal, usar el calculado
         if 'subtotal' not in validated_data or validated_data['subtotal'] == 0:
             validated_data['subtotal'] = subtotal_calculado
         
         with transaction.atomic():
+            productos = self._productos(detalles_data)
+            
             # Crear la factura
             factura = FacturaCompra.objects.create(
                 usuario_registro=usuario,
                 **validated_data
             )
+            detalles = self._crear_detalles(factura, detalles_data, productos)
             
-            # Crear los detalles y movimientos de entrada al inventario
-            for detalle_data in detalles_data:
-                detalle = DetalleFacturaCompra.objects.create(
-                    factura_compra=factura,
-                    **detalle_data
-                )
-                
-                # Crear movimiento de entrada para actualizar stock
-                # El signal post_save de Movimiento se encarga de sumar al stock
-                Movimiento.objects.create(
-                    producto=detalle.producto,
-                    tipo='entrada',
-                    cantidad=int(detalle.cantidad),
-                    descripcion=f'Entrada por Factura de Compra #{factura.numero_factura} - Proveedor: {factura.proveedor.nombre}',
-                    usuario=usuario
-                )
-                
-                # Actualizar precio de costo del producto
-                producto = detalle.producto
-                producto.precio_costo = detalle.precio_unitario
-                producto.save(update_fields=['precio_costo'])
+            # Entradas al inventario: stock y costo promedio en un solo UPDATE
+            descripcion = (f'Entrada por Factura de Compra #{factura.numero_factura} '
+                           f'- Proveedor: {factura.proveedor.nombre}')
+            registrar_movimientos(
+                [
+                    Movimiento(
+                        producto=detalle.producto,
+                        tipo='entrada',
+                        cantidad=int(detalle.cantidad),
+                        costo_unitario=detalle.precio_unitario,
+                        descripcion=descripcion,
+                        usuario=usuario
+                    )
+                    for detalle in detalles
+                ]
+            )
+            registrar_ingresos(
+                [(detalle.producto_id, int(detalle.cantidad), detalle.lote, detalle.fecha_vencimiento_lote)
+                 for detalle in detalles],
+                origen=f'Factura de compra #{factura.numero_factura}'
+            )
         
+        # La respuesta lista los detalles con el nombre del producto
+        prefetch_related_objects([factura], 'detalles__producto')
         return factura
     
     def update(self, instance, validated_data):
         """Actualizar factura de compra y sus detalles"""
-        from decimal import Decimal
+        from django.db import transaction
         
         detalles_data = validated_data.pop('detalles', None)
         
@@ -625,24 +769,16 @@ class FacturaCompraDetailSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         
-        # Si se enviaron detalles, reemplazarlos
-        if detalles_data is not None:
-            # Eliminar detalles existentes
-            instance.detalles.all().delete()
-            
-            # Crear nuevos detalles
-            subtotal_calculado = Decimal('0.00')
-            for detalle_data in detalles_data:
-                DetalleFacturaCompra.objects.create(
-                    factura_compra=instance,
-                    **detalle_data
+        with transaction.atomic():
+            # Si se enviaron detalles, reemplazarlos
+            if detalles_data is not None:
+                productos = self._productos(detalles_data)
+                instance.detalles.all().delete()
+                self._crear_detalles(instance, detalles_data, productos)
+                instance.subtotal = sum(
+                    (detalle['cantidad'] * detalle['precio_unitario'] for detalle in detalles_data),
+                    Decimal('0.00')
                 )
-                cantidad = Decimal(str(detalle_data['cantidad']))
-                precio = Decimal(str(detalle_data['precio_unitario']))
-                subtotal_calculado += cantidad * precio
             
-            # Actualizar subtotal si cambió
-            instance.subtotal = subtotal_calculado
-        
-        instance.save()
+            instance.save()
         return instance
\ No newline at end of file
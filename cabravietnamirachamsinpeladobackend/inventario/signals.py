@@ -1,13 +1,148 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
-from .models import Movimiento, Producto
+from .models import (Movimiento, SerieNumeracion, DetalleFactura, Factura, Producto,
+                     Categoria, Subcategoria, Proveedor, Cliente, FacturaCompra)
+from . import cache
+from .stock import aplicar_movimiento
+from .numeracion import crear_secuencia, eliminar_secuencia, descartar_reservas
+from .resumenes import registrar_ventas, registrar_stock
+from .sincronizacion import registrar_cambios
+from .clientes import registrar_compra, normalizar
+from . import impresion
 
 @receiver(post_save, sender=Movimiento)
 def actualizar_stock(sender, instance, created, **kwargs):
+    """
+    Aplica el movimiento con un UPDATE atómico (sin read-modify-write);
+    una salida consume además los lotes FIFO del producto. Si el stock
+    no alcanza, StockInsuficiente revierte el Movimiento (Movimiento.save
+    corre dentro de transaction.atomic).
+    """
     if created:
-        producto = instance.producto
-        if instance.tipo == 'entrada':
-            producto.stock_disponible += instance.cantidad
-        elif instance.tipo == 'salida':
-            producto.stock_disponible -= instance.cantidad
-        producto.save()
\ No newline at end of file
+        nuevo_stock = aplicar_movimiento(instance.producto_id, instance.tipo, instance.cantidad,
+                                         instance.costo_unitario, movimiento=instance)
+        # Mantener coherente la instancia en memoria si ya estaba cargada
+        if Movimiento.producto.is_cached(instance):
+            instance.producto.stock_disponible = nuevo_stock
+        registrar_stock([instance], {instance.producto_id: nuevo_stock}, instance.fecha)
+
+
+@receiver(post_save, sender=DetalleFactura)
+def acumular_venta_diaria(sender, instance, created, **kwargs):
+    """Líneas creadas de a una (FacturaSerializer usa bulk_create y acumula él mismo)."""
+    if created:
+        registrar_ventas(instance.factura, [instance])
+
+
+def _borrado_de_factura(origin):
+    """El borrado viene de una factura (o queryset de facturas): sus líneas caen en cascada."""
+    return isinstance(origin, Factura) or getattr(origin, 'model', None) is Factura
+
+
+@receiver(post_delete, sender=DetalleFactura)
+def descontar_venta_diaria(sender, instance, origin=None, **kwargs):
+    """Línea borrada de a una (el borrado de la factura completa lo resta descontar_factura_diaria)."""
+    if _borrado_de_factura(origin):
+        return
+    try:
+        factura = instance.factura
+    except Factura.DoesNotExist:
+        return
+    registrar_ventas(factura, [instance], signo=-1)
+
+
+@receiver(pre_delete, sender=Factura)
+def descontar_factura_diaria(sender, instance, **kwargs):
+    """
+    Resta todas las líneas de la factura en un solo upsert (una consulta
+    para leerlas), en lugar de una consulta y un upsert por línea.
+    pre_delete: en post_delete las líneas ya no existen.
+    """
+    detalles = list(instance.detalles.only('factura_id', 'producto_id', 'cantidad', 'subtotal'))
+    if detalles:
+        registrar_ventas(instance, detalles, signo=-1)
+
+
+@receiver(post_delete, sender=Factura)
+def descontar_compra_cliente(sender, instance, **kwargs):
+    """Eliminar (anular) una factura la resta de las estadísticas del cliente."""
+    registrar_compra(instance, signo=-1)
+
+
+@receiver(post_save, sender=SerieNumeracion)
+def crear_secuencia_serie(sender, instance, created, **kwargs):
+    """Cada serie nueva tiene su SEQUENCE en PostgreSQL (DDL transaccional)."""
+    if created:
+        crear_secuencia(instance)
+    elif not instance.activo:
+        descartar_reservas(instance.codigo)
+
+
+@receiver(post_delete, sender=SerieNumeracion)
+def eliminar_secuencia_serie(sender, instance, **kwargs):
+    eliminar_secuencia(instance)
+
+
+@receiver(post_save, sender=Producto)
+def registrar_cambio_producto(sender, instance, created, **kwargs):
+    """Alta o edición (incluye desactivar) para /api/productos/cambios/."""
+    registrar_cambios([instance.pk], 'alta' if created else 'modificacion')
+    cache.invalidar('producto', f'id:{instance.pk}', f'codigo:{instance.codigo}')
+
+
+@receiver(post_delete, sender=Producto)
+def registrar_baja_producto(sender, instance, **kwargs):
+    registrar_cambios([instance.pk], 'baja')
+    cache.invalidar('producto', f'id:{instance.pk}', f'codigo:{instance.codigo}')
+
+
+# ==========================================
+# INVALIDACIÓN DE LA CACHÉ COMPARTIDA (ver cache.py)
+# ==========================================
+
+@receiver([post_save, post_delete], sender=Categoria)
+def invalidar_categorias(sender, **kwargs):
+    cache.invalidar('categorias', 'dropdown')
+    cache.invalidar_espacio('producto')  # el detalle muestra el nombre de la categoría
+
+
+@receiver([post_save, post_delete], sender=Subcategoria)
+def invalidar_subcategorias(sender, **kwargs):
+    cache.invalidar_espacio('producto')
+
+
+@receiver([post_save, post_delete], sender=Proveedor)
+def invalidar_proveedores(sender, **kwargs):
+    cache.invalidar('proveedores', 'dropdown')
+    cache.invalidar_espacio('producto')  # proveedor_principal
+    cache.invalidar_espacio('facturas_compra')  # nombres en el saldo por proveedor
+
+
+@receiver([post_save, post_delete], sender=FacturaCompra)
+def invalidar_facturas_compra(sender, **kwargs):
+    cache.invalidar_espacio('facturas_compra')  # estadísticas del día
+
+
+@receiver([post_save, post_delete], sender=Cliente)
+def invalidar_cliente(sender, instance, **kwargs):
+    cache.invalidar('cliente', f'id:{instance.pk}', f'documento:{normalizar(instance.numero_documento)}')
+
+
+@receiver([post_save, post_delete], sender=Factura)
+def invalidar_impresion_factura(sender, instance, **kwargs):
+    impresion.invalidar(instance.numero_factura)
+
+
+@receiver([post_save, post_delete], sender=DetalleFactura)
+def invalidar_impresion_detalle(sender, instance, origin=None, **kwargs):
+    """
+    Sin consulta si la línea ya tiene su factura cargada. En el borrado en
+    cascada de una factura (origin) no hace nada: invalidar_impresion_factura
+    ya invalida la clave una vez, en lugar de un SELECT por línea.
+    """
+    if _borrado_de_factura(origin):
+        return
+    if DetalleFactura.factura.is_cached(instance):
+        impresion.invalidar(instance.factura.numero_factura)
+    else:
+        impresion.invalidar(*Factura.objects.filter(pk=instance.factura_id).values_list('numero_factura', flat=True))
@@ -0,0 +1,99 @@
+"""
+Sincronización incremental del catálogo de productos.
+
+Cada escritura sobre Producto deja una fila en CambioProducto:
+  - alta / modificación / baja -> signals de Producto (signals.py)
+  - stock                      -> motor de stock (stock.py), en la misma
+                                  sentencia que actualiza el stock
+  - importación masiva         -> catalogo.py (bulk_create no dispara signals)
+
+El cliente guarda el catálogo en local y pide solo lo que cambió:
+
+    GET /api/productos/cambios/?desde=<token>
+
+y recibe los productos tocados desde ese token (con los campos del
+dropdown), los ids eliminados o desactivados, y el token siguiente. Sin
+`desde`, o si el token es anterior a los cambios purgados, se responde
+el catálogo completo con completo=true.
+
+Los ids de CambioProducto salen de una secuencia y se asignan antes del
+commit, así que una transacción lenta puede confirmar un id menor que
+otro ya visible. Por eso el token devuelto no avanza sobre los cambios
+de los últimos MARGEN_SEGUNDOS: esos se vuelven a enviar en la
+siguiente sincronización (aplicarlos dos veces no cambia nada).
+"""
+from datetime import timedelta
+
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .models import CambioProducto, Producto
+
+MARGEN_SEGUNDOS = 60
+
+CAMPOS = ('id', 'codigo', 'nombre', 'precio_costo', 'precio_unitario', 'stock_disponible')
+
+
+class TokenInvalido(ValueError):
+    """El parámetro `desde` no es un token de sincronización."""
+
+
+def registrar_cambios(producto_ids, tipo):
+    """Una fila de CambioProducto por producto."""
+    CambioProducto.objects.bulk_create(
+        [CambioProducto(producto_id=producto_id, tipo=tipo) for producto_id in producto_ids]
+    )
+
+
+def _token_seguro(desde=0):
+    """Último id de CambioProducto más viejo que el margen (nunca retrocede)."""
+    limite = timezone.now() - timedelta(seconds=MARGEN_SEGUNDOS)
+    ultimo = CambioProducto.objects.filter(fecha__lte=limite).aggregate(ultimo=Max('id'))['ultimo']
+    return max(ultimo or 0, desde)
+
+
+def _catalogo_completo():
+    return {
+        'completo': True,
+        'token': _token_seguro(),
+        'productos': list(Producto.objects.filter(activo=True).values(*CAMPOS).order_by('nombre')),
+        'eliminados': [],
+    }
+
+
+def cambios_desde(desde=None):
+    """Respuesta de /api/productos/cambios/ para el token `desde` (str o None)."""
+    if desde in (None, ''):
+        return _catalogo_completo()
+    try:
+        desde = int(desde)
+    except (TypeError, ValueError):
+        raise TokenInvalido(desde)
+    if desde < 0:
+        raise TokenInvalido(desde)
+
+    primero = CambioProducto.objects.aggregate(primero=Min('id'))['primero']
+    if primero is not None and desde < primero - 1:
+        # Los cambios intermedios ya se purgaron (purgar_cambios)
+        return _catalogo_completo()
+
+    token = _token_seguro(desde)
+    tocados = set(CambioProducto.objects.filter(id__gt=desde).values_list('producto_id', flat=True))
+    productos = list(Producto.objects.filter(id__in=tocados, activo=True).values(*CAMPOS).order_by('id'))
+    return {
+        'completo': False,
+        'token': token,
+        'productos': productos,
+        'eliminados': sorted(tocados - {p['id'] for p in productos}),
+    }
+
+
+def purgar(dias):
+    """
+    Borra los cambios de más de `dias` días (conserva siempre el último,
+    que marca hasta dónde llega el registro). Retorna cuántos borró.
+    """
+    limite = timezone.now() - timedelta(days=dias)
+    ultimo = CambioProducto.objects.aggregate(ultimo=Max('id'))['ultimo']
+    borrados, _ = CambioProducto.objects.filter(fecha__lt=limite, id__lt=ultimo or 0).delete()
+    return borrados
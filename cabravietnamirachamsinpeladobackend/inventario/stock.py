@@ -0,0 +1,219 @@
+"""
+Motor de aplicación de stock.
+
+Los movimientos se aplican con un único UPDATE condicional sobre
+inventario_producto (stock_disponible = stock_disponible ± n), sin leer
+ni reescribir la fila completa del producto. La base de datos rechaza
+las ventas que dejarían el stock en negativo. El mismo UPDATE marca
+fecha_actualizacion, que versiona el dropdown de productos, y en la
+misma sentencia (CTE) deja cada producto tocado en CambioProducto
+(ver sincronizacion.py). El detalle cacheado de esos productos se
+invalida (ver cache.py).
+
+aplicar_movimiento      -> un movimiento (usado por el signal post_save)
+registrar_movimientos   -> lote de movimientos con bulk_create + un UPDATE
+
+Ambos caminos acumulan además el resumen StockDiario (ver resumenes.py)
+y las salidas consumen los lotes FIFO del producto (ver lotes.py).
+
+COSTO PROMEDIO PONDERADO
+Producto.precio_costo es el costo promedio ponderado móvil. Las entradas
+con costo_unitario lo recalculan en el mismo UPDATE del stock:
+
+    precio_costo = (stock * precio_costo + cantidad * costo_unitario)
+                   / (stock + cantidad)
+
+con el stock y el costo previos a la entrada (en un UPDATE, el lado
+derecho del SET ve la fila anterior). Las salidas no cambian el promedio.
+Así la valorización (stock * precio_costo) y el margen de los reportes
+se leen por producto, sin recorrer el historial de compras.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import cache, lotes
+from .models import Producto, Movimiento, CambioProducto
+
+
+class StockInsuficiente(Exception):
+    """El movimiento dejaría el stock del producto por debajo de cero."""
+
+    def __init__(self, producto_id, cantidad):
+        self.producto_id = producto_id
+        self.cantidad = cantidad
+        super().__init__(
+            f"Stock insuficiente para el producto #{producto_id} "
+            f"(solicitado: {cantidad})"
+        )
+
+
+def delta_movimiento(tipo, cantidad):
+    """Convierte tipo + cantidad en la variación de stock con signo."""
+    if tipo == 'entrada':
+        return cantidad
+    if tipo == 'salida':
+        return -cantidad
+    raise ValueError(f"Tipo de movimiento desconocido: {tipo}")
+
+
+def _actualizar_stock(asignacion, condicion, params_asignacion, params_condicion,
+                      otros_campos='', params_otros=()):
+    """
+    WITH actualizados AS (UPDATE producto SET ... RETURNING id, stock),
+         cambios AS (INSERT INTO cambioproducto SELECT id, 'stock', ahora FROM actualizados)
+    SELECT id, stock FROM actualizados
+
+    Una sola ida y vuelta a la base para el stock y el registro de cambios.
+    `otros_campos` agrega asignaciones al SET (ej. "precio_costo = CASE ...").
+    Retorna [(producto_id, nuevo_stock)] de las filas que cumplieron la condición.
+    """
+    qn = connection.ops.quote_name
+    tabla = qn(Producto._meta.db_table)
+    cambios = qn(CambioProducto._meta.db_table)
+    stock = qn('stock_disponible')
+    pk = qn('id')
+    ahora = timezone.now()
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH actualizados AS ("
+            f"  UPDATE {tabla} SET {stock} = {stock} + {asignacion}, {otros_campos}{qn('fecha_actualizacion')} = %s "
+            f"  WHERE {condicion} AND {stock} + {asignacion} >= 0 "
+            f"  RETURNING {pk}, {stock}"
+            f"), registro AS ("
+            f"  INSERT INTO {cambios} ({qn('producto_id')}, {qn('tipo')}, {qn('fecha')}) "
+            f"  SELECT {pk}, 'stock', %s FROM actualizados"
+            f") SELECT {pk}, {stock} FROM actualizados",
+            params_asignacion + list(params_otros) + [ahora] + params_condicion + params_asignacion + [ahora]
+        )
+        filas = cursor.fetchall()
+
+    if filas:
+        cache.invalidar('producto', *[f'id:{producto_id}' for producto_id, _ in filas])
+    return filas
+
+
+def _costo_promedio(costeadas):
+    """
+    "precio_costo = CASE id WHEN %s THEN <promedio> ... ELSE precio_costo END, "
+    y sus parámetros. costeadas: {producto_id: (cantidad, valor)} de las entradas.
+    """
+    if not costeadas:
+        return '', []
+    qn = connection.ops.quote_name
+    stock, costo = qn('stock_disponible'), qn('precio_costo')
+    rama = f"WHEN %s THEN ROUND(({stock} * {costo} + %s) / ({stock} + %s), 2)"
+    sql = f"{costo} = CASE {qn('id')} " + " ".join([rama] * len(costeadas)) + f" ELSE {costo} END, "
+    params = [valor for pid, (cantidad, total) in costeadas.items() for valor in (pid, total, cantidad)]
+    return sql, params
+
+
+def _costeadas(movimientos):
+    """{producto_id: (cantidad, valor)} de las entradas con costo_unitario."""
+    costeadas = defaultdict(lambda: (0, Decimal('0')))
+    for movimiento in movimientos:
+        if movimiento.tipo == 'entrada' and movimiento.costo_unitario is not None and movimiento.cantidad:
+            cantidad, valor = costeadas[movimiento.producto_id]
+            costeadas[movimiento.producto_id] = (
+                cantidad + movimiento.cantidad,
+                valor + movimiento.cantidad * Decimal(str(movimiento.costo_unitario)),
+            )
+    return dict(costeadas)
+
+
+def consumir_lotes(movimientos, detalles=None):
+    """Asignación FIFO de lotes para las salidas (ya insertadas) de `movimientos`."""
+    if detalles is None:
+        salidas = [movimiento for movimiento in movimientos if movimiento.tipo == 'salida']
+    else:
+        pares = [(m, d) for m, d in zip(movimientos, detalles) if m.tipo == 'salida']
+        salidas, detalles = [m for m, _ in pares], [d for _, d in pares]
+    if not salidas:
+        return []
+    return lotes.asignar(salidas, detalles)
+
+
+def aplicar_movimiento(producto_id, tipo, cantidad, costo_unitario=None, movimiento=None):
+    """
+    Aplica un movimiento al stock del producto y retorna el nuevo saldo.
+
+    UPDATE ... SET stock_disponible = stock_disponible + delta
+    WHERE id = %s AND stock_disponible + delta >= 0 RETURNING stock_disponible
+
+    Una entrada con costo_unitario recalcula además el costo promedio.
+    Si se pasa el Movimiento (ya insertado) y es una salida, consume sus
+    lotes. Lanza StockInsuficiente si la condición no se cumple.
+    """
+    delta = delta_movimiento(tipo, cantidad)
+    costeadas = {}
+    if tipo == 'entrada' and costo_unitario is not None and cantidad:
+        costeadas[producto_id] = (cantidad, cantidad * Decimal(str(costo_unitario)))
+    filas = _actualizar_stock(
+        "%s", f"{connection.ops.quote_name('id')} = %s", [delta], [producto_id], *_costo_promedio(costeadas)
+    )
+    if not filas:
+        raise StockInsuficiente(producto_id, cantidad)
+    if movimiento is not None:
+        consumir_lotes([movimiento])
+    return filas[0][1]
+
+
+def aplicar_movimientos(deltas, costeadas=None):
+    """
+    Aplica varias variaciones de stock en un solo UPDATE set-based.
+
+    deltas: {producto_id: variacion_con_signo}
+    costeadas: {producto_id: (cantidad, valor)} de entradas con costo; el
+    mismo UPDATE recalcula el costo promedio de esos productos.
+    Retorna {producto_id: nuevo_stock}. Si algún producto quedaría en
+    negativo no se aplica ninguna variación y se lanza StockInsuficiente.
+    """
+    costeadas = costeadas or {}
+    deltas = {pid: delta for pid, delta in deltas.items() if delta or pid in costeadas}
+    if not deltas:
+        return {}
+
+    pk = connection.ops.quote_name('id')
+    caso = f"CASE {pk} " + " ".join(["WHEN %s THEN %s"] * len(deltas)) + " END"
+    params_caso = [valor for par in deltas.items() for valor in par]
+    ids = list(deltas)
+    marcadores = ", ".join(["%s"] * len(ids))
+
+    with transaction.atomic():
+        saldos = dict(_actualizar_stock(
+            caso, f"{pk} IN ({marcadores})", params_caso, ids, *_costo_promedio(costeadas)
+        ))
+
+        faltantes = [pid for pid in ids if pid not in saldos]
+        if faltantes:
+            # Revierte las filas ya actualizadas (savepoint)
+            raise StockInsuficiente(faltantes[0], -deltas[faltantes[0]])
+
+    return saldos
+
+
+def registrar_movimientos(movimientos, detalles=None):
+    """
+    Inserta varios Movimientos con bulk_create y aplica su stock (y el
+    costo promedio de las entradas con costo_unitario) en un solo UPDATE.
+    bulk_create no dispara post_save, así que el stock y los lotes de las
+    salidas se aplican aquí y no en el signal. detalles: las DetalleFactura
+    de cada movimiento, en el mismo orden (ventas; ver lotes.asignar).
+    Retorna {producto_id: nuevo_stock}.
+    """
+    from .resumenes import registrar_stock
+
+    deltas = defaultdict(int)
+    for movimiento in movimientos:
+        deltas[movimiento.producto_id] += delta_movimiento(movimiento.tipo, movimiento.cantidad)
+
+    with transaction.atomic():
+        saldos = aplicar_movimientos(deltas, _costeadas(movimientos))
+        Movimiento.objects.bulk_create(movimientos)
+        registrar_stock(movimientos, saldos)
+        consumir_lotes(movimientos, detalles)
+
+    return saldos
@@ -193,8 +193,9 @@ class RecepcionMercaderiaActualizaPreciosTest(TestCase):
         # Recargar producto desde BD
         self.producto.refresh_from_db()
         
-        # Verificar que se actualizó el precio_costo
-        self.assertEqual(self.producto.precio_costo, Decimal('40000'))
+        # Verificar que se actualizó el precio_costo (promedio ponderado)
+        # (5 * 30000 + 10 * 40000) / 15
+        self.assertEqual(self.producto.precio_costo, Decimal('36666.67'))
         
         # Verificar que se recalculó precio_unitario (+30%)
         # 40000 * 1.30 = 52000
@@ -236,12 +237,12 @@ class RecepcionMercaderiaActualizaPreciosTest(TestCase):
         
         # Verificar producto 1
         self.producto.refresh_from_db()
-        self.assertEqual(self.producto.precio_costo, Decimal('35000'))
+        self.assertEqual(self.producto.precio_costo, Decimal('32500'))  # (5 * 30000 + 5 * 35000) / 10
         self.assertEqual(self.producto.precio_unitario, Decimal('45500'))  # 35000 * 1.30
         
         # Verificar producto 2
         producto2.refresh_from_db()
-        self.assertEqual(producto2.precio_costo, Decimal('18000'))
+        self.assertEqual(producto2.precio_costo, Decimal('16666.67'))  # (8 * 15000 + 10 * 18000) / 18
         self.assertEqual(producto2.precio_unitario, Decimal('23400'))  # 18000 * 1.30
 
 
@@ -0,0 +1,128 @@
+"""
+Tests de los endpoints de analytics (inventario/analytics.py)
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import Categoria, Producto, Factura, DetalleFactura
+from inventario.resumenes import reconstruir
+
+
+class AnalyticsTest(TestCase):
+
+    def setUp(self):
+        self.herramientas = Categoria.objects.create(nombre="Herramientas")
+        self.tornilleria = Categoria.objects.create(nombre="Tornillería")
+        self.martillo = Producto.objects.create(
+            nombre="Martillo", marca="Stanley", categoria=self.herramientas,
+            stock_disponible=10, precio_costo=Decimal('6000'), precio_unitario=Decimal('10000')
+        )
+        self.tornillo = Producto.objects.create(
+            nombre="Tornillo", marca="Fischer", categoria=self.tornilleria,
+            stock_disponible=100, precio_costo=Decimal('50'), precio_unitario=Decimal('100')
+        )
+        self.user = User.objects.create_user(username='gerente', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.hoy = timezone.localdate()
+
+    def _venta(self, dias_atras, lineas, cliente=None):
+        total = sum(p.precio_unitario * c for p, c in lineas)
+        factura = Factura.objects.create(total=total, nombre_cliente=cliente)
+        for producto, cantidad in lineas:
+            DetalleFactura.objects.create(
+                factura=factura, producto=producto, cantidad=cantidad,
+                precio_unitario=producto.precio_unitario,
+                subtotal=producto.precio_unitario * cantidad
+            )
+        if dias_atras:
+            # .update() no pasa por los signals: recalcular los resúmenes diarios
+            Factura.objects.filter(pk=factura.pk).update(fecha=timezone.now() - timedelta(days=dias_atras))
+            reconstruir()
+        return factura
+
+    def test_ventas_por_dia_serie_continua(self):
+        self._venta(0, [(self.martillo, 1)], cliente="Juan")
+        self._venta(0, [(self.tornillo, 10)], cliente="Ana")
+        self._venta(2, [(self.martillo, 2)], cliente="Juan")
+
+        response = self.client.get('/api/analytics/ventas-por-dia/?dias=3')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(response.data[-1]['fecha'], self.hoy.isoformat())
+        self.assertEqual(response.data[-1]['total'], 11000.0)
+        self.assertEqual(response.data[-1]['facturas'], 2)
+        self.assertEqual(response.data[-1]['cantidad_productos'], 11)
+        self.assertEqual(response.data[1]['total'], 0.0)
+        self.assertEqual(response.data[0]['total'], 20000.0)
+
+    def test_rango_excluye_ventas_anteriores(self):
+        self._venta(40, [(self.martillo, 5)])
+        response = self.client.get('/api/analytics/top-productos/')
+        self.assertEqual(response.data, [])
+
+    def test_top_productos(self):
+        self._venta(0, [(self.martillo, 1), (self.tornillo, 10)])
+        self._venta(1, [(self.tornillo, 5)])
+
+        response = self.client.get('/api/analytics/top-productos/?limite=1')
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['nombre'], "Tornillo")
+        self.assertEqual(response.data[0]['cantidad_vendida'], 15)
+        self.assertEqual(response.data[0]['ingresos_totales'], 1500.0)
+
+    def test_margen_por_categoria(self):
+        self._venta(0, [(self.martillo, 2), (self.tornillo, 10)])
+
+        response = self.client.get('/api/analytics/margen-categorias/')
+        por_categoria = {fila['categoria']: fila for fila in response.data}
+        self.assertEqual(por_categoria['Herramientas']['ingresos'], 20000.0)
+        self.assertEqual(por_categoria['Herramientas']['margen'], 8000.0)
+        self.assertEqual(por_categoria['Herramientas']['margen_porcentaje'], 40.0)
+        self.assertEqual(por_categoria['Tornillería']['margen'], 500.0)
+
+    def test_valorizacion_stock(self):
+        response = self.client.get('/api/analytics/valorizacion-stock/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_unidades'], 110)
+        self.assertEqual(response.data['total_costo'], 65000.0)
+        self.assertEqual(response.data['total_venta'], 110000.0)
+
+    def test_dashboard_en_una_respuesta(self):
+        self._venta(0, [(self.martillo, 1)], cliente="Juan")
+        self._venta(0, [(self.martillo, 2)], cliente="Ana")
+
+        response = self.client.get('/api/analytics/dashboard/?dias=7')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        resumen = response.data['resumen']
+        self.assertEqual(resumen['ventas_hoy'], 30000.0)
+        self.assertEqual(resumen['productos_vendidos_hoy'], 3)
+        self.assertEqual(resumen['clientes_unicos_mes'], 2)
+        self.assertEqual(resumen['producto_mas_vendido'], "Martillo")
+        self.assertEqual(resumen['marca_mas_popular'], "Stanley")
+        self.assertEqual(len(response.data['ventas_por_dia']), 7)
+        self.assertEqual(response.data['clientes_frecuentes'][0]['total_compras'], 1)
+
+    def test_consultas_no_dependen_del_historial(self):
+        """El dashboard cuesta lo mismo con 1 o con 30 facturas"""
+        self._venta(0, [(self.martillo, 1)])
+        with self.assertNumQueries(11):
+            self.client.get('/api/analytics/dashboard/')
+        for i in range(30):
+            self._venta(i, [(self.tornillo, 1)])
+        with self.assertNumQueries(11):
+            self.client.get('/api/analytics/dashboard/')
+
+    def test_parametros_invalidos(self):
+        for query in ['desde=2025-02-01&hasta=2025-01-01', 'desde=no-es-fecha', 'dias=0', 'limite=0']:
+            response = self.client.get(f'/api/analytics/dashboard/?{query}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+    def test_requiere_autenticacion(self):
+        response = APIClient().get('/api/analytics/dashboard/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,103 @@
+"""
+Tests de las vistas async para modo ASGI (inventario/views_async.py)
+"""
+import json
+from asgiref.sync import async_to_sync
+from decimal import Decimal
+from django.test import TestCase, AsyncRequestFactory
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from inventario.models import Categoria, Producto, Cliente
+from inventario import views_async
+
+
+class VistasAsyncTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nombre="Herramientas")
+        for nombre in ('Martillo', 'Alicate'):
+            Producto.objects.create(nombre=nombre, categoria=categoria, precio_unitario=Decimal('1000'))
+        Producto.objects.create(nombre='Inactivo', categoria=categoria, precio_unitario=Decimal('1000'), activo=False)
+        Cliente.objects.create(nombre='Juan Pérez', tipo_documento='cedula', numero_documento='1234567')
+        cls.user = User.objects.create_user(username='cajero', password='12345')
+
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        self.token = str(AccessToken.for_user(self.user))
+        self.client_sync = APIClient()
+        self.client_sync.force_authenticate(user=self.user)
+
+    def _get(self, path, **params):
+        return self.factory.get(path, params, headers={'Authorization': f'Bearer {self.token}'})
+
+    async def test_dropdown(self):
+        response = await views_async.productos_dropdown(self._get('/api/productos/dropdown/'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        datos = json.loads(response.content)
+        self.assertEqual([p['nombre'] for p in datos], ['Alicate', 'Martillo'])
+        self.assertEqual(datos[0]['precio_unitario'], 1000.0)
+
+    async def test_dropdown_304(self):
+        response = await views_async.productos_dropdown(self._get('/api/productos/dropdown/'))
+        request = self.factory.get('/api/productos/dropdown/', headers={
+            'Authorization': f'Bearer {self.token}', 'If-None-Match': response['ETag']})
+        response = await views_async.productos_dropdown(request)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_requiere_token(self):
+        request = self.factory.get('/api/productos/dropdown/')
+        response = await views_async.productos_dropdown(request)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        request = self.factory.get('/api/productos/dropdown/', headers={'Authorization': 'Bearer invalido'})
+        response = await views_async.productos_dropdown(request)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(json.loads(response.content)['code'], 'token_not_valid')
+
+    async def test_solo_get(self):
+        request = self.factory.post('/api/productos/dropdown/', headers={'Authorization': f'Bearer {self.token}'})
+        response = await views_async.productos_dropdown(request)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_buscar_por_documento(self):
+        response = await views_async.clientes_buscar_por_documento(
+            self._get('/api/clientes/buscar_por_documento/', documento='1234567'))
+        datos = json.loads(response.content)
+        self.assertTrue(datos['encontrado'])
+        self.assertEqual(datos['cliente']['nombre'], 'Juan Pérez')
+
+        response = await views_async.clientes_buscar_por_documento(
+            self._get('/api/clientes/buscar_por_documento/', documento='999'))
+        self.assertFalse(json.loads(response.content)['encontrado'])
+
+        response = await views_async.clientes_buscar_por_documento(self._get('/api/clientes/buscar_por_documento/'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_health_check(self):
+        response = await views_async.health_check(self.factory.get('/api/health/'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['status'], 'healthy')
+
+    async def test_dashboard(self):
+        response = await views_async.analytics_dashboard(self._get('/api/analytics/dashboard/', dias=7))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('resumen', json.loads(response.content))
+
+        response = await views_async.analytics_dashboard(self._get('/api/analytics/dashboard/', dias='x'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_misma_respuesta_que_las_vistas_sincronas(self):
+        casos = [
+            (views_async.productos_dropdown, '/api/productos/dropdown/', {}),
+            (views_async.clientes_buscar_por_documento, '/api/clientes/buscar_por_documento/', {'documento': '1234567'}),
+            (views_async.analytics_dashboard, '/api/analytics/dashboard/', {'dias': 7}),
+        ]
+        for vista, path, params in casos:
+            with self.subTest(path=path):
+                response = async_to_sync(vista)(self._get(path, **params))
+                sincrono = self.client_sync.get(path, params)
+                self.assertEqual(response.content, sincrono.content)
@@ -0,0 +1,103 @@
+"""
+Tests del autocompletado de clientes y del documento normalizado (inventario/clientes.py)
+"""
+from decimal import Decimal
+from django.core.cache import cache as django_cache
+from django.db import connection
+from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import Categoria, Producto, Cliente
+from inventario import clientes
+
+
+class AutocompletadoClientesTest(TestCase):
+
+    def setUp(self):
+        django_cache.clear()
+        self.ana = Cliente.objects.create(nombre='Ana Gómez', tipo_documento='ruc',
+                                          numero_documento='80012345-6', telefono='0981 123-456')
+        self.juan = Cliente.objects.create(nombre='Juan Pérez', tipo_documento='cedula',
+                                           numero_documento='1234567', telefono='0971555000')
+        self.user = User.objects.create_user(username='cajero', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _buscar(self, texto):
+        response = self.client.get('/api/clientes/autocompletar/', {'q': texto})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [c['nombre'] for c in response.json()]
+
+    def test_documento_normalizado(self):
+        self.ana.refresh_from_db()
+        self.assertEqual(self.ana.documento_normalizado, '800123456')
+        self.assertEqual(self.ana.telefono_normalizado, '0981123456')
+        self.assertEqual(clientes.normalizar('80.012.345-6'), '800123456')
+
+    def test_prefijo_de_documento_con_o_sin_separadores(self):
+        self.assertEqual(self._buscar('80012'), ['Ana Gómez'])
+        self.assertEqual(self._buscar('80.012.345-6'), ['Ana Gómez'])
+        self.assertEqual(self._buscar('123'), ['Juan Pérez'])
+
+    def test_prefijo_de_telefono_y_nombre(self):
+        self.assertEqual(self._buscar('0981 12'), ['Ana Gómez'])
+        self.assertEqual(self._buscar('pérez'), ['Juan Pérez'])
+
+    def test_documento_exacto_primero(self):
+        Cliente.objects.create(nombre='Aaa Primero', numero_documento='12345678')
+        Cliente.objects.create(nombre='Otro', numero_documento='999', telefono='1234567000')
+        self.assertEqual(self._buscar('1234567'), ['Juan Pérez', 'Aaa Primero', 'Otro'])
+
+    def test_limite_inactivos_y_texto_corto(self):
+        Cliente.objects.bulk_create([
+            Cliente(nombre=f'Ferretería {i:02}', numero_documento=f'5550{i:02}') for i in range(15)
+        ])
+        Cliente.objects.filter(numero_documento='555000').update(activo=False)
+        resultado = self._buscar('5550')
+        self.assertEqual(len(resultado), clientes.LIMITE_AUTOCOMPLETAR)
+        self.assertEqual(resultado[0], 'Ferretería 01')
+        self.assertEqual(self._buscar('5'), [])
+        self.assertEqual(self._buscar(''), [])
+
+    def test_una_consulta(self):
+        with self.assertNumQueries(1):
+            clientes.autocompletar('80012')
+
+    def test_comodines_se_escapan(self):
+        self.assertEqual(self._buscar('%%'), [])
+
+    def test_buscar_por_documento_con_formato(self):
+        response = self.client.get('/api/clientes/buscar_por_documento/', {'documento': '80.012.345-6'})
+        self.assertTrue(response.json()['encontrado'])
+        self.assertEqual(response.json()['cliente']['id'], self.ana.id)
+
+        response = self.client.post('/api/clientes/crear_desde_factura/', {
+            'tipo_documento': 'ruc', 'numero_documento': '800123456', 'nombre': 'Duplicada',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_contadores_con_documento_formateado(self):
+        categoria = Categoria.objects.create(nombre="Herramientas")
+        producto = Producto.objects.create(codigo='MAR-01', nombre="Martillo", categoria=categoria,
+                                           stock_disponible=10, precio_unitario=Decimal('10000'))
+        response = self.client.post('/api/facturas/', {
+            'tipo_documento': 'ruc', 'numero_documento': '80.012.345-6', 'nombre_cliente': 'Ana Gómez',
+            'exonerado_iva': True,
+            'detalles': [{'producto': producto.id, 'cantidad': 1, 'precio_unitario': '10000', 'subtotal': '10000'}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        self.ana.refresh_from_db()
+        self.assertEqual((self.ana.total_compras, self.ana.monto_total_compras), (1, Decimal('10000')))
+
+        Cliente.objects.update(total_compras=0, monto_total_compras=0)
+        clientes.recalcular()
+        self.ana.refresh_from_db()
+        self.assertEqual(self.ana.total_compras, 1)
+
+    def test_indices_de_prefijo(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexdef FROM pg_indexes WHERE indexname = 'idx_cliente_doc_prefijo'")
+            definicion = cursor.fetchone()[0]
+        self.assertIn('documento_normalizado varchar_pattern_ops', definicion)
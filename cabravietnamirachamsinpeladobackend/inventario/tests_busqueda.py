@@ -0,0 +1,103 @@
+"""
+Tests de la búsqueda de productos (inventario/busqueda.py)
+"""
+from decimal import Decimal
+from unittest import skipUnless
+from django.db import connection
+from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import Categoria, Producto
+from inventario.busqueda import consulta_prefijos, _trigramas_disponibles
+
+
+class BusquedaProductosTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nombre="Herramientas")
+        datos = [
+            ('LL-14', 'Llave de tubo 14mm', 'Bahco', None),
+            ('LL-17', 'Llave combinada 17mm', 'Stanley', None),
+            ('MAR-01', 'Martillo carpintero', 'Stanley', None),
+            ('FIL-01', 'Filtro de aceite', 'Wega', 'Corolla 2010, Hilux'),
+            ('TOR-08', 'Tornillos autoperforantes', 'Fischer', None),
+        ]
+        for codigo, nombre, marca, modelos in datos:
+            Producto.objects.create(
+                codigo=codigo, nombre=nombre, marca=marca, modelo_compatible=modelos,
+                categoria=categoria, stock_disponible=10, precio_unitario=Decimal('1000')
+            )
+        Producto.objects.create(
+            codigo='LL-99', nombre='Llave discontinuada', categoria=categoria,
+            precio_unitario=Decimal('1000'), activo=False
+        )
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='cajero', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _buscar(self, q, **params):
+        response = self.client.get('/api/productos/buscar/', {'q': q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [p['nombre'] for p in response.data]
+
+    def test_prefijo_mientras_se_escribe(self):
+        self.assertEqual(self._buscar('marti'), ['Martillo carpintero'])
+
+    def test_todas_las_palabras(self):
+        self.assertEqual(self._buscar('llave 14'), ['Llave de tubo 14mm'])
+
+    def test_plural_y_stemming(self):
+        self.assertEqual(self._buscar('tornillo'), ['Tornillos autoperforantes'])
+
+    def test_busca_en_marca_y_modelos(self):
+        self.assertEqual(len(self._buscar('stanley')), 2)
+        self.assertEqual(self._buscar('hilux'), ['Filtro de aceite'])
+
+    def test_codigo_exacto_primero(self):
+        self.assertEqual(self._buscar('LL-17')[0], 'Llave combinada 17mm')
+
+    def test_excluye_inactivos(self):
+        self.assertNotIn('Llave discontinuada', self._buscar('llave'))
+        self.assertIn('Llave discontinuada', self._buscar('llave', activos='false'))
+
+    def test_limite_y_proyeccion_liviana(self):
+        response = self.client.get('/api/productos/buscar/', {'q': 'llave', 'limite': 1})
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(set(response.data[0]), {
+            'id', 'codigo', 'nombre', 'marca', 'categoria',
+            'precio_unitario', 'stock_disponible', 'stock_minimo'
+        })
+        self.assertEqual(response.data[0]['categoria'], 'Herramientas')
+
+    def test_texto_vacio(self):
+        self.assertEqual(self._buscar(''), [])
+        self.assertEqual(self._buscar('  -- '), [])
+
+    def test_consulta_prefijos_escapa_operadores(self):
+        self.assertEqual(consulta_prefijos("llave & 'tubo' | !14"), 'llave:* & tubo:* & 14:*')
+
+    def test_requiere_autenticacion(self):
+        response = APIClient().get('/api/productos/buscar/', {'q': 'llave'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_usa_indice_gin(self):
+        """La columna generada tiene índice GIN"""
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(
+                "EXPLAIN SELECT id FROM inventario_producto "
+                "WHERE busqueda @@ to_tsquery('spanish', 'llave:*')"
+            )
+            plan = ' '.join(fila[0] for fila in cursor.fetchall())
+        self.assertIn('idx_producto_busqueda', plan)
+
+    @skipUnless(connection.vendor == 'postgresql', 'requiere PostgreSQL')
+    def test_tolerancia_a_errores_de_tipeo(self):
+        if not _trigramas_disponibles():
+            self.skipTest('pg_trgm no está instalado')
+        self.assertIn('Martillo carpintero', self._buscar('martilo'))
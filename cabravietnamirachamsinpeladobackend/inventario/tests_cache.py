@@ -0,0 +1,135 @@
+"""
+Tests de la caché compartida y su invalidación (inventario/cache.py)
+"""
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import cache as django_cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import Categoria, Producto, Proveedor, Cliente, Movimiento
+from inventario import cache
+
+
+class CacheCaida(LocMemCache):
+    """Backend que falla como un Redis sin conexión."""
+
+    def _caida(self, *args, **kwargs):
+        raise ConnectionError('redis down')
+
+    get = add = set = delete = get_many = set_many = delete_many = _caida
+
+
+class CacheCompartidaTest(TestCase):
+
+    def setUp(self):
+        django_cache.clear()
+        cache._contadores.clear()
+        self.categoria = Categoria.objects.create(nombre="Herramientas")
+        self.producto = Producto.objects.create(
+            codigo='MAR-01', nombre="Martillo", categoria=self.categoria,
+            stock_disponible=10, precio_unitario=Decimal('10000')
+        )
+        self.cliente = Cliente.objects.create(nombre='Juan Pérez', tipo_documento='cedula', numero_documento='1234567')
+        self.user = User.objects.create_user(username='cajero', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_categorias_sin_consultas_hasta_invalidar(self):
+        self.client.get('/api/categorias/dropdown/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/categorias/dropdown/')
+        self.assertEqual([c['nombre'] for c in response.json()], ['Herramientas'])
+
+        Categoria.objects.create(nombre="Pinturas")
+        response = self.client.get('/api/categorias/dropdown/')
+        self.assertEqual([c['nombre'] for c in response.json()], ['Herramientas', 'Pinturas'])
+
+    def test_proveedores_invalidan_al_editar(self):
+        proveedor = Proveedor.objects.create(nombre="Proveedor A")
+        etag = self.client.get('/api/proveedores/dropdown/')['ETag']
+        proveedor.nombre = "Proveedor B"
+        proveedor.save()
+        response = self.client.get('/api/proveedores/dropdown/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()[0]['nombre'], "Proveedor B")
+
+    def test_detalle_de_producto_y_movimientos(self):
+        url = f'/api/productos/{self.producto.id}/'
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.json()['categoria'], 'Herramientas')
+
+        Movimiento.objects.create(producto=self.producto, tipo='salida', cantidad=4)
+        self.assertEqual(self.client.get(url).json()['stock_disponible'], 6)
+
+        self.categoria.nombre = "Herramientas manuales"
+        self.categoria.save()
+        self.assertEqual(self.client.get(url).json()['categoria'], 'Herramientas manuales')
+
+        self.assertEqual(self.client.get('/api/productos/999999/').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_por_codigo_sigue_cambios_de_codigo(self):
+        response = self.client.get('/api/productos/por_codigo/', {'codigo': 'MAR-01'})
+        self.assertEqual(response.json()['id'], self.producto.id)
+
+        self.producto.codigo = 'MAR-02'
+        self.producto.save()
+        response = self.client.get('/api/productos/por_codigo/', {'codigo': 'MAR-01'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get('/api/productos/por_codigo/', {'codigo': 'MAR-02'})
+        self.assertEqual(response.json()['id'], self.producto.id)
+
+        response = self.client.get('/api/productos/por_codigo/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cliente_por_documento(self):
+        url = '/api/clientes/buscar_por_documento/'
+        self.assertTrue(self.client.get(url, {'documento': '1234567'}).json()['encontrado'])
+        self.assertFalse(self.client.get(url, {'documento': '7654321'}).json()['encontrado'])
+
+        self.cliente.numero_documento = '7654321'
+        self.cliente.save()
+        self.assertFalse(self.client.get(url, {'documento': '1234567'}).json()['encontrado'])
+        self.assertTrue(self.client.get(url, {'documento': '7654321'}).json()['encontrado'])
+
+        self.cliente.activo = False
+        self.cliente.save()
+        self.assertFalse(self.client.get(url, {'documento': '7654321'}).json()['encontrado'])
+
+    def test_contadores_en_health(self):
+        for _ in range(3):
+            self.client.get(f'/api/productos/{self.producto.id}/')
+        espacios = APIClient().get('/api/health/').json()['cache']['espacios']
+        self.assertEqual(espacios['producto']['aciertos'], 2)
+        self.assertEqual(espacios['producto']['fallos'], 1)
+
+    def test_sin_cache_consulta_la_base(self):
+        with mock.patch.object(cache.cache, 'get', side_effect=ConnectionError), \
+                self.assertLogs('inventario.cache', 'WARNING'):
+            response = self.client.get(f'/api/productos/{self.producto.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(cache.metricas()['espacios']['producto']['errores'], 1)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'inventario.tests_cache.CacheCaida'}})
+    def test_escrituras_confirmadas_con_cache_caida(self):
+        """La invalidación al confirmar no convierte la escritura en un 500"""
+        with self.assertLogs('inventario.cache', 'WARNING'), \
+                self.captureOnCommitCallbacks(execute=True):
+            producto = Producto.objects.create(codigo='CLA-01', nombre="Clavo", categoria=self.categoria,
+                                               stock_disponible=0, precio_unitario=Decimal('100'))
+            Movimiento.objects.create(producto=producto, tipo='entrada', cantidad=5)
+            self.categoria.nombre = 'Ferretería'
+            self.categoria.save()  # invalidar_espacio('producto')
+        producto.refresh_from_db()
+        self.assertEqual(producto.stock_disponible, 5)
+
+        with self.assertLogs('inventario.cache', 'WARNING'), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/productos/{producto.id}/', {'nombre': 'Clavo 2"'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(cache.metricas()['espacios']['producto']['errores'], 0)
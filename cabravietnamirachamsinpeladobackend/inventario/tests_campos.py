@@ -0,0 +1,140 @@
+"""
+Tests de ?fields= / ?expand= y de los serializers de listado (inventario/campos.py)
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.core.cache import cache as django_cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import (Categoria, Producto, Proveedor, ProductoProveedor, OrdenCompra,
+                               DetalleOrdenCompra, FacturaCompra)
+
+
+class CamposTest(TestCase):
+
+    def setUp(self):
+        django_cache.clear()
+        self.categoria = Categoria.objects.create(nombre="Herramientas")
+        self.productos = [
+            Producto.objects.create(codigo=f'HER-{i}', nombre=f"Herramienta {i}", categoria=self.categoria,
+                                    stock_disponible=100, precio_unitario=Decimal('1000'))
+            for i in range(3)
+        ]
+        self.proveedor = Proveedor.objects.create(nombre="Tramontina")
+        self.user = User.objects.create_user(username='cajero', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        return response.json()
+
+    def _vender(self, cantidad_facturas=3):
+        for _ in range(cantidad_facturas):
+            response = self.client.post('/api/facturas/', {
+                'tipo_documento': 'ninguno', 'nombre_cliente': 'Consumidor final', 'exonerado_iva': True,
+                'detalles': [{'producto': p.id, 'cantidad': 1, 'precio_unitario': '1000', 'subtotal': '1000'}
+                             for p in self.productos],
+            }, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+
+    def test_listado_de_facturas_sin_detalles_salvo_expand(self):
+        self._vender()
+        with CaptureQueriesContext(connection) as contexto:
+            facturas = self._get('/api/facturas/')['results']
+        self.assertNotIn('detalles', facturas[0])
+        self.assertIn('total', facturas[0])
+        self.assertFalse([q for q in contexto.captured_queries if 'inventario_detallefactura' in q['sql']])
+
+        facturas = self._get('/api/facturas/', expand='detalles')['results']
+        self.assertEqual(len(facturas[0]['detalles']), 3)
+
+        # Pedir el anidado en ?fields también lo expande
+        facturas = self._get('/api/facturas/', fields='id,detalles')['results']
+        self.assertEqual(set(facturas[0]), {'id', 'detalles'})
+
+        # El detalle sigue completo
+        factura = self._get(f"/api/facturas/{facturas[0]['id']}/")
+        self.assertEqual(len(factura['detalles']), 3)
+
+    def test_fields_lee_solo_esas_columnas(self):
+        self._vender()
+        with CaptureQueriesContext(connection) as contexto:
+            datos = self._get('/api/facturas/', fields='id,numero_factura,total', page_size=2)
+        self.assertEqual(set(datos['results'][0]), {'id', 'numero_factura', 'total'})
+        self.assertIsNotNone(datos['next'])  # keyset: fecha se sigue leyendo para el cursor
+        self.assertEqual(len(contexto.captured_queries), 1)
+        sql = contexto.captured_queries[0]['sql']
+        self.assertIn('"numero_factura"', sql)
+        self.assertNotIn('"observaciones"', sql)
+        self.assertNotIn('"nombre_cliente"', sql)
+
+        siguiente = self.client.get(datos['next']).json()
+        self.assertEqual(set(siguiente['results'][0]), {'id', 'numero_factura', 'total'})
+
+    def test_fields_descarta_joins_que_no_se_muestran(self):
+        with CaptureQueriesContext(connection) as contexto:
+            productos = self._get('/api/productos/', fields='id,nombre')['results']
+        self.assertEqual(set(productos[0]), {'id', 'nombre'})
+        self.assertEqual(len(contexto.captured_queries), 2)  # count + página
+        self.assertNotIn('JOIN', contexto.captured_queries[-1]['sql'])
+
+        productos = self._get('/api/productos/', fields='id,categoria')['results']
+        self.assertEqual(productos[0]['categoria'], 'Herramientas')
+
+        # Detalle desde la caché, recortado
+        producto = self._get(f'/api/productos/{self.productos[0].id}/', fields='codigo,stock_disponible')
+        self.assertEqual(producto, {'codigo': 'HER-0', 'stock_disponible': 100})
+
+    def test_ordenes_con_cantidad_de_items(self):
+        for numero in ('OC-1', 'OC-2'):
+            orden = OrdenCompra.objects.create(numero_orden=numero, proveedor=self.proveedor,
+                                               fecha_esperada=timezone.localdate())
+            DetalleOrdenCompra.objects.bulk_create([
+                DetalleOrdenCompra(orden_compra=orden, producto=p, cantidad_solicitada=5,
+                                   precio_unitario=Decimal('600'), subtotal=Decimal('3000'))
+                for p in self.productos
+            ])
+        with self.assertNumQueries(2):
+            ordenes = self._get('/api/ordenes-compra/')['results']
+        self.assertEqual([o['cantidad_items'] for o in ordenes], [3, 3])
+        self.assertNotIn('detalles', ordenes[0])
+
+        ordenes = self._get('/api/ordenes-compra/', expand='detalles')['results']
+        self.assertEqual(len(ordenes[0]['detalles']), 3)
+        self.assertNotIn('cantidad_items', ordenes[0])
+
+    def test_proveedores_sin_productos_salvo_expand(self):
+        ProductoProveedor.objects.create(producto=self.productos[0], proveedor=self.proveedor,
+                                         precio_compra=Decimal('600'))
+        with self.assertNumQueries(2):
+            proveedores = self._get('/api/proveedores/')['results']
+        self.assertNotIn('productos_suministrados', proveedores[0])
+
+        proveedores = self._get('/api/proveedores/', expand='productos_suministrados')['results']
+        self.assertEqual(len(proveedores[0]['productos_suministrados']), 1)
+
+    def test_campos_calculados_leen_sus_columnas(self):
+        hoy = timezone.localdate()
+        for i in range(3):
+            FacturaCompra.objects.create(
+                numero_factura=f'C-{i}', proveedor=self.proveedor, fecha_emision=hoy,
+                tipo_factura='credito', fecha_vencimiento=hoy - timedelta(days=1),
+                subtotal=Decimal('1000'), total=Decimal('1000'),
+            )
+        with self.assertNumQueries(1):
+            facturas = self._get('/api/facturas-compra/', fields='numero_factura,esta_vencida,proveedor_nombre')
+        self.assertEqual(facturas['results'][0],
+                         {'numero_factura': 'C-2', 'esta_vencida': True, 'proveedor_nombre': 'Tramontina'})
+
+    def test_escrituras_no_se_ven_afectadas(self):
+        response = self.client.post('/api/proveedores/?fields=id', {'nombre': 'Nuevo'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn('productos_suministrados', response.json())
@@ -0,0 +1,116 @@
+"""
+Tests de la importación masiva del catálogo (inventario/catalogo.py)
+"""
+import csv
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from inventario.models import Categoria, Producto, Movimiento
+
+ENCABEZADOS = ['Código', 'Nombre del repuesto', 'Categoría', 'Marca', 'Stock actual',
+               'Stock mínimo', 'Precio de costo', 'Precio de venta']
+
+
+class ImportarCatalogoTest(TestCase):
+
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nombre="Filtros")
+        self.existente = Producto.objects.create(
+            codigo='FIL-01', nombre="Filtro de aceite", categoria=self.categoria, marca='Wega',
+            stock_disponible=7, stock_minimo=2, precio_costo=Decimal('10000'), precio_unitario=Decimal('13000')
+        )
+
+    def _planilla(self, filas, encabezados=ENCABEZADOS):
+        archivo = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8', newline='')
+        with archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(encabezados)
+            escritor.writerows(filas)
+        self.addCleanup(os.remove, archivo.name)
+        return archivo.name
+
+    def _importar(self, filas, *opciones):
+        salida = StringIO()
+        call_command('importar_catalogo', self._planilla(filas), *opciones, stdout=salida)
+        return salida.getvalue()
+
+    def test_crea_actualiza_y_omite_sin_cambios(self):
+        salida = self._importar([
+            ['FIL-01', 'Filtro de aceite', 'Filtros', 'Wega', '50', '2', '10000', '13000'],   # igual
+            ['FIL-02', 'Filtro de aire', 'Filtros', 'Mann', '4', '1', '20000', ''],           # nuevo
+            ['BUJ-01', 'Bujía', 'Encendido', 'NGK', '10', '5', '5000', '8000'],               # nuevo + categoría
+        ])
+        self.assertIn('2 nuevos, 0 actualizados, 1 sin cambios, 0 omitidas, 1 categorías nuevas', salida)
+        self.assertIn('filas/s', salida)
+
+        nuevo = Producto.objects.get(codigo='FIL-02')
+        self.assertEqual(nuevo.categoria, self.categoria)
+        self.assertEqual(nuevo.stock_disponible, 4)
+        self.assertEqual(nuevo.precio_unitario, Decimal('26000.00'))  # costo + 30%
+        self.assertEqual(Producto.objects.get(codigo='BUJ-01').categoria.nombre, 'Encendido')
+
+    def test_actualiza_sin_pisar_stock(self):
+        salida = self._importar([
+            ['FIL-01', 'Filtro de aceite', 'Filtros', 'Wega', '50', '3', '11000', '14300'],
+        ])
+        self.assertIn('0 nuevos, 1 actualizados', salida)
+        self.existente.refresh_from_db()
+        self.assertEqual(self.existente.precio_costo, Decimal('10000'))  # costo promedio
+        self.assertEqual(self.existente.precio_unitario, Decimal('14300'))
+        self.assertEqual(self.existente.stock_minimo, 3)
+        self.assertEqual(self.existente.stock_disponible, 7)
+        self.assertIsNotNone(self.existente.fecha_actualizacion)
+
+    def test_reimportar_no_pisa_costo_promedio(self):
+        # (7 * 10000 + 3 * 14000) / 10 = 11200
+        Movimiento.objects.create(producto=self.existente, tipo='entrada', cantidad=3,
+                                  costo_unitario=Decimal('14000'))
+        salida = self._importar([
+            ['FIL-01', 'Filtro de aceite', 'Filtros', 'Wega', '50', '2', '9000', '13000'],
+        ])
+        self.assertIn('0 nuevos, 0 actualizados, 1 sin cambios', salida)
+        self.existente.refresh_from_db()
+        self.assertEqual(self.existente.precio_costo, Decimal('11200'))
+        self.assertEqual(self.existente.stock_disponible, 10)
+
+    def test_dry_run_no_escribe(self):
+        salida = self._importar([
+            ['FIL-01', 'Filtro de aceite', 'Filtros', 'Wega', '50', '3', '11000', '14300'],
+            ['BUJ-01', 'Bujía', 'Encendido', 'NGK', '10', '5', '5000', '8000'],
+        ], '--dry-run')
+        self.assertIn('[dry-run] 1 nuevos, 1 actualizados', salida)
+        self.assertFalse(Producto.objects.filter(codigo='BUJ-01').exists())
+        self.assertFalse(Categoria.objects.filter(nombre='Encendido').exists())
+        self.existente.refresh_from_db()
+        self.assertEqual(self.existente.precio_costo, Decimal('10000'))
+
+    def test_filas_incompletas_y_codigos_repetidos(self):
+        salida = self._importar([
+            ['', 'Sin código', 'Filtros', '', '', '', '', ''],
+            ['X-1', '', 'Filtros', '', '', '', '', ''],
+            ['X-2', 'Primera versión', '', '', 'abc', '', '1,5', ''],
+            ['X-2', 'Segunda versión', '', '', '', '', '', ''],
+        ])
+        self.assertIn('1 nuevos', salida)
+        self.assertIn('2 omitidas', salida)
+        producto = Producto.objects.get(codigo='X-2')
+        self.assertEqual(producto.nombre, 'Segunda versión')
+        self.assertEqual(producto.categoria.nombre, 'SIN CATEGORÍA')
+
+    def test_consultas_no_dependen_de_las_filas(self):
+        filas = [[f'P-{i}', f'Producto {i}', 'Filtros', '', '1', '0', '100', '130'] for i in range(300)]
+        ruta = self._planilla(filas)
+        with self.assertNumQueries(6):
+            call_command('importar_catalogo', ruta, stdout=StringIO())
+        self.assertEqual(Producto.objects.count(), 301)
+
+    def test_columnas_obligatorias(self):
+        with self.assertRaises(CommandError):
+            call_command('importar_catalogo', self._planilla([['x']], ['Nombre']), stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('importar_catalogo', '/no/existe.csv', stdout=StringIO())
@@ -0,0 +1,102 @@
+"""
+Tests del GET condicional de los dropdowns (inventario/condicional.py)
+"""
+import gzip
+import json
+from decimal import Decimal
+from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import Categoria, Producto, Proveedor, Cliente, Movimiento
+
+
+class DropdownCondicionalTest(TestCase):
+
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nombre="Herramientas")
+        self.producto = Producto.objects.create(
+            codigo='MAR-01', nombre="Martillo", categoria=self.categoria,
+            stock_disponible=10, precio_unitario=Decimal('10000')
+        )
+        self.proveedor = Proveedor.objects.create(nombre="Proveedor A")
+        self.cliente = Cliente.objects.create(nombre='Juan Pérez', tipo_documento='cedula', numero_documento='1234567')
+        self.user = User.objects.create_user(username='cajero', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _revalidar(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_304_con_etag_vigente(self):
+        for url in ('/api/productos/dropdown/', '/api/proveedores/dropdown/',
+                    '/api/categorias/dropdown/', '/api/clientes/dropdown/'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertTrue(response['ETag'].startswith('W/"'))
+                self.assertIn('no-cache', response['Cache-Control'])
+                self.assertEqual(len(response.json()), 1)
+
+                response = self._revalidar(url, response['ETag'])
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+                self.assertEqual(response.content, b'')
+
+    def test_304_no_serializa(self):
+        etag = self.client.get('/api/productos/dropdown/')['ETag']
+        with self.assertNumQueries(1):
+            response = self._revalidar('/api/productos/dropdown/', etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_movimiento_de_stock_cambia_version(self):
+        etag = self.client.get('/api/productos/dropdown/')['ETag']
+        Movimiento.objects.create(producto=self.producto, tipo='salida', cantidad=3)
+
+        response = self._revalidar('/api/productos/dropdown/', etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()[0]['stock_disponible'], 7)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_update_fields_cambia_version(self):
+        etag = self.client.get('/api/productos/dropdown/')['ETag']
+        self.producto.precio_costo = Decimal('6000')
+        self.producto.save(update_fields=['precio_costo'])
+        self.assertEqual(self._revalidar('/api/productos/dropdown/', etag).status_code, status.HTTP_200_OK)
+
+    def test_alta_baja_y_edicion_cambian_version(self):
+        url = '/api/categorias/dropdown/'
+        etag = self.client.get(url)['ETag']
+        otra = Categoria.objects.create(nombre="Pinturas")
+        response = self._revalidar(url, etag)
+        self.assertEqual(len(response.json()), 2)
+
+        etag = response['ETag']
+        otra.delete()
+        response = self._revalidar(url, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        etag = response['ETag']
+        self.proveedor.nombre = "Proveedor B"
+        self.proveedor.save()
+        self.assertEqual(self._revalidar(url, etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get('/api/proveedores/dropdown/').json()[0]['nombre'], "Proveedor B")
+
+    def test_if_modified_since(self):
+        response = self.client.get('/api/clientes/dropdown/')
+        response = self.client.get('/api/clientes/dropdown/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_requiere_autenticacion_antes_del_304(self):
+        etag = self.client.get('/api/productos/dropdown/')['ETag']
+        response = APIClient().get('/api/productos/dropdown/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_gzip(self):
+        Producto.objects.bulk_create([
+            Producto(codigo=f'P-{i}', nombre=f'Producto {i}', categoria=self.categoria, precio_unitario=Decimal('1000'))
+            for i in range(50)
+        ])
+        response = self.client.get('/api/productos/dropdown/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))), 51)
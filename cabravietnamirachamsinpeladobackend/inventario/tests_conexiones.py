@@ -0,0 +1,27 @@
+"""
+Tests de las métricas de conexiones (inventario/conexiones.py)
+"""
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario import conexiones
+
+
+class MetricasConexionesTest(TestCase):
+
+    def test_health_incluye_pool(self):
+        response = APIClient().get('/api/health/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        pool = response.data['pool']
+        self.assertEqual(pool['modo'], 'persistente')
+        self.assertEqual(pool['conn_max_age'], connection.settings_dict['CONN_MAX_AGE'])
+        self.assertGreaterEqual(pool['servidor']['total'], 1)
+        self.assertGreater(pool['servidor']['max_connections'], 0)
+        self.assertEqual(set(pool['proceso']), {'pid', 'conexiones_abiertas', 'requests', 'requests_por_conexion'})
+
+    def test_cuenta_requests(self):
+        antes = conexiones._contadores['requests']
+        APIClient().get('/api/health/')
+        self.assertEqual(conexiones._contadores['requests'], antes + 1)
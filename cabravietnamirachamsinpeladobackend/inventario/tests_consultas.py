@@ -0,0 +1,100 @@
+"""
+Tests de cantidad de consultas de los listados (N+1)
+
+Recorre todos los ViewSets registrados en el router: la cantidad de
+consultas de cada listado no puede crecer con la cantidad de filas.
+Un ViewSet nuevo sin datos de prueba en _poblar() hace fallar el test.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import (
+    Categoria, Subcategoria, Producto, Movimiento, Factura, DetalleFactura,
+    Proveedor, ProductoProveedor, OrdenCompra, DetalleOrdenCompra,
+    RecepcionMercaderia, DetalleRecepcion, Cliente, FacturaCompra, DetalleFacturaCompra
+)
+from inventario.serializers import ProductoSerializer
+from inventario_ferreteria.urls import router
+
+
+class ConsultasListadosTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.creados = 0
+
+    def _poblar(self, cantidad):
+        """Crea `cantidad` filas de cada modelo listado, con sus relaciones."""
+        for _ in range(cantidad):
+            self.creados += 1
+            n = self.creados
+            categoria = Categoria.objects.create(nombre=f"Categoria {n}")
+            subcategoria = Subcategoria.objects.create(nombre=f"Sub {n}", categoria=categoria)
+            proveedor = Proveedor.objects.create(nombre=f"Proveedor {n}")
+            producto = Producto.objects.create(
+                codigo=f"P-{n}", nombre=f"Producto {n}", categoria=categoria, subcategoria=subcategoria,
+                proveedor_principal=proveedor, stock_disponible=100, precio_unitario=Decimal('1000')
+            )
+            ProductoProveedor.objects.create(producto=producto, proveedor=proveedor, precio_compra=Decimal('700'))
+            Movimiento.objects.create(producto=producto, tipo='entrada', cantidad=1, usuario=self.user)
+            factura = Factura.objects.create(total=Decimal('1000'), usuario=self.user)
+            DetalleFactura.objects.create(
+                factura=factura, producto=producto, cantidad=1,
+                precio_unitario=Decimal('1000'), subtotal=Decimal('1000')
+            )
+            orden = OrdenCompra.objects.create(
+                numero_orden=f"OC-{n}", proveedor=proveedor, fecha_esperada=date.today(), usuario=self.user
+            )
+            DetalleOrdenCompra.objects.create(
+                orden_compra=orden, producto=producto, cantidad_solicitada=1,
+                precio_unitario=Decimal('700'), subtotal=Decimal('700')
+            )
+            recepcion = RecepcionMercaderia.objects.create(
+                numero_recepcion=f"REC-{n}", orden_compra=orden, proveedor=proveedor
+            )
+            DetalleRecepcion.objects.create(
+                recepcion=recepcion, producto=producto, cantidad_recibida=1, precio_unitario=Decimal('700')
+            )
+            Cliente.objects.create(nombre=f"Cliente {n}", numero_documento=f"{n}")
+            factura_compra = FacturaCompra.objects.create(
+                numero_factura=f"001-001-{n:07d}", proveedor=proveedor, orden_compra=orden,
+                fecha_emision=date.today(), fecha_vencimiento=date.today() + timedelta(days=30),
+                subtotal=Decimal('700'), total=Decimal('700'), usuario_registro=self.user
+            )
+            DetalleFacturaCompra.objects.create(
+                factura_compra=factura_compra, producto=producto, cantidad=1, precio_unitario=Decimal('700')
+            )
+
+    def _consultas(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url, {'page_size': 100})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        datos = response.data['results'] if isinstance(response.data, dict) else response.data
+        self.assertTrue(datos, f"{url} no devolvió filas: agregar datos en _poblar()")
+        return len(consultas)
+
+    def test_listados_no_escalan_con_filas(self):
+        self._poblar(2)
+        urls = [f'/api/{prefijo}/' for prefijo, _viewset, _basename in router.registry]
+        antes = {url: self._consultas(url) for url in urls}
+
+        self._poblar(5)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self._consultas(url), antes[url])
+
+    def test_listado_de_productos_mismo_formato_que_detalle(self):
+        self._poblar(1)
+        producto = Producto.objects.get()
+        response = self.client.get('/api/productos/')
+        self.assertEqual(response.data['results'][0], ProductoSerializer(producto).data)
+        self.assertEqual(response.data['results'][0]['categoria'], 'Categoria 1')
+        self.assertEqual(response.data['results'][0]['proveedor_principal'], 'Proveedor 1')
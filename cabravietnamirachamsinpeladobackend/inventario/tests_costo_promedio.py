@@ -0,0 +1,74 @@
+"""
+Tests del costo promedio ponderado (inventario/stock.py)
+"""
+from decimal import Decimal
+from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import Categoria, Producto, Proveedor, Movimiento
+from inventario.stock import registrar_movimientos
+
+
+class CostoPromedioTest(TestCase):
+
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nombre="Pinturas")
+        self.producto = Producto.objects.create(
+            codigo='PIN-01', nombre="Látex 4L", categoria=self.categoria,
+            stock_disponible=10, precio_costo=Decimal('100'), precio_unitario=Decimal('130')
+        )
+        self.user = User.objects.create_user(username='deposito', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _costo(self):
+        self.producto.refresh_from_db()
+        return self.producto.precio_costo
+
+    def test_entrada_con_costo_pondera(self):
+        Movimiento.objects.create(producto=self.producto, tipo='entrada', cantidad=30, costo_unitario=Decimal('120'))
+        # (10 * 100 + 30 * 120) / 40
+        self.assertEqual(self._costo(), Decimal('115.00'))
+        self.assertEqual(self.producto.stock_disponible, 40)
+
+    def test_salidas_y_entradas_sin_costo_no_cambian_el_promedio(self):
+        Movimiento.objects.create(producto=self.producto, tipo='salida', cantidad=4)
+        Movimiento.objects.create(producto=self.producto, tipo='entrada', cantidad=2)
+        self.assertEqual(self._costo(), Decimal('100.00'))
+
+    def test_sin_stock_toma_el_costo_de_la_entrada(self):
+        Movimiento.objects.create(producto=self.producto, tipo='salida', cantidad=10)
+        Movimiento.objects.create(producto=self.producto, tipo='entrada', cantidad=5, costo_unitario=Decimal('140'))
+        self.assertEqual(self._costo(), Decimal('140.00'))
+
+    def test_lote_varias_lineas_del_mismo_producto(self):
+        otro = Producto.objects.create(codigo='PIN-02', nombre="Sintético 1L", categoria=self.categoria,
+                                       stock_disponible=0, precio_costo=Decimal('0'), precio_unitario=Decimal('80'))
+        registrar_movimientos([
+            Movimiento(producto=self.producto, tipo='entrada', cantidad=10, costo_unitario=Decimal('110')),
+            Movimiento(producto=self.producto, tipo='entrada', cantidad=20, costo_unitario=Decimal('125')),
+            Movimiento(producto=otro, tipo='entrada', cantidad=3, costo_unitario=Decimal('55.55')),
+        ])
+        # (10 * 100 + 10 * 110 + 20 * 125) / 40
+        self.assertEqual(self._costo(), Decimal('115.00'))
+        otro.refresh_from_db()
+        self.assertEqual(otro.precio_costo, Decimal('55.55'))
+
+    def test_recepcion_pondera_costo_y_reprecia_venta(self):
+        proveedor = Proveedor.objects.create(nombre="Pinturerías del Sur")
+        response = self.client.post('/api/recepciones/', {
+            'numero_recepcion': 'REC-001',
+            'proveedor': proveedor.id,
+            'detalles': [{'producto': self.producto.id, 'cantidad_recibida': 10, 'precio_unitario': '140.00'}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        self.assertEqual(self._costo(), Decimal('120.00'))
+        self.assertEqual(self.producto.precio_unitario, Decimal('182.00'))  # último costo + 30%
+
+    def test_valorizacion_usa_el_costo_promedio(self):
+        Movimiento.objects.create(producto=self.producto, tipo='entrada', cantidad=10, costo_unitario=Decimal('200'))
+        response = self.client.get('/api/analytics/valorizacion-stock/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['total_costo'], 3000.0)
@@ -0,0 +1,91 @@
+"""
+Tests de las estadísticas de facturas de compra (inventario/cuentas_por_pagar.py)
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.core.cache import cache as django_cache
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import Proveedor, FacturaCompra
+from inventario import cuentas_por_pagar
+
+
+class EstadisticasFacturasCompraTest(TestCase):
+
+    def setUp(self):
+        django_cache.clear()
+        self.hoy = timezone.localdate()
+        self.ferrosur = Proveedor.objects.create(nombre="Ferrosur")
+        self.pinturas = Proveedor.objects.create(nombre="Pinturas SA")
+        self.user = User.objects.create_user(username='compras', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _factura(self, numero, proveedor, total, dias_emitida=0, vence_en=None, estado='pendiente'):
+        return FacturaCompra.objects.create(
+            numero_factura=numero, proveedor=proveedor, subtotal=Decimal(total), estado=estado,
+            fecha_emision=self.hoy - timedelta(days=dias_emitida),
+            fecha_vencimiento=self.hoy + timedelta(days=vence_en) if vence_en is not None else None,
+        )
+
+    def _estadisticas(self):
+        response = self.client.get('/api/facturas-compra/estadisticas/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_totales_compatibles(self):
+        self._factura('001', self.ferrosur, '1000', vence_en=-3)
+        self._factura('002', self.ferrosur, '500', vence_en=5)
+        self._factura('003', self.pinturas, '200', estado='pagada')
+        self._factura('004', self.pinturas, '300', estado='cancelada')
+
+        datos = self._estadisticas()
+        self.assertEqual(datos['total_facturas'], 4)
+        self.assertEqual(datos['facturas_pendientes'], 2)
+        self.assertEqual(datos['facturas_pagadas'], 1)
+        self.assertEqual(datos['facturas_vencidas'], 1)
+        self.assertEqual(datos['facturas_proximas_vencer'], 1)
+        self.assertEqual(Decimal(datos['monto_total_pendiente']), Decimal('1500'))
+        self.assertEqual(Decimal(datos['monto_total_pagado']), Decimal('200'))
+        self.assertEqual(Decimal(datos['monto_vencido']), Decimal('1000'))
+
+    def test_antiguedad_y_por_proveedor(self):
+        self._factura('001', self.ferrosur, '100', dias_emitida=0)
+        self._factura('002', self.ferrosur, '200', dias_emitida=30)
+        self._factura('003', self.pinturas, '300', dias_emitida=31)
+        self._factura('004', self.pinturas, '400', dias_emitida=75)
+        self._factura('005', self.pinturas, '500', dias_emitida=91)
+
+        datos = self._estadisticas()
+        self.assertEqual(
+            {clave: (tramo['facturas'], Decimal(tramo['monto'])) for clave, tramo in datos['antiguedad'].items()},
+            {'0_30': (2, Decimal('300')), '31_60': (1, Decimal('300')),
+             '61_90': (1, Decimal('400')), 'mas_90': (1, Decimal('500'))}
+        )
+        self.assertEqual([p['proveedor'] for p in datos['por_proveedor']], ['Pinturas SA', 'Ferrosur'])
+        self.assertEqual(Decimal(datos['por_proveedor'][0]['antiguedad']['mas_90']), Decimal('500'))
+
+    def test_una_consulta_y_cache_del_dia(self):
+        self._factura('001', self.ferrosur, '100')
+        with self.assertNumQueries(1):
+            cuentas_por_pagar.estadisticas()
+
+        self._estadisticas()
+        with self.assertNumQueries(0):
+            self._estadisticas()
+
+        factura = self._factura('002', self.pinturas, '50')
+        self.assertEqual(self._estadisticas()['facturas_pendientes'], 2)
+        factura.estado = 'pagada'
+        factura.save()
+        self.assertEqual(self._estadisticas()['facturas_pagadas'], 1)
+
+    def test_sin_facturas(self):
+        datos = self._estadisticas()
+        self.assertEqual(datos['total_facturas'], 0)
+        self.assertEqual(Decimal(datos['monto_total_pendiente']), Decimal('0'))
+        self.assertEqual(datos['por_proveedor'], [])
@@ -0,0 +1,103 @@
+"""
+Tests de las estadísticas de compras por cliente (inventario/clientes.py)
+"""
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import Categoria, Producto, Cliente, Factura
+
+
+class EstadisticasClientesTest(TestCase):
+
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nombre="Herramientas")
+        self.producto = Producto.objects.create(
+            codigo='MAR-01', nombre="Martillo", categoria=self.categoria,
+            stock_disponible=100, precio_unitario=Decimal('10000')
+        )
+        self.juan = Cliente.objects.create(nombre='Juan Pérez', tipo_documento='cedula', numero_documento='1234567')
+        self.ana = Cliente.objects.create(nombre='Ana Gómez', tipo_documento='ruc', numero_documento='80012345-6')
+        self.user = User.objects.create_user(username='cajero', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _vender(self, cliente, cantidad=1, tipo_documento=None):
+        response = self.client.post('/api/facturas/', {
+            'tipo_documento': tipo_documento or cliente.tipo_documento,
+            'numero_documento': cliente.numero_documento,
+            'nombre_cliente': cliente.nombre,
+            'exonerado_iva': True,
+            'detalles': [{'producto': self.producto.id, 'cantidad': cantidad, 'precio_unitario': '10000',
+                          'subtotal': str(cantidad * 10000)}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        return response.json()
+
+    def _contadores(self, cliente):
+        cliente.refresh_from_db()
+        return cliente.total_compras, cliente.monto_total_compras
+
+    def test_factura_suma_al_cliente(self):
+        self._vender(self.juan, 2)
+        self._vender(self.juan, 1)
+        self.assertEqual(self._contadores(self.juan), (2, Decimal('30000')))
+        self.assertEqual(self._contadores(self.ana), (0, Decimal('0')))
+
+    def test_sin_documento_no_suma(self):
+        self._vender(self.juan, 1, tipo_documento='ninguno')
+        self.assertEqual(self._contadores(self.juan), (0, Decimal('0')))
+
+    def test_eliminar_factura_resta(self):
+        factura = self._vender(self.juan, 3)
+        self._vender(self.juan, 1)
+        Factura.objects.get(pk=factura['id']).delete()
+        self.assertEqual(self._contadores(self.juan), (1, Decimal('10000')))
+
+        # Contadores previos al registro: nunca negativos
+        Cliente.objects.filter(pk=self.juan.pk).update(total_compras=0, monto_total_compras=0)
+        Factura.objects.all().delete()
+        self.assertEqual(self._contadores(self.juan), (0, Decimal('0')))
+
+    def test_recalcular_desde_facturas(self):
+        self._vender(self.juan, 2)
+        self._vender(self.ana, 5)
+        self._vender(self.ana, 1)
+        Cliente.objects.update(total_compras=99, monto_total_compras=1)
+        salida = StringIO()
+        call_command('recalcular_estadisticas_clientes', stdout=salida)
+        self.assertIn('2 clientes actualizados', salida.getvalue())
+        self.assertEqual(self._contadores(self.juan), (1, Decimal('20000')))
+        self.assertEqual(self._contadores(self.ana), (2, Decimal('60000')))
+
+        call_command('recalcular_estadisticas_clientes', stdout=salida)
+        self.assertIn('0 clientes actualizados', salida.getvalue())
+
+    def test_recalcular_con_centavos(self):
+        Factura.objects.create(tipo_documento='cedula', numero_documento='1234567', total=Decimal('500.30'))
+        Factura.objects.create(tipo_documento='cedula', numero_documento='1234567', total=Decimal('600.25'))
+        Cliente.objects.filter(pk=self.juan.pk).update(monto_total_compras=Decimal('1101.00'))
+        salida = StringIO()
+        call_command('recalcular_estadisticas_clientes', stdout=salida)
+        self.assertIn('1 clientes actualizados', salida.getvalue())
+        self.assertEqual(self._contadores(self.juan), (2, Decimal('1100.55')))
+
+    def test_top_clientes(self):
+        self._vender(self.juan, 1)
+        self._vender(self.juan, 1)
+        self._vender(self.ana, 5)
+        Cliente.objects.create(nombre='Sin compras', numero_documento='999')
+
+        with self.assertNumQueries(1):
+            por_monto = self.client.get('/api/clientes/top/').json()
+        self.assertEqual([c['nombre'] for c in por_monto], ['Ana Gómez', 'Juan Pérez'])
+
+        por_compras = self.client.get('/api/clientes/top/', {'orden': 'compras', 'limite': 1}).json()
+        self.assertEqual([c['nombre'] for c in por_compras], ['Juan Pérez'])
+
+        response = self.client.get('/api/clientes/top/', {'orden': 'otro'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,103 @@
+"""
+Tests de la exportación CSV por streaming (inventario/exportar.py)
+"""
+import csv
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import Categoria, Producto, Movimiento, Proveedor, FacturaCompra
+from inventario import exportar
+
+
+class ExportarCSVTest(TestCase):
+
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nombre="Herramientas")
+        self.producto = Producto.objects.create(
+            codigo='MAR-01', nombre="Martillo ñandutí", categoria=self.categoria,
+            stock_disponible=20, precio_unitario=Decimal('10000')
+        )
+        self.user = User.objects.create_user(username='cajero', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _exportar(self, recurso, **params):
+        response = self.client.get(f'/api/exportar/{recurso}/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        contenido = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(contenido.startswith('\ufeff'))
+        return list(csv.reader(StringIO(contenido[1:])))
+
+    def _facturar(self, cantidad):
+        response = self.client.post('/api/facturas/', {
+            'tipo_documento': 'ninguno',
+            'detalles': [{
+                'producto': self.producto.id,
+                'cantidad': cantidad,
+                'precio_unitario': '10000',
+                'subtotal': str(10000 * cantidad),
+            }]
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_productos(self):
+        filas = self._exportar('productos')
+        self.assertEqual(filas[0][:3], ['Código', 'Nombre', 'Categoría'])
+        self.assertEqual(filas[1][:3], ['MAR-01', 'Martillo ñandutí', 'Herramientas'])
+        self.assertEqual(filas[1][-1], 'Sí')
+
+    def test_movimientos_con_rango(self):
+        anterior = Movimiento.objects.create(producto=self.producto, tipo='entrada', cantidad=5)
+        Movimiento.objects.filter(pk=anterior.pk).update(fecha=timezone.now() - timedelta(days=10))
+        Movimiento.objects.create(producto=self.producto, tipo='salida', cantidad=2, usuario=self.user)
+
+        self.assertEqual(len(self._exportar('movimientos')), 3)
+        filas = self._exportar('movimientos', desde=timezone.localdate().isoformat())
+        self.assertEqual(len(filas), 2)
+        self.assertEqual(filas[1][1:5], ['salida', 'MAR-01', 'Martillo ñandutí', '2'])
+        self.assertEqual(filas[1][6], 'cajero')
+
+    def test_facturas_una_fila_por_linea(self):
+        self._facturar(2)
+        self._facturar(1)
+        filas = self._exportar('facturas')
+        self.assertEqual(len(filas), 3)
+        self.assertEqual([fila[7] for fila in filas[1:]], ['2', '1'])
+
+    def test_facturas_compra(self):
+        proveedor = Proveedor.objects.create(nombre="Proveedor A")
+        FacturaCompra.objects.create(
+            numero_factura='001-001-0000001', proveedor=proveedor, fecha_emision=date.today(),
+            subtotal=Decimal('1000'), total=Decimal('1000')
+        )
+        filas = self._exportar('facturas-compra', hasta=(date.today() - timedelta(days=1)).isoformat())
+        self.assertEqual(len(filas), 1)
+        filas = self._exportar('facturas-compra')
+        self.assertEqual(filas[1][:2], ['001-001-0000001', 'Proveedor A'])
+
+    def test_bloques(self):
+        """Se escribe de a FILAS_POR_BLOQUE filas, no todo el archivo de una vez"""
+        filas = ([i] for i in range(exportar.FILAS_POR_BLOQUE * 2 + 1))
+        bloques = list(exportar.lineas_csv(['n'], filas))
+        self.assertEqual(len(bloques), 4)
+
+    def test_recurso_desconocido(self):
+        response = self.client.get('/api/exportar/usuarios/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_fechas_invalidas(self):
+        response = self.client.get('/api/exportar/movimientos/', {'desde': '2025-13-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/exportar/movimientos/', {'desde': '2025-02-01', 'hasta': '2025-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requiere_autenticacion(self):
+        response = APIClient().get('/api/exportar/productos/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,118 @@
+"""
+Tests de los datos de impresión de facturas (inventario/impresion.py)
+"""
+from decimal import Decimal
+from django.core.cache import cache as django_cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import Categoria, Producto, Factura, DetalleFactura
+
+
+class ImpresionFacturasTest(TestCase):
+
+    def setUp(self):
+        django_cache.clear()
+        self.categoria = Categoria.objects.create(nombre="Herramientas")
+        self.productos = [
+            Producto.objects.create(codigo=f'HER-{i}', nombre=f"Herramienta {i}", categoria=self.categoria,
+                                    marca='Tramontina', stock_disponible=100, precio_unitario=Decimal('1000'))
+            for i in range(8)
+        ]
+        self.user = User.objects.create_user(username='cajero', password='12345', first_name='Ana', last_name='Gómez')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _vender(self, productos, nombre='Juan Pérez'):
+        response = self.client.post('/api/facturas/', {
+            'tipo_documento': 'cedula', 'numero_documento': '1234567', 'nombre_cliente': nombre,
+            'exonerado_iva': True,
+            'detalles': [{'producto': p.id, 'cantidad': 2, 'precio_unitario': '1000', 'subtotal': '2000'}
+                         for p in productos],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        return response.json()['id']
+
+    def test_tres_consultas_sin_importar_las_lineas(self):
+        factura = self._vender(self.productos)
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/facturas/{factura}/datos_completos/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        datos = response.json()
+        self.assertEqual(len(datos['detalles']), 8)
+        self.assertEqual(datos['detalles'][0], {
+            'producto': 'Herramienta 0', 'codigo': 'HER-0', 'descripcion': None, 'cantidad': 2,
+            'precio_unitario': 1000.0, 'subtotal': 2000.0, 'categoria': 'Herramientas', 'marca': 'Tramontina',
+        })
+        self.assertEqual(datos['vendedor'], {'nombre': 'Ana Gómez', 'username': 'cajero'})
+        self.assertEqual(datos['cliente']['tipo_documento'], 'Cédula de Identidad')
+        self.assertEqual(datos['total'], 16000.0)
+
+    def test_cacheado_hasta_modificar_la_factura(self):
+        factura = self._vender(self.productos[:2])
+        self.client.get(f'/api/facturas/{factura}/datos_completos/')
+        with self.assertNumQueries(1):
+            self.client.get(f'/api/facturas/{factura}/datos_completos/')
+
+        instancia = Factura.objects.get(pk=factura)
+        instancia.observaciones = 'Entregar el lunes'
+        instancia.save()
+        datos = self.client.get(f'/api/facturas/{factura}/datos_completos/').json()
+        self.assertEqual(datos['observaciones'], 'Entregar el lunes')
+
+        DetalleFactura.objects.filter(factura_id=factura).first().delete()
+        datos = self.client.get(f'/api/facturas/{factura}/datos_completos/').json()
+        self.assertEqual(len(datos['detalles']), 1)
+
+    def test_borrar_factura_sin_consulta_por_linea(self):
+        factura = self._vender(self.productos)
+        self.client.get(f'/api/facturas/{factura}/datos_completos/')
+
+        with CaptureQueriesContext(connection) as contexto:
+            Factura.objects.get(pk=factura).delete()
+        numeros = [q['sql'] for q in contexto.captured_queries
+                   if q['sql'].startswith('SELECT "inventario_factura"."numero_factura" FROM')]
+        self.assertEqual(numeros, [])
+        self.assertEqual(self.client.get(f'/api/facturas/{factura}/datos_completos/').status_code,
+                         status.HTTP_404_NOT_FOUND)
+
+    def test_linea_con_factura_cargada_invalida_sin_consulta(self):
+        factura = self._vender(self.productos[:2])
+        self.client.get(f'/api/facturas/{factura}/datos_completos/')
+        detalle = DetalleFactura.objects.select_related('factura').filter(factura_id=factura).first()
+        detalle.precio_unitario = Decimal('900')
+        with self.assertNumQueries(1):  # solo el UPDATE
+            detalle.save(update_fields=['precio_unitario'])
+        datos = self.client.get(f'/api/facturas/{factura}/datos_completos/').json()
+        self.assertEqual(datos['detalles'][0]['precio_unitario'], 900.0)
+
+    def test_lote_en_el_orden_pedido(self):
+        ids = [self._vender(self.productos[i:i + 2], nombre=f'Cliente {i}') for i in range(4)]
+        self.client.get(f'/api/facturas/{ids[1]}/datos_completos/')  # una ya cacheada
+        pedido = [ids[3], ids[1], 999999, ids[0]]
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/facturas/datos_completos/', {'ids': ','.join(map(str, pedido))})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([f['cliente']['nombre'] for f in response.json()], ['Cliente 3', 'Cliente 1', 'Cliente 0'])
+
+        with self.assertNumQueries(1):
+            self.client.get('/api/facturas/datos_completos/', {'ids': ','.join(map(str, pedido))})
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.client.get('/api/facturas/datos_completos/').status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/facturas/datos_completos/', {'ids': '1,abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/facturas/datos_completos/', {'ids': ','.join(map(str, range(1, 202)))})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/facturas/999999/datos_completos/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_factura_sin_usuario(self):
+        factura = self._vender(self.productos[:1])
+        Factura.objects.filter(pk=factura).update(usuario=None)
+        datos = self.client.get(f'/api/facturas/{factura}/datos_completos/').json()
+        self.assertEqual(datos['vendedor'], {'nombre': '', 'username': ''})
@@ -0,0 +1,110 @@
+"""
+Tests del ingreso en lote de facturas de compra (FacturaCompraDetailSerializer.create)
+"""
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import (Categoria, Producto, Proveedor, FacturaCompra, DetalleFacturaCompra,
+                               Movimiento, StockDiario, CambioProducto)
+
+
+class IngresoComprasTest(TestCase):
+
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nombre="Tornillería")
+        self.proveedor = Proveedor.objects.create(nombre="Ferrosur")
+        self.productos = [
+            Producto.objects.create(
+                codigo=f'T-{i:03d}', nombre=f"Tornillo {i}", categoria=self.categoria,
+                stock_disponible=10, precio_unitario=Decimal('500'), precio_costo=Decimal('300')
+            )
+            for i in range(30)
+        ]
+        self.user = User.objects.create_user(username='deposito', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _payload(self, numero, lineas):
+        return {
+            'numero_factura': numero,
+            'proveedor': self.proveedor.id,
+            'fecha_emision': str(timezone.localdate()),
+            'detalles': [
+                {'producto': producto.id, 'cantidad': cantidad, 'precio_unitario': precio}
+                for producto, cantidad, precio in lineas
+            ],
+        }
+
+    def _crear(self, numero, lineas):
+        return self.client.post('/api/facturas-compra/', self._payload(numero, lineas), format='json')
+
+    def test_stock_costo_y_movimientos(self):
+        martillo, clavo = self.productos[:2]
+        response = self._crear('001-001-0000001', [
+            (martillo, '5', '320.00'),
+            (clavo, '3', '150.00'),
+            (martillo, '2', '330.00'),
+        ])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        self.assertEqual(len(response.json()['detalles']), 3)
+        self.assertEqual(response.json()['detalles'][0]['producto_nombre'], "Tornillo 0")
+
+        martillo.refresh_from_db()
+        clavo.refresh_from_db()
+        self.assertEqual(martillo.stock_disponible, 17)
+        # costo promedio: (10 * 300 + 5 * 320 + 2 * 330) / 17
+        self.assertEqual(martillo.precio_costo, Decimal('309.41'))
+        self.assertEqual(clavo.stock_disponible, 13)
+        self.assertEqual(clavo.precio_costo, Decimal('265.38'))
+
+        factura = FacturaCompra.objects.get(numero_factura='001-001-0000001')
+        self.assertEqual(factura.subtotal, Decimal('2710.00'))
+        self.assertEqual(
+            sorted(DetalleFacturaCompra.objects.filter(factura_compra=factura).values_list('subtotal', flat=True)),
+            [Decimal('450.00'), Decimal('660.00'), Decimal('1600.00')]
+        )
+        movimientos = Movimiento.objects.filter(tipo='entrada')
+        self.assertEqual(movimientos.count(), 3)
+        self.assertIn('Ferrosur', movimientos.first().descripcion)
+        self.assertEqual(StockDiario.objects.get(producto=martillo).entradas, 7)
+        self.assertTrue(CambioProducto.objects.filter(producto_id=martillo.id, tipo='stock').exists())
+
+    def test_consultas_constantes(self):
+        def consultas(numero, lineas):
+            with CaptureQueriesContext(connection) as contexto:
+                response = self._crear(numero, lineas)
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+            # Sin contar SAVEPOINT / RELEASE de los atomic anidados
+            return len([q for q in contexto.captured_queries if 'SAVEPOINT' not in q['sql']])
+
+        una = consultas('001-001-0000010', [(self.productos[0], '1', '100')])
+        muchas = consultas('001-001-0000011', [(producto, '4', '100') for producto in self.productos])
+        self.assertEqual(una, muchas)
+        self.assertLessEqual(muchas, 11)
+
+    def test_producto_inexistente_no_crea_nada(self):
+        response = self.client.post('/api/facturas-compra/', {
+            **self._payload('001-001-0000020', [(self.productos[0], '1', '100')]),
+            'detalles': [{'producto': 999999, 'cantidad': '1', 'precio_unitario': '100'}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(FacturaCompra.objects.exists())
+        self.assertFalse(Movimiento.objects.exists())
+
+    def test_editar_reemplaza_detalles_sin_tocar_stock(self):
+        producto = self.productos[0]
+        factura_id = self._crear('001-001-0000030', [(producto, '5', '100')]).json()['id']
+        response = self.client.patch(f'/api/facturas-compra/{factura_id}/', {
+            'detalles': [{'producto': self.productos[1].id, 'cantidad': '2', 'precio_unitario': '50'}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual([d['producto'] for d in response.json()['detalles']], [self.productos[1].id])
+        self.assertEqual(Decimal(response.json()['subtotal']), Decimal('100.00'))
+        producto.refresh_from_db()
+        self.assertEqual(producto.stock_disponible, 15)
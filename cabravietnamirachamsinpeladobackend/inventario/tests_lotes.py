@@ -0,0 +1,182 @@
+"""
+Tests de lotes de stock: asignación FIFO, vencimientos y trazabilidad (inventario/lotes.py)
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import Categoria, Producto, Proveedor, Movimiento, LoteStock, AsignacionLote
+from inventario import lotes
+from inventario.stock import registrar_movimientos
+
+
+class LotesTest(TestCase):
+
+    def setUp(self):
+        self.hoy = timezone.localdate()
+        self.categoria = Categoria.objects.create(nombre="Químicos")
+        self.proveedor = Proveedor.objects.create(nombre="Química Sur")
+        self.producto = Producto.objects.create(
+            codigo='SIL-01', nombre="Silicona", categoria=self.categoria,
+            stock_disponible=0, precio_unitario=Decimal('1000')
+        )
+        self.user = User.objects.create_user(username='cajero', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _comprar(self, numero, lineas, producto=None):
+        """lineas: [(cantidad, lote, dias_para_vencer)]"""
+        response = self.client.post('/api/facturas-compra/', {
+            'numero_factura': numero,
+            'proveedor': self.proveedor.id,
+            'fecha_emision': str(self.hoy),
+            'detalles': [
+                {'producto': (producto or self.producto).id, 'cantidad': cantidad, 'precio_unitario': '600',
+                 'lote': lote,
+                 'fecha_vencimiento_lote': str(self.hoy + timedelta(days=dias)) if dias is not None else None}
+                for cantidad, lote, dias in lineas
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+
+    def _vender(self, *lineas):
+        response = self.client.post('/api/facturas/', {
+            'tipo_documento': 'ninguno',
+            'nombre_cliente': 'Consumidor final',
+            'detalles': [
+                {'producto': producto.id, 'cantidad': cantidad, 'precio_unitario': '1000',
+                 'subtotal': str(cantidad * 1000)}
+                for producto, cantidad in lineas
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        return response.json()
+
+    def _saldos(self):
+        return dict(LoteStock.objects.values_list('lote', 'cantidad_disponible'))
+
+    def test_compra_crea_lotes(self):
+        self._comprar('C-1', [(10, 'A', 60), (5, 'B', None)])
+        lote = LoteStock.objects.get(lote='A')
+        self.assertEqual((lote.cantidad_inicial, lote.cantidad_disponible), (10, 10))
+        self.assertEqual(lote.origen, 'Factura de compra #C-1')
+        self.assertEqual(self._saldos(), {'A': 10, 'B': 5})
+
+    def test_venta_consume_primero_el_que_vence_antes(self):
+        self._comprar('C-1', [(5, 'TARDE', 90)])
+        self._comprar('C-2', [(5, 'SIN-VTO', None), (4, 'PRONTO', 10)])
+        self._vender((self.producto, 7))
+        self.assertEqual(self._saldos(), {'PRONTO': 0, 'TARDE': 2, 'SIN-VTO': 5})
+
+        self._vender((self.producto, 4))
+        self.assertEqual(self._saldos(), {'PRONTO': 0, 'TARDE': 0, 'SIN-VTO': 3})
+
+    def test_stock_sin_lote_queda_sin_asignar(self):
+        self.producto.stock_disponible = 10
+        self.producto.save()
+        self._comprar('C-1', [(3, 'A', 30)])
+        self._vender((self.producto, 5))
+        self.assertEqual(self._saldos(), {'A': 0})
+        self.assertEqual(sum(AsignacionLote.objects.values_list('cantidad', flat=True)), 3)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock_disponible, 8)
+
+    def test_recepcion_crea_lotes(self):
+        response = self.client.post('/api/recepciones/', {
+            'numero_recepcion': 'REC-9',
+            'proveedor': self.proveedor.id,
+            'detalles': [{'producto': self.producto.id, 'cantidad_recibida': 6, 'precio_unitario': '600',
+                          'lote': 'R1', 'fecha_vencimiento': str(self.hoy + timedelta(days=5))}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        self.assertEqual(LoteStock.objects.get(lote='R1').origen, 'Recepción #REC-9')
+
+    def test_asignacion_en_consultas_constantes(self):
+        productos = [
+            Producto.objects.create(codigo=f'P{i}', nombre=f"Producto {i}", categoria=self.categoria,
+                                    stock_disponible=0, precio_unitario=Decimal('1000'))
+            for i in range(10)
+        ]
+        for producto in productos:
+            self._comprar(f'C-{producto.codigo}', [(2, f'{producto.codigo}-A', 5), (2, f'{producto.codigo}-B', 9)],
+                          producto=producto)
+        # 3 por línea: toma todo el primer lote y parte del segundo
+        with CaptureQueriesContext(connection) as contexto:
+            self._vender(*[(producto, 3) for producto in productos])
+        consultas = [q['sql'] for q in contexto.captured_queries]
+        self.assertEqual(len([sql for sql in consultas if 'inventario_lotestock' in sql]), 2)
+        self.assertEqual(len([sql for sql in consultas if 'INSERT INTO "inventario_asignacionlote"' in sql]), 1)
+        self.assertEqual(AsignacionLote.objects.count(), 20)
+
+    def test_por_vencer(self):
+        self._comprar('C-1', [(5, 'VENCIDO', -2), (5, 'PRONTO', 10), (5, 'LEJOS', 200), (5, 'SIN-VTO', None)])
+        response = self.client.get('/api/lotes/por-vencer/', {'dias': 30})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        datos = response.json()
+        self.assertEqual([l['lote'] for l in datos['results']], ['VENCIDO', 'PRONTO'])
+        self.assertTrue(datos['results'][0]['vencido'])
+        self.assertEqual(datos['results'][1]['dias_para_vencer'], 10)
+        self.assertEqual(datos['results'][1]['producto_codigo'], 'SIL-01')
+
+        self._vender((self.producto, 5))  # consume el vencido
+        lotes_restantes = [l['lote'] for l in self.client.get('/api/lotes/por-vencer/').json()['results']]
+        self.assertEqual(lotes_restantes, ['PRONTO'])
+
+        response = self.client.get('/api/lotes/por-vencer/', {'dias': 999})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_trazabilidad(self):
+        self._comprar('C-1', [(4, 'L-77', 30)])
+        factura = self._vender((self.producto, 3))
+        response = self.client.get('/api/lotes/trazabilidad/', {'lote': 'L-77'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ingreso = response.json()['ingresos'][0]
+        self.assertEqual(ingreso['cantidad_disponible'], 1)
+        self.assertEqual(ingreso['ventas'][0]['factura_id'], factura['id'])
+        self.assertEqual(ingreso['ventas'][0]['cantidad'], 3)
+        self.assertEqual(ingreso['ventas'][0]['cliente'], 'Consumidor final')
+
+        self.assertEqual(self.client.get('/api/lotes/trazabilidad/').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_salida_manual_consume_lotes(self):
+        self._comprar('C-1', [(5, 'TARDE', 90), (4, 'PRONTO', 10)])
+        salida = Movimiento.objects.create(producto=self.producto, tipo='salida', cantidad=6,
+                                           descripcion='Rotura en depósito')
+        self.assertEqual(self._saldos(), {'PRONTO': 0, 'TARDE': 3})
+        self.assertEqual(
+            sorted(AsignacionLote.objects.values_list('movimiento_id', 'detalle_factura_id', 'cantidad')),
+            [(salida.id, None, 2), (salida.id, None, 4)]
+        )
+
+        registrar_movimientos([Movimiento(producto=self.producto, tipo='salida', cantidad=2,
+                                          descripcion='Ajuste de inventario')])
+        self.assertEqual(self._saldos(), {'PRONTO': 0, 'TARDE': 1})
+
+        ingreso = self.client.get('/api/lotes/trazabilidad/', {'lote': 'TARDE'}).json()['ingresos'][0]
+        self.assertEqual([v['descripcion'] for v in ingreso['ventas']], ['Rotura en depósito', 'Ajuste de inventario'])
+        self.assertIsNone(ingreso['ventas'][0]['factura_id'])
+
+    def test_venta_asigna_movimiento_y_linea(self):
+        self._comprar('C-1', [(4, 'A', 30)])
+        self._vender((self.producto, 3))
+        asignacion = AsignacionLote.objects.select_related('movimiento', 'detalle_factura').get()
+        self.assertEqual(asignacion.movimiento.tipo, 'salida')
+        self.assertEqual(asignacion.movimiento.producto_id, asignacion.detalle_factura.producto_id)
+        self.assertEqual(self._saldos(), {'A': 1})  # sin doble consumo
+
+    def test_indice_fifo_parcial(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexdef FROM pg_indexes WHERE indexname = 'idx_lote_fifo'")
+            definicion = cursor.fetchone()[0]
+        self.assertIn('(producto_id, fecha_vencimiento, fecha_ingreso, id)', definicion)
+        self.assertIn('cantidad_disponible > 0', definicion)
+
+    def test_registrar_ingresos_ignora_cantidades_nulas(self):
+        lotes.registrar_ingresos([(self.producto.id, 0, 'X', None), (self.producto.id, 2, '', None)])
+        self.assertEqual(list(LoteStock.objects.values_list('lote', 'cantidad_disponible')), [('', 2)])
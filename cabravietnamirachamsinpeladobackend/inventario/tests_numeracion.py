@@ -0,0 +1,145 @@
+"""
+Tests del servicio de numeración de facturas (inventario/numeracion.py)
+"""
+from decimal import Decimal
+from unittest import mock
+from django.db import connection, transaction, DatabaseError
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario import numeracion
+from inventario.models import Factura, SerieNumeracion
+
+
+class NumeracionFacturaTest(TestCase):
+    """Tests para la numeración por serie"""
+
+    def tearDown(self):
+        numeracion._reservas.clear()
+
+    def _factura(self, **kwargs):
+        return Factura.objects.create(total=Decimal('1000'), **kwargs)
+
+    def test_serie_por_defecto_existe(self):
+        """La migración crea la serie FAC"""
+        serie = SerieNumeracion.objects.get(codigo='FAC')
+        self.assertEqual(serie.prefijo, 'FAC')
+
+    def test_numero_formato_fac(self):
+        factura = self._factura()
+        self.assertRegex(factura.numero_factura, r'^FAC-\d{6}$')
+
+    def test_numeros_correlativos(self):
+        primera = self._factura()
+        segunda = self._factura()
+        n1 = int(primera.numero_factura.split('-')[-1])
+        n2 = int(segunda.numero_factura.split('-')[-1])
+        self.assertEqual(n2, n1 + 1)
+
+    def test_numero_explicito_se_respeta(self):
+        factura = self._factura(numero_factura='FAC-999999')
+        self.assertEqual(factura.numero_factura, 'FAC-999999')
+
+    def test_serie_nueva_empieza_en_uno(self):
+        """Cada serie (caja/timbrado) tiene su propia secuencia"""
+        SerieNumeracion.objects.create(codigo='CAJA2', prefijo='001-002', digitos=7)
+        factura = self._factura(serie='CAJA2')
+        self.assertEqual(factura.numero_factura, '001-002-0000001')
+        self.assertEqual(self._factura(serie='CAJA2').numero_factura, '001-002-0000002')
+
+    def test_serie_inexistente(self):
+        with self.assertRaises(SerieNumeracion.DoesNotExist):
+            self._factura(serie='NOEXISTE')
+
+    def test_serie_inactiva_no_emite_numeros(self):
+        serie = SerieNumeracion.objects.create(codigo='VIEJA', prefijo='V', digitos=3, activo=False)
+        with self.assertRaisesMessage(numeracion.SerieInactiva, 'Serie de numeración inactiva: VIEJA'):
+            self._factura(serie='VIEJA')
+        with self.assertRaises(numeracion.SerieInactiva):
+            numeracion.reservar_bloque('VIEJA', 5)
+
+        serie.activo = True
+        serie.save()
+        self.assertEqual(self._factura(serie='VIEJA').numero_factura, 'V-001')
+
+    @override_settings(NUMERACION_BLOQUE=10)
+    def test_desactivar_descarta_reservas(self):
+        serie = SerieNumeracion.objects.create(codigo='W2', prefijo='W', digitos=4)
+        numeracion.siguiente_numero('W2')
+        serie.activo = False
+        serie.save()
+        with self.assertRaises(numeracion.SerieInactiva):
+            numeracion.siguiente_numero('W2')
+
+    def test_reservar_bloque(self):
+        SerieNumeracion.objects.create(codigo='BLQ', prefijo='B', digitos=3)
+        numeros = numeracion.reservar_bloque('BLQ', 5)
+        self.assertEqual(numeros, ['B-001', 'B-002', 'B-003', 'B-004', 'B-005'])
+
+    @override_settings(NUMERACION_BLOQUE=10)
+    def test_preasignacion_por_worker(self):
+        """Con bloques, solo la primera factura consulta la secuencia"""
+        SerieNumeracion.objects.create(codigo='W1', prefijo='W', digitos=4)
+        with self.assertNumQueries(1):
+            numeracion.siguiente_numero('W1')
+        with self.assertNumQueries(0):
+            self.assertEqual(numeracion.siguiente_numero('W1'), 'W-0002')
+
+    @override_settings(NUMERACION_BLOQUE=10)
+    def test_sin_bloques_fuera_de_postgresql(self):
+        """UPDATE ... RETURNING se revierte con la factura: no puede quedar un bloque en memoria"""
+        SerieNumeracion.objects.create(codigo='SQ', prefijo='S', digitos=3)
+        with mock.patch.object(connection, 'vendor', 'sqlite'):
+            with self.assertRaises(DatabaseError), transaction.atomic():
+                self._factura(serie='SQ')
+                raise DatabaseError('venta revertida')
+            numeros = [self._factura(serie='SQ').numero_factura for _ in range(2)]
+        self.assertEqual(numeros, ['S-001', 'S-002'])
+        self.assertNotIn('SQ', numeracion._reservas)
+
+    def test_huecos_numeracion(self):
+        SerieNumeracion.objects.create(codigo='H', prefijo='H', digitos=3)
+        for numero in ['H-001', 'H-002', 'H-005', 'H-009']:
+            self._factura(serie='H', numero_factura=numero)
+        self.assertEqual(numeracion.huecos_numeracion('H'), [(3, 4), (6, 8)])
+
+    def test_huecos_ignora_sufijos_no_numericos(self):
+        SerieNumeracion.objects.create(codigo='HN', prefijo='N', digitos=3)
+        for numero in ['N-001', 'N-004', 'N-00A', 'N-', 'N-002-B']:
+            self._factura(serie='HN', numero_factura=numero)
+        self.assertEqual(numeracion.huecos_numeracion('HN'), [(2, 3)])
+
+    def test_huecos_prefijo_literal(self):
+        """% y _ del prefijo no son comodines de LIKE"""
+        SerieNumeracion.objects.create(codigo='HP', prefijo='A_1', digitos=3)
+        for numero in ['A_1-001', 'A_1-003', 'AX1-002']:
+            self._factura(serie='HP', numero_factura=numero)
+        self.assertEqual(numeracion.huecos_numeracion('HP'), [(2, 2)])
+
+
+class NumeracionAPITest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='cajero', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_huecos_endpoint(self):
+        response = self.client.get('/api/facturas/huecos_numeracion/?serie=FAC')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['huecos'], [])
+
+    def test_factura_en_serie_inactiva(self):
+        SerieNumeracion.objects.create(codigo='VIEJA', prefijo='V', digitos=3, activo=False)
+        response = self.client.post('/api/facturas/', {
+            'serie': 'VIEJA', 'tipo_documento': 'ninguno', 'nombre_cliente': 'Consumidor final',
+            'detalles': [],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('inactiva', str(response.data))
+
+    def test_huecos_serie_inexistente(self):
+        response = self.client.get('/api/facturas/huecos_numeracion/?serie=XX')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
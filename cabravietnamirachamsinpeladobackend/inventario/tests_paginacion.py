@@ -0,0 +1,99 @@
+"""
+Tests de la paginación keyset (inventario/pagination.py)
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import Categoria, Producto, Movimiento
+
+
+class KeysetPaginationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nombre="Herramientas")
+        cls.producto = Producto.objects.create(nombre="Martillo", categoria=categoria, stock_disponible=0,
+                                            precio_unitario=Decimal('1000'))
+        ahora = timezone.now()
+        for i in range(25):
+            movimiento = Movimiento.objects.create(producto=cls.producto, tipo='entrada', cantidad=1)
+            # De a tres por fecha: el id desempata
+            Movimiento.objects.filter(pk=movimiento.pk).update(fecha=ahora - timedelta(hours=i // 3))
+        cls.esperado = list(Movimiento.objects.order_by('-fecha', '-id').values_list('id', flat=True))
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _get(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_recorrido_hacia_adelante_sin_duplicados_ni_huecos(self):
+        data = self._get('/api/movimientos/', {'page_size': 7})
+        self.assertIsNone(data['previous'])
+        self.assertNotIn('count', data)
+        ids = [m['id'] for m in data['results']]
+        while data['next']:
+            data = self._get(data['next'])
+            ids += [m['id'] for m in data['results']]
+        self.assertEqual(ids, self.esperado)
+
+    def test_recorrido_hacia_atras(self):
+        paginas = [self._get('/api/movimientos/', {'page_size': 7})]
+        while paginas[-1]['next']:
+            paginas.append(self._get(paginas[-1]['next']))
+
+        data = paginas[-1]
+        for pagina in reversed(paginas[:-1]):
+            data = self._get(data['previous'])
+            self.assertEqual(data['results'], pagina['results'])
+        self.assertIsNone(data['previous'])
+
+    def test_orden_ascendente(self):
+        data = self._get('/api/movimientos/', {'ordering': 'fecha', 'page_size': 20})
+        data = self._get(data['next'])
+        self.assertEqual([m['id'] for m in data['results']], list(reversed(self.esperado))[20:])
+
+    def test_cursor_invalido(self):
+        response = self.client.get('/api/movimientos/', {'cursor': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_total_aproximado(self):
+        data = self._get('/api/movimientos/', {'total': '1'})
+        self.assertIn('total_aproximado', data)
+        self.assertIsInstance(data['total_aproximado'], int)
+
+    def test_compatibilidad_con_page(self):
+        data = self._get('/api/movimientos/', {'page': 2})
+        self.assertEqual(data['count'], 25)
+        self.assertEqual([m['id'] for m in data['results']], self.esperado[10:20])
+
+    def test_orden_por_otro_campo_usa_paginas(self):
+        data = self._get('/api/movimientos/', {'ordering': '-cantidad'})
+        self.assertEqual(data['count'], 25)
+
+    def test_paginas_profundas_no_usan_offset(self):
+        data = self._get('/api/movimientos/', {'page_size': 5})
+        for _ in range(3):
+            data = self._get(data['next'])
+        with CaptureQueriesContext(connection) as consultas:
+            self._get(data['next'])
+        sql = ' '.join(q['sql'] for q in consultas.captured_queries).upper()
+        self.assertNotIn('OFFSET', sql)
+        self.assertNotIn('COUNT(', sql)
+
+    def test_facturas_y_facturas_compra(self):
+        for url in ('/api/facturas/', '/api/facturas-compra/'):
+            data = self._get(url)
+            self.assertEqual(set(data), {'next', 'previous', 'results'})
+            self.assertEqual(set(self._get(url, {'page': 1})), {'count', 'next', 'previous', 'results'})
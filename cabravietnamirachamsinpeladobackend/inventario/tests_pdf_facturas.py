@@ -0,0 +1,168 @@
+"""
+Tests de los PDF de facturas generados en el servidor (inventario/pdf.py)
+"""
+import io
+import shutil
+import tempfile
+import zipfile
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+from django.core.cache import cache as django_cache
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+from django.middleware.gzip import GZipMiddleware
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework import status
+
+from inventario.models import Categoria, Producto, Proveedor, Factura
+from inventario import pdf
+from inventario.views import FacturaViewSet
+
+
+class PDFFacturasTest(TestCase):
+
+    def setUp(self):
+        django_cache.clear()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        configuracion = override_settings(MEDIA_ROOT=self.media)
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+
+        self.categoria = Categoria.objects.create(nombre="Herramientas")
+        self.producto = Producto.objects.create(
+            codigo='MAR-01', nombre="Martillo <carpintero> & cía", categoria=self.categoria,
+            stock_disponible=100, precio_unitario=Decimal('45000')
+        )
+        self.user = User.objects.create_user(username='cajero', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _vender(self, nombre='Juan Pérez'):
+        response = self.client.post('/api/facturas/', {
+            'tipo_documento': 'cedula', 'numero_documento': '1234567', 'nombre_cliente': nombre,
+            'exonerado_iva': True,
+            'detalles': [{'producto': self.producto.id, 'cantidad': 2, 'precio_unitario': '45000',
+                          'subtotal': '90000'}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        return response.json()
+
+    def _bajar(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        contenido = b''.join(response.streaming_content)
+        return response, contenido
+
+    def _archivos(self, tipo='facturas'):
+        return sorted(p.name for p in (Path(self.media) / 'pdf' / tipo).glob('*'))
+
+    def test_pdf_de_factura_se_dibuja_una_vez(self):
+        factura = self._vender()
+        response, contenido = self._bajar(f"/api/facturas/{factura['id']}/pdf/")
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn(f"factura-{factura['numero_factura']}.pdf", response['Content-Disposition'])
+        self.assertTrue(contenido.startswith(b'%PDF'))
+        self.assertEqual(len(self._archivos()), 1)
+
+        with mock.patch.object(pdf, '_documento') as dibujar, self.assertNumQueries(1):
+            _, otra_vez = self._bajar(f"/api/facturas/{factura['id']}/pdf/")
+        dibujar.assert_not_called()
+        self.assertEqual(otra_vez, contenido)
+
+    def test_cambio_de_contenido_genera_nueva_version(self):
+        factura = self._vender()
+        self._bajar(f"/api/facturas/{factura['id']}/pdf/")
+        anterior = self._archivos()
+
+        instancia = Factura.objects.get(pk=factura['id'])
+        instancia.observaciones = 'Entregar el lunes'
+        instancia.save()
+        self._bajar(f"/api/facturas/{factura['id']}/pdf/")
+        actual = self._archivos()
+        self.assertEqual(len(actual), 1)
+        self.assertNotEqual(actual, anterior)
+
+    def test_nueva_version_no_borra_otros_documentos(self):
+        factura = self._vender()
+        self._bajar(f"/api/facturas/{factura['id']}/pdf/")
+        # Otro documento cuyo número empieza con "<numero>-"
+        otro = Path(self.media) / 'pdf' / 'facturas' / f"{factura['numero_factura']}-B-{'a' * 16}.pdf"
+        otro.write_bytes(b'%PDF')
+
+        instancia = Factura.objects.get(pk=factura['id'])
+        instancia.observaciones = 'Entregar el lunes'
+        instancia.save()
+        self._bajar(f"/api/facturas/{factura['id']}/pdf/")
+        self.assertTrue(otro.exists())
+        self.assertEqual(len(self._archivos()), 2)
+
+    def test_pdf_sin_gzip_para_usar_sendfile(self):
+        # Sin el test client: su envoltura del contenido descarta file_to_stream
+        factura = self._vender()
+        request = APIRequestFactory().get(f"/api/facturas/{factura['id']}/pdf/", HTTP_ACCEPT_ENCODING='gzip')
+        force_authenticate(request, user=self.user)
+        vista = FacturaViewSet.as_view({'get': 'pdf'})
+        response = GZipMiddleware(lambda r: vista(r, pk=str(factura['id'])))(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Encoding'], 'identity')
+        self.assertIsNotNone(response.file_to_stream)
+        contenido = b''.join(response.streaming_content)
+        self.assertEqual(int(response['Content-Length']), len(contenido))
+        self.assertTrue(contenido.startswith(b'%PDF'))
+
+    def test_version_borrada_por_otra_peticion_se_regenera(self):
+        factura = self._vender()
+        ruta = pdf.factura(factura['id'])
+        borrada = ruta.with_name(f"{factura['numero_factura']}-{'0' * 16}.pdf")
+        with mock.patch.object(pdf, 'factura', side_effect=[borrada, ruta]):
+            _, contenido = self._bajar(f"/api/facturas/{factura['id']}/pdf/")
+        self.assertTrue(contenido.startswith(b'%PDF'))
+
+    def test_facturas_del_dia_pdf_y_zip(self):
+        facturas = [self._vender(f'Cliente {i}') for i in range(3)]
+        hoy = timezone.localdate().isoformat()
+
+        response, contenido = self._bajar('/api/facturas/pdf-dia/', fecha=hoy)
+        self.assertTrue(contenido.startswith(b'%PDF'))
+        self.assertIn(f'facturas-{hoy}.pdf', response['Content-Disposition'])
+        self.assertIn('attachment', response['Content-Disposition'])
+
+        _, contenido = self._bajar('/api/facturas/pdf-dia/', fecha=hoy, formato='zip')
+        with zipfile.ZipFile(io.BytesIO(contenido)) as comprimido:
+            self.assertEqual(sorted(comprimido.namelist()),
+                             sorted(f"factura-{f['numero_factura']}.pdf" for f in facturas))
+        self.assertEqual(len(self._archivos()), 3)
+        self.assertEqual(len(self._archivos('dia')), 2)
+
+    def test_parametros_y_no_encontrados(self):
+        self.assertEqual(self.client.get('/api/facturas/999999/pdf/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/api/facturas/pdf-dia/', {'fecha': '2001-01-01'}).status_code,
+                         status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/api/facturas/pdf-dia/', {'fecha': 'ayer'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/facturas/pdf-dia/', {'formato': 'docx'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_sin_reportlab(self):
+        factura = self._vender()
+        with mock.patch.object(pdf, '_reportlab', side_effect=pdf.PDFNoDisponible('Generar PDF requiere reportlab')):
+            response = self.client.get(f"/api/facturas/{factura['id']}/pdf/")
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(self._archivos(), [])
+
+    def test_resumen_de_factura_de_compra(self):
+        proveedor = Proveedor.objects.create(nombre="Tramontina S.A.")
+        response = self.client.post('/api/facturas-compra/', {
+            'numero_factura': '001-001-0000123',
+            'proveedor': proveedor.id,
+            'fecha_emision': str(timezone.localdate()),
+            'detalles': [{'producto': self.producto.id, 'cantidad': 10, 'precio_unitario': '30000'}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        response, contenido = self._bajar(f"/api/facturas-compra/{response.json()['id']}/pdf/")
+        self.assertTrue(contenido.startswith(b'%PDF'))
+        self.assertIn('compra-001-001-0000123.pdf', response['Content-Disposition'])
+        self.assertEqual(self.client.get('/api/facturas-compra/999999/pdf/').status_code, status.HTTP_404_NOT_FOUND)
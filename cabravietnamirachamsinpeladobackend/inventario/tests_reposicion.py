@@ -0,0 +1,112 @@
+"""
+Tests del reporte de stock bajo y sugerencias de reposición (inventario/reposicion.py)
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import Categoria, Producto, Proveedor, ProductoProveedor, StockDiario
+
+
+class StockBajoTest(TestCase):
+
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nombre="Filtros")
+        self.user = User.objects.create_user(username='compras', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _producto(self, codigo, stock, minimo, activo=True):
+        return Producto.objects.create(
+            codigo=codigo, nombre=f"Producto {codigo}", categoria=self.categoria,
+            stock_disponible=stock, stock_minimo=minimo, precio_unitario=Decimal('1000'), activo=activo
+        )
+
+    def _salidas(self, producto, cantidad, dias_atras=1):
+        StockDiario.objects.create(
+            producto=producto, fecha=timezone.localdate() - timedelta(days=dias_atras),
+            salidas=cantidad, stock_cierre=producto.stock_disponible
+        )
+
+    def _reporte(self, **params):
+        response = self.client.get('/api/productos/stock-bajo/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_solo_activos_bajo_minimo_mas_urgentes_primero(self):
+        self._producto('A', stock=4, minimo=5)
+        self._producto('B', stock=0, minimo=10)
+        self._producto('C', stock=20, minimo=5)
+        self._producto('D', stock=0, minimo=5, activo=False)
+
+        datos = self._reporte()
+        self.assertEqual(datos['count'], 2)
+        self.assertEqual([p['codigo'] for p in datos['results']], ['B', 'A'])
+        self.assertEqual(datos['results'][0]['faltante'], 10)
+
+    def test_paginado(self):
+        for i in range(15):
+            self._producto(f'P{i:02d}', stock=0, minimo=i + 1)
+        datos = self._reporte(page_size=10)
+        self.assertEqual(datos['count'], 15)
+        self.assertEqual(len(datos['results']), 10)
+        self.assertIsNotNone(datos['next'])
+        self.assertEqual(datos['results'][0]['codigo'], 'P14')
+
+    def test_sugerencia_con_velocidad_y_tiempo_de_entrega(self):
+        producto = self._producto('F-01', stock=5, minimo=10)
+        proveedor = Proveedor.objects.create(nombre="Distribuidora")
+        ProductoProveedor.objects.create(producto=producto, proveedor=proveedor, precio_compra=Decimal('700'),
+                                         tiempo_entrega_dias=5, es_principal=True)
+        self._salidas(producto, 30, dias_atras=1)
+        self._salidas(producto, 30, dias_atras=10)
+        self._salidas(producto, 100, dias_atras=40)  # fuera de la ventana
+
+        fila = self._reporte(dias=30, cobertura=10)['results'][0]
+        # 2 por día * (5 + 10) días + 10 de mínimo - 5 en stock
+        self.assertEqual(fila['venta_diaria'], 2.0)
+        self.assertEqual(fila['cantidad_sugerida'], 35)
+        self.assertEqual(fila['dias_restantes'], 2.5)
+        self.assertEqual(fila['proveedor']['nombre'], "Distribuidora")
+        self.assertEqual(fila['costo_estimado'], 24500.0)
+
+    def test_sin_ventas_ni_proveedor_vuelve_al_minimo(self):
+        self._producto('X', stock=2, minimo=6)
+        fila = self._reporte()['results'][0]
+        self.assertEqual(fila['cantidad_sugerida'], 4)
+        self.assertIsNone(fila['proveedor'])
+        self.assertIsNone(fila['dias_restantes'])
+
+    def test_proveedor_principal_o_el_mas_rapido(self):
+        producto = self._producto('Y', stock=0, minimo=1)
+        lento = Proveedor.objects.create(nombre="Lento")
+        rapido = Proveedor.objects.create(nombre="Rápido")
+        ProductoProveedor.objects.create(producto=producto, proveedor=lento, precio_compra=1, tiempo_entrega_dias=9)
+        ProductoProveedor.objects.create(producto=producto, proveedor=rapido, precio_compra=1, tiempo_entrega_dias=2)
+        self.assertEqual(self._reporte()['results'][0]['proveedor']['nombre'], "Rápido")
+
+        ProductoProveedor.objects.filter(proveedor=lento).update(es_principal=True)
+        self.assertEqual(self._reporte()['results'][0]['proveedor']['nombre'], "Lento")
+
+    def test_consultas_constantes(self):
+        for i in range(20):
+            self._producto(f'Q{i}', stock=0, minimo=3)
+        with self.assertNumQueries(4):  # count, página, salidas, proveedores
+            self._reporte(page_size=20)
+
+    def test_parametros_invalidos(self):
+        for params in ({'dias': 0}, {'cobertura': 500}, {'dias': 'x'}):
+            response = self.client.get('/api/productos/stock-bajo/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_indice_parcial(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexdef FROM pg_indexes WHERE indexname = 'idx_producto_stock_bajo'")
+            definicion = cursor.fetchone()[0]
+        self.assertIn('WHERE', definicion)
+        self.assertIn('activo', definicion)
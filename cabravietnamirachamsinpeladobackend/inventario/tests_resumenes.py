@@ -0,0 +1,146 @@
+"""
+Tests de los resúmenes diarios (inventario/resumenes.py)
+"""
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import Categoria, Producto, Movimiento, Factura, DetalleFactura, VentaDiaria, StockDiario
+from inventario.resumenes import reconstruir
+
+
+class ResumenesDiariosTest(TestCase):
+
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nombre="Herramientas")
+        self.producto = Producto.objects.create(
+            nombre="Martillo", categoria=self.categoria,
+            stock_disponible=20, precio_unitario=Decimal('10000')
+        )
+        self.user = User.objects.create_user(username='cajero', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.hoy = timezone.localdate()
+
+    def _facturar(self, cantidad):
+        response = self.client.post('/api/facturas/', {
+            'tipo_documento': 'ninguno',
+            'detalles': [{
+                'producto': self.producto.id,
+                'cantidad': cantidad,
+                'precio_unitario': '10000',
+                'subtotal': str(10000 * cantidad),
+            }]
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response
+
+    def _resumenes(self):
+        ventas = list(VentaDiaria.objects.order_by('fecha', 'producto_id').values(
+            'fecha', 'producto_id', 'usuario_id', 'categoria_id', 'cantidad', 'total', 'lineas'))
+        stock = list(StockDiario.objects.order_by('fecha', 'producto_id').values(
+            'fecha', 'producto_id', 'entradas', 'salidas', 'stock_cierre'))
+        return ventas, stock
+
+    def test_facturas_acumulan_en_una_fila_por_dia(self):
+        self._facturar(2)
+        self._facturar(3)
+
+        venta = VentaDiaria.objects.get()
+        self.assertEqual(venta.fecha, self.hoy)
+        self.assertEqual(venta.usuario, self.user)
+        self.assertEqual(venta.categoria, self.categoria)
+        self.assertEqual(venta.cantidad, 5)
+        self.assertEqual(venta.total, Decimal('50000'))
+        self.assertEqual(venta.lineas, 2)
+
+    def test_ventas_sin_usuario_comparten_fila(self):
+        """La clave (fecha, producto, usuario) trata NULL como un valor más"""
+        for cantidad in (1, 2):
+            factura = Factura.objects.create(total=Decimal('0'))
+            DetalleFactura.objects.create(
+                factura=factura, producto=self.producto, cantidad=cantidad,
+                precio_unitario=Decimal('10000'), subtotal=Decimal('10000') * cantidad
+            )
+        venta = VentaDiaria.objects.get()
+        self.assertIsNone(venta.usuario_id)
+        self.assertEqual(venta.cantidad, 3)
+
+    def test_eliminar_factura_descuenta_resumen(self):
+        response = self._facturar(2)
+        self._facturar(1)
+        Factura.objects.get(pk=response.data['id']).delete()
+
+        venta = VentaDiaria.objects.get()
+        self.assertEqual(venta.cantidad, 1)
+        self.assertEqual(venta.lineas, 1)
+
+    def test_eliminar_factura_un_upsert_sin_importar_las_lineas(self):
+        productos = [
+            Producto.objects.create(nombre=f"Clavo {i}", categoria=self.categoria,
+                                    stock_disponible=20, precio_unitario=Decimal('10000'))
+            for i in range(5)
+        ]
+        response = self.client.post('/api/facturas/', {
+            'tipo_documento': 'ninguno',
+            'detalles': [{'producto': p.id, 'cantidad': 1, 'precio_unitario': '10000', 'subtotal': '10000'}
+                         for p in productos],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        factura = Factura.objects.get(pk=response.data['id'])
+        with CaptureQueriesContext(connection) as contexto:
+            factura.delete()
+        upserts = [q for q in contexto.captured_queries
+                   if q['sql'].startswith('INSERT INTO "inventario_ventadiaria"')]
+        self.assertEqual(len(upserts), 1)
+        self.assertEqual(set(VentaDiaria.objects.values_list('cantidad', 'lineas')), {(0, 0)})
+
+    def test_movimientos_actualizan_stock_diario(self):
+        Movimiento.objects.create(producto=self.producto, tipo='entrada', cantidad=5)
+        self._facturar(4)
+
+        dia = StockDiario.objects.get()
+        self.assertEqual(dia.fecha, self.hoy)
+        self.assertEqual(dia.entradas, 5)
+        self.assertEqual(dia.salidas, 4)
+        self.assertEqual(dia.stock_cierre, 21)
+
+    def test_reconstruir_coincide_con_incremental(self):
+        Movimiento.objects.create(producto=self.producto, tipo='entrada', cantidad=5)
+        self._facturar(2)
+        self._facturar(1)
+        incremental = self._resumenes()
+
+        reconstruir()
+        self.assertEqual(self._resumenes(), incremental)
+
+    def test_reconstruir_stock_al_cierre_de_dias_anteriores(self):
+        """El saldo de cada día se calcula hacia atrás desde el stock actual"""
+        anterior = Movimiento.objects.create(producto=self.producto, tipo='entrada', cantidad=10)
+        Movimiento.objects.filter(pk=anterior.pk).update(fecha=timezone.now() - timedelta(days=3))
+        Movimiento.objects.create(producto=self.producto, tipo='salida', cantidad=4)
+
+        reconstruir()
+        dias = list(StockDiario.objects.order_by('fecha').values_list('fecha', 'stock_cierre'))
+        self.assertEqual(dias, [
+            (self.hoy - timedelta(days=3), 30),
+            (self.hoy, 26),
+        ])
+
+    def test_comando_incremental(self):
+        self._facturar(2)
+        VentaDiaria.objects.all().delete()
+
+        salida = StringIO()
+        call_command('actualizar_resumenes', '--desde', self.hoy.isoformat(), stdout=salida)
+        self.assertIn('1 filas de ventas', salida.getvalue())
+        self.assertEqual(VentaDiaria.objects.get().cantidad, 2)
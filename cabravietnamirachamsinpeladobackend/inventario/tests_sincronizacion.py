@@ -0,0 +1,121 @@
+"""
+Tests de la sincronización incremental del catálogo (inventario/sincronizacion.py)
+"""
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import Categoria, Producto, Movimiento, CambioProducto
+
+
+class CambiosProductosTest(TestCase):
+
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nombre="Herramientas")
+        self.martillo = Producto.objects.create(
+            codigo='MAR-01', nombre="Martillo", categoria=self.categoria,
+            stock_disponible=10, precio_unitario=Decimal('10000')
+        )
+        self.alicate = Producto.objects.create(
+            codigo='ALI-01', nombre="Alicate", categoria=self.categoria,
+            stock_disponible=5, precio_unitario=Decimal('8000')
+        )
+        self.user = User.objects.create_user(username='cajero', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _cambios(self, desde=None):
+        params = {} if desde is None else {'desde': desde}
+        response = self.client.get('/api/productos/cambios/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def _envejecer(self):
+        """Saca los cambios existentes del margen de seguridad."""
+        CambioProducto.objects.update(fecha=timezone.now() - timedelta(minutes=5))
+
+    def test_sin_token_retorna_catalogo_completo(self):
+        self._envejecer()
+        datos = self._cambios()
+        self.assertTrue(datos['completo'])
+        self.assertEqual([p['nombre'] for p in datos['productos']], ['Alicate', 'Martillo'])
+        self.assertEqual(datos['token'], CambioProducto.objects.latest('id').id)
+
+    def test_solo_lo_que_cambio(self):
+        self._envejecer()
+        token = self._cambios()['token']
+        self.assertEqual(self._cambios(token)['productos'], [])
+
+        Movimiento.objects.create(producto=self.martillo, tipo='salida', cantidad=3)
+        datos = self._cambios(token)
+        self.assertFalse(datos['completo'])
+        self.assertEqual([(p['codigo'], p['stock_disponible']) for p in datos['productos']], [('MAR-01', 7)])
+
+    def test_altas_bajas_y_desactivados(self):
+        self._envejecer()
+        token = self._cambios()['token']
+
+        nuevo = Producto.objects.create(codigo='DES-01', nombre="Destornillador", categoria=self.categoria,
+                                        precio_unitario=Decimal('5000'))
+        self.alicate.activo = False
+        self.alicate.save()
+        martillo_id = self.martillo.id
+        self.martillo.delete()
+
+        datos = self._cambios(token)
+        self.assertEqual([p['id'] for p in datos['productos']], [nuevo.id])
+        self.assertEqual(datos['eliminados'], sorted([self.alicate.id, martillo_id]))
+
+    def test_margen_de_seguridad(self):
+        """Los cambios recientes se reenvían hasta salir del margen"""
+        self._envejecer()
+        token = self._cambios()['token']
+        self.martillo.precio_unitario = Decimal('11000')
+        self.martillo.save()
+
+        datos = self._cambios(token)
+        self.assertEqual(datos['token'], token)
+        self.assertEqual(len(datos['productos']), 1)
+
+        self._envejecer()
+        datos = self._cambios(token)
+        self.assertGreater(datos['token'], token)
+        self.assertEqual(self._cambios(datos['token'])['productos'], [])
+
+    def test_factura_registra_stock(self):
+        self._envejecer()
+        token = self._cambios()['token']
+        response = self.client.post('/api/facturas/', {
+            'tipo_documento': 'ninguno',
+            'detalles': [
+                {'producto': self.martillo.id, 'cantidad': 1, 'precio_unitario': '10000', 'subtotal': '10000'},
+                {'producto': self.alicate.id, 'cantidad': 2, 'precio_unitario': '8000', 'subtotal': '16000'},
+            ]
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        datos = self._cambios(token)
+        self.assertEqual({p['codigo']: p['stock_disponible'] for p in datos['productos']},
+                         {'MAR-01': 9, 'ALI-01': 3})
+
+    def test_token_purgado_retorna_catalogo_completo(self):
+        CambioProducto.objects.update(fecha=timezone.now() - timedelta(days=40))
+        Movimiento.objects.create(producto=self.martillo, tipo='entrada', cantidad=1)
+        salida = StringIO()
+        call_command('purgar_cambios', stdout=salida)
+        self.assertIn('2 cambios borrados', salida.getvalue())
+        self.assertTrue(self._cambios(0)['completo'])
+
+    def test_token_invalido(self):
+        for valor in ('abc', '-1'):
+            response = self.client.get('/api/productos/cambios/', {'desde': valor})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requiere_autenticacion(self):
+        response = APIClient().get('/api/productos/cambios/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,195 @@
+"""
+Tests del motor de stock (inventario/stock.py)
+- UPDATE condicional atómico por movimiento
+- Rechazo de sobreventa en la base de datos
+"""
+from decimal import Decimal
+from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventario.models import Categoria, Producto, Movimiento, Factura
+from inventario.stock import aplicar_movimiento, StockInsuficiente
+
+
+class AplicarMovimientoTest(TestCase):
+    """Tests para aplicar_movimiento y el signal de Movimiento"""
+
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nombre="Test")
+        self.producto = Producto.objects.create(
+            nombre="Tornillo",
+            categoria=self.categoria,
+            stock_disponible=10,
+            precio_unitario=Decimal('1000')
+        )
+
+    def test_entrada_retorna_nuevo_saldo(self):
+        """Una entrada suma al stock y retorna el saldo resultante"""
+        nuevo = aplicar_movimiento(self.producto.id, 'entrada', 5)
+        self.assertEqual(nuevo, 15)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock_disponible, 15)
+
+    def test_salida_mayor_al_stock_es_rechazada(self):
+        """Una salida que deja stock negativo lanza StockInsuficiente"""
+        with self.assertRaises(StockInsuficiente):
+            aplicar_movimiento(self.producto.id, 'salida', 11)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock_disponible, 10)
+
+    def test_tipo_desconocido(self):
+        with self.assertRaises(ValueError):
+            aplicar_movimiento(self.producto.id, 'ajuste', 1)
+
+    def test_signal_actualiza_stock(self):
+        """Crear Movimiento aplica el stock y actualiza la instancia en memoria"""
+        Movimiento.objects.create(producto=self.producto, tipo='salida', cantidad=4)
+        self.assertEqual(self.producto.stock_disponible, 6)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock_disponible, 6)
+
+    def test_sobreventa_revierte_movimiento(self):
+        """Si el stock no alcanza no queda el Movimiento registrado"""
+        with self.assertRaises(StockInsuficiente):
+            Movimiento.objects.create(producto=self.producto, tipo='salida', cantidad=50)
+        self.assertEqual(Movimiento.objects.count(), 0)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock_disponible, 10)
+
+    def test_no_reescribe_otras_columnas(self):
+        """El signal no guarda la instancia en memoria (evita pisar cambios ajenos)"""
+        obsoleto = Producto.objects.get(pk=self.producto.pk)
+        Producto.objects.filter(pk=self.producto.pk).update(precio_unitario=Decimal('2000'))
+        obsoleto.nombre = "Cambio no guardado"
+
+        Movimiento.objects.create(producto=obsoleto, tipo='entrada', cantidad=1)
+
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.nombre, "Tornillo")
+        self.assertEqual(self.producto.precio_unitario, Decimal('2000'))
+        self.assertEqual(self.producto.stock_disponible, 11)
+
+
+class FacturaStockTest(TestCase):
+    """La facturación respeta el stock disponible"""
+
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nombre="Test")
+        self.producto = Producto.objects.create(
+            nombre="Llave",
+            categoria=self.categoria,
+            stock_disponible=3,
+            precio_unitario=Decimal('5000')
+        )
+        self.user = User.objects.create_user(username='cajero', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _factura(self, cantidad):
+        return {
+            'tipo_documento': 'ninguno',
+            'detalles': [{
+                'producto': self.producto.id,
+                'cantidad': cantidad,
+                'precio_unitario': '5000',
+                'subtotal': str(5000 * cantidad),
+            }]
+        }
+
+    def test_factura_descuenta_stock(self):
+        response = self.client.post('/api/facturas/', self._factura(2), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock_disponible, 1)
+
+    def test_factura_sin_stock_no_se_crea(self):
+        response = self.client.post('/api/facturas/', self._factura(4), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Factura.objects.count(), 0)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock_disponible, 3)
+
+
+class FacturaConsultasConstantesTest(TestCase):
+    """La creación de facturas usa un número fijo de consultas"""
+
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nombre="Test")
+        self.productos = [
+            Producto.objects.create(
+                nombre=f"Producto {i}",
+                categoria=self.categoria,
+                stock_disponible=100,
+                precio_unitario=Decimal('1000')
+            )
+            for i in range(40)
+        ]
+        self.user = User.objects.create_user(username='cajero', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _consultas_para(self, lineas):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        data = {
+            'tipo_documento': 'ninguno',
+            'detalles': [
+                {'producto': p.id, 'cantidad': 2, 'precio_unitario': '1000', 'subtotal': '2000'}
+                for p in self.productos[:lineas]
+            ]
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/facturas/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return len(ctx.captured_queries)
+
+    def test_consultas_no_dependen_de_lineas(self):
+        """Una factura de 40 líneas cuesta lo mismo que una de 1 línea"""
+        una_linea = self._consultas_para(1)
+        cuarenta_lineas = self._consultas_para(40)
+        self.assertEqual(una_linea, cuarenta_lineas)
+        self.assertLessEqual(cuarenta_lineas, 16)  # incluye el SELECT de lotes (lotes.py)
+
+    def test_lote_descuenta_stock_y_registra_movimientos(self):
+        self._consultas_para(40)
+        self.assertEqual(Movimiento.objects.filter(tipo='salida').count(), 40)
+        for producto in self.productos:
+            producto.refresh_from_db()
+            self.assertEqual(producto.stock_disponible, 98)
+
+    def test_producto_repetido_en_varias_lineas(self):
+        """Las cantidades de un mismo producto se suman antes de validar stock"""
+        producto = self.productos[0]
+        data = {
+            'tipo_documento': 'ninguno',
+            'detalles': [
+                {'producto': producto.id, 'cantidad': 60, 'precio_unitario': '1000', 'subtotal': '60000'},
+                {'producto': producto.id, 'cantidad': 60, 'precio_unitario': '1000', 'subtotal': '60000'},
+            ]
+        }
+        response = self.client.post('/api/facturas/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        producto.refresh_from_db()
+        self.assertEqual(producto.stock_disponible, 100)
+
+    def test_producto_inexistente(self):
+        data = {
+            'tipo_documento': 'ninguno',
+            'detalles': [{'producto': 999999, 'cantidad': 1, 'precio_unitario': '1000', 'subtotal': '1000'}]
+        }
+        response = self.client.post('/api/facturas/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_aplicar_movimientos_todo_o_nada(self):
+        """Si un producto no alcanza, ningún otro se modifica"""
+        from inventario.stock import aplicar_movimientos
+
+        a, b = self.productos[0], self.productos[1]
+        with self.assertRaises(StockInsuficiente) as ctx:
+            aplicar_movimientos({a.id: -10, b.id: -101})
+        self.assertEqual(ctx.exception.producto_id, b.id)
+        a.refresh_from_db()
+        self.assertEqual(a.stock_disponible, 100)
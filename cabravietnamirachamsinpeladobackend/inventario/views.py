@@ -3,8 +3,8 @@ from rest_framework.response import Response
 from rest_framework import status
 from .models import Producto, Cliente
 from django.db import models, connection
-from .serializers import ProductoSerializer, ClienteSerializer, ClienteDropdownSerializer
-from .pagination import LargePagination
+from .serializers import ProductoSerializer, ProductoListSerializer, ClienteSerializer, ClienteDropdownSerializer
+from .pagination import LargePagination, KeysetPagination, KeysetFechaEmisionPagination
 
 # ==========================================
 # ENDPOINT DE HEALTH CHECK (Sin autenticación)
@@ -17,17 +17,21 @@ def health_check(request):
     """
     Endpoint de verificación de salud del sistema.
     Verifica que Django esté corriendo y que la conexión a PostgreSQL funcione.
+    Incluye métricas del pool de conexiones (ver conexiones.py) y de la
+    caché compartida (ver cache.py).
     """
+    from .conexiones import metricas
+    from . import cache
     try:
-        # Intentar consulta simple a la base de datos
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
+        # La consulta de métricas también verifica la conexión
+        pool = metricas()
         
         return Response({
             'status': 'healthy',
             'database': 'connected',
-            'service': 'backend'
+            'service': 'backend',
+            'pool': pool,
+            'cache': cache.metricas(),
         }, status=200)
     except Exception as e:
         return Response({
@@ -47,9 +51,55 @@ from rest_framework.permissions import IsAuthenticated
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def productos_stock_bajo(request):
-    productos = Producto.objects.filter(stock_disponible__lte=models.F('stock_minimo'))
-    serializer = ProductoSerializer(productos, many=True)
-    return Response(serializer.data)
+    """
+    Productos activos bajo su stock mínimo, más urgentes primero, con la
+    cantidad sugerida de reposición (ver reposicion.py). Paginado.
+    GET /api/productos/stock-bajo/?dias=30&cobertura=14&page=1&page_size=10
+    """
+    from . import reposicion
+    from .pagination import StandardPagination
+    try:
+        dias, cobertura = reposicion.parametros(request.query_params)
+    except ValueError as e:
+        return Response({'error': f'Parámetros inválidos: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    paginador = StandardPagination()
+    pagina = paginador.paginate_queryset(reposicion.productos_bajo_minimo(), request)
+    return paginador.get_paginated_response(reposicion.sugerencias(pagina, dias, cobertura))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def lotes_por_vencer(request):
+    """
+    Lotes con saldo que vencen en los próximos `dias` días (incluye los
+    ya vencidos), el más próximo primero (ver lotes.py). Paginado.
+    GET /api/lotes/por-vencer/?dias=30&page=1&page_size=10
+    """
+    from . import lotes
+    from .pagination import StandardPagination
+    try:
+        dias = lotes.parametros(request.query_params)
+    except ValueError as e:
+        return Response({'error': f'Parámetros inválidos: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    paginador = StandardPagination()
+    pagina = paginador.paginate_queryset(lotes.por_vencer(dias), request)
+    return paginador.get_paginated_response(lotes.con_dias(pagina))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def lotes_trazabilidad(request):
+    """
+    GET /api/lotes/trazabilidad/?lote=<número>
+    Ingresos con ese número de lote y las facturas de venta que los consumieron.
+    """
+    from . import lotes
+    numero = request.query_params.get('lote', '').strip()
+    if not numero:
+        return Response({'error': 'El parámetro "lote" es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'lote': numero, 'ingresos': lotes.trazabilidad(numero)})
 from django.shortcuts import render
 
 from rest_framework.decorators import api_view
@@ -62,7 +112,10 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from .models import Categoria, Subcategoria, Producto, Movimiento
 from .serializers import CategoriaSerializer, SubcategoriaSerializer, ProductoSerializer, MovimientoSerializer
 from .models import Factura, DetalleFactura
-from .serializers import FacturaSerializer
+from .serializers import FacturaSerializer, FacturaListSerializer
+from .campos import CamposMixin
+from .stock import StockInsuficiente
+from rest_framework.exceptions import ValidationError
 
 
 class ProtectedView(APIView):
@@ -74,26 +127,74 @@ class ProtectedView(APIView):
 
 from rest_framework.permissions import IsAuthenticated
 
-class CategoriaViewSet(ModelViewSet):
+class CategoriaViewSet(CamposMixin, ModelViewSet):
     queryset = Categoria.objects.all()
     serializer_class = CategoriaSerializer
     permission_classes = [IsAuthenticated]
 
 
-class SubcategoriaViewSet(ModelViewSet):
-    queryset = Subcategoria.objects.all()
+class SubcategoriaViewSet(CamposMixin, ModelViewSet):
+    queryset = Subcategoria.objects.select_related('categoria')
     serializer_class = SubcategoriaSerializer
     permission_classes = [IsAuthenticated]
 
 
-class ProductoViewSet(ModelViewSet):
-    queryset = Producto.objects.all()
+class ProductoViewSet(CamposMixin, ModelViewSet):
+    # Los nombres de categoría, subcategoría y proveedor salen en la misma consulta
+    queryset = Producto.objects.select_related('categoria', 'subcategoria', 'proveedor_principal')
     serializer_class = ProductoSerializer
+    # Solo lectura para listados, completo para el resto
+    serializer_class_listado = ProductoListSerializer
     permission_classes = [IsAuthenticated]
 
+    def retrieve(self, request, *args, **kwargs):
+        """Detalle desde la caché compartida (ver cache.py)."""
+        from . import cache
+        pk = kwargs.get(self.lookup_field, '')
+        datos = cache.producto(int(pk)) if str(pk).isdigit() else None
+        if datos is None:
+            return super().retrieve(request, *args, **kwargs)  # 404 estándar
+        return Response(self.recortar(datos))
 
+    @action(detail=False, methods=['get'])
+    def por_codigo(self, request):
+        """
+        Producto por código exacto (lector de código de barras en facturación).
+        GET /api/productos/por_codigo/?codigo=MAR-01
+        """
+        from . import cache
+        codigo = request.query_params.get('codigo', '').strip()
+        if not codigo:
+            return Response({'error': 'Parametro "codigo" requerido'}, status=status.HTTP_400_BAD_REQUEST)
+        datos = cache.producto_por_codigo(codigo)
+        if datos is None:
+            return Response({'error': f'No existe un producto con código {codigo}'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(datos)
+
+    @action(detail=False, methods=['get'])
+    def buscar(self, request):
+        """
+        Búsqueda para autocompletado (full-text por prefijos, ver busqueda.py).
+        GET /api/productos/buscar/?q=llave 14&limite=20&activos=true
+        Retorna una lista liviana, mejor coincidencia primero.
+        """
+        from .busqueda import buscar_productos, LIMITE_POR_DEFECTO, LIMITE_MAXIMO
+
+        try:
+            limite = int(request.query_params.get('limite') or LIMITE_POR_DEFECTO)
+        except ValueError:
+            return Response({'error': "'limite' debe ser un número"}, status=status.HTTP_400_BAD_REQUEST)
+        limite = max(1, min(limite, LIMITE_MAXIMO))
+        solo_activos = request.query_params.get('activos', 'true').lower() != 'false'
 
-class MovimientoViewSet(ModelViewSet):
+        resultados = buscar_productos(request.query_params.get('q', ''), limite, solo_activos)
+        for producto in resultados:
+            producto['precio_unitario'] = float(producto['precio_unitario'])
+        return Response(resultados)
+
+
+
+class MovimientoViewSet(CamposMixin, ModelViewSet):
     """
     API endpoint para movimientos de inventario.
 
@@ -106,94 +207,154 @@ class MovimientoViewSet(ModelViewSet):
     - search: busca en la descripción (ej: ?search=ajuste)
     - ordering: ordena por fecha o cantidad (ej: ?ordering=-fecha)
 
+    Paginación keyset por (fecha, id): seguir los enlaces `next`/`previous`
+    (?cursor=...). ?total=1 agrega un total aproximado. ?page=N sigue
+    funcionando (paginación por número, con count exacto).
+
     Ejemplo de uso:
     /api/movimientos/?producto=1&tipo=salida&usuario=2&fecha__gte=2025-07-01&fecha__lte=2025-07-30&search=venta&ordering=-fecha
     """
-    queryset = Movimiento.objects.all()
+    queryset = Movimiento.objects.select_related('producto')
     serializer_class = MovimientoSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['producto', 'tipo', 'usuario']
     search_fields = ['descripcion']
     ordering_fields = ['fecha', 'cantidad']
 
     def perform_create(self, serializer):
-        serializer.save(usuario=self.request.user)
+        try:
+            serializer.save(usuario=self.request.user)
+        except StockInsuficiente as e:
+            raise ValidationError({'cantidad': str(e)})
+
+
+def _respuesta_pdf(generar, prefijo, adjunto=False):
+    """
+    FileResponse del archivo que retorna generar() (ver pdf.py); 404 si
+    retorna None. Se descarga como <prefijo><numero o fecha>.<extensión>.
+    """
+    from django.http import FileResponse
+    from .pdf import PDFNoDisponible
+
+    try:
+        ruta = generar()
+        if ruta is None:
+            return Response({'error': 'No encontrado'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            archivo = open(ruta, 'rb')
+        except FileNotFoundError:
+            # Otra petición acaba de dibujar una versión nueva y borró esta
+            ruta = generar()
+            archivo = open(ruta, 'rb')
+    except PDFNoDisponible as e:
+        return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    nombre = f"{prefijo}{ruta.stem.rsplit('-', 1)[0]}{ruta.suffix}"  # sin la huella
+    response = FileResponse(archivo, as_attachment=adjunto, filename=nombre)
+    # PDF y zip ya están comprimidos: sin esto GZipMiddleware los volvería a
+    # comprimir en Python en cada descarga y el servidor no podría usar sendfile
+    response['Content-Encoding'] = 'identity'
+    return response
 
 
 # ViewSet para facturación interna
-class FacturaViewSet(ModelViewSet):
-    queryset = Factura.objects.all().order_by('-fecha')
+class FacturaViewSet(CamposMixin, ModelViewSet):
+    queryset = Factura.objects.order_by('-fecha', '-id')
     serializer_class = FacturaSerializer
+    # Listado sin líneas; ?expand=detalles las incluye (ver campos.py)
+    serializer_class_listado = FacturaListSerializer
+    campos_anidados = {'detalles': 'detalles'}
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     @action(detail=True, methods=['get'])
     def datos_completos(self, request, pk=None):
         """
         Endpoint para obtener todos los datos de una factura 
-        formateados para generar PDF en el frontend
+        formateados para generar PDF en el frontend.
+        Tres consultas como máximo y cacheado por número (ver impresion.py).
+        """
+        from .impresion import datos_factura
+        datos = datos_factura(int(pk)) if str(pk).isdigit() else None
+        if datos is None:
+            return Response({'error': 'Factura no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(datos)
+
+    @action(detail=False, methods=['get'], url_path='datos_completos')
+    def datos_completos_lote(self, request):
+        """
+        Datos de impresión de varias facturas (reimpresión de un día).
+        GET /api/facturas/datos_completos/?ids=1,2,3
+        Retorna la lista en el orden pedido, omitiendo ids inexistentes.
+        """
+        from .impresion import datos_facturas, ids_de_parametro
+        try:
+            ids = ids_de_parametro(request.query_params.get('ids'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(datos_facturas(ids))
+
+    @action(detail=True, methods=['get'])
+    def pdf(self, request, pk=None):
+        """
+        PDF de la factura generado en el servidor (ver pdf.py).
+        Se dibuja una vez y luego se sirve el archivo guardado.
+        """
+        from . import pdf
+        return _respuesta_pdf(lambda: pdf.factura(int(pk)) if str(pk).isdigit() else None,
+                              'factura-')
+
+    @action(detail=False, methods=['get'], url_path='pdf-dia')
+    def pdf_dia(self, request):
+        """
+        Todas las facturas de un día para reimprimir.
+        GET /api/facturas/pdf-dia/?fecha=2025-07-30&formato=pdf|zip
+        pdf: un documento con una factura por página; zip: un PDF por factura.
         """
+        from datetime import date
+        from django.utils import timezone
+        from . import pdf
+
+        formato = request.query_params.get('formato') or 'pdf'
+        if formato not in ('pdf', 'zip'):
+            return _error_parametros("'formato' debe ser pdf o zip")
         try:
-            factura = self.get_object()
-            
-            # Formatear los datos para el PDF
-            datos_factura = {
-                'numero_factura': factura.numero_factura,
-                'fecha': factura.fecha.strftime('%d/%m/%Y'),
-                'hora': factura.fecha.strftime('%H:%M:%S'),
-                
-                # Datos del cliente
-                'cliente': {
-                    'tipo_documento': factura.get_tipo_documento_display(),
-                    'numero_documento': factura.numero_documento,
-                    'nombre': factura.nombre_cliente,
-                    'email': factura.email_cliente,
-                    'telefono': factura.telefono_cliente,
-                    'direccion': factura.direccion_cliente,
-                },
-                
-                # Detalles de productos
-                'detalles': [],
-                
-                # Totales
-                'subtotal': float(factura.subtotal),
-                'descuento_total': float(factura.descuento_total),
-                'impuesto_total': float(factura.impuesto_total),
-                'total': float(factura.total),
-                'observaciones': factura.observaciones,
-                
-                # Datos del usuario que creó la factura
-                'vendedor': {
-                    'nombre': f"{factura.usuario.first_name} {factura.usuario.last_name}".strip() or factura.usuario.username,
-                    'username': factura.usuario.username
-                }
-            }
-            
-            # Agregar detalles de productos
-            for detalle in factura.detalles.all():
-                datos_factura['detalles'].append({
-                    'producto': detalle.producto.nombre,
-                    'codigo': detalle.producto.codigo,
-                    'descripcion': detalle.producto.descripcion,
-                    'cantidad': int(detalle.cantidad),
-                    'precio_unitario': float(detalle.precio_unitario),
-                    'subtotal': float(detalle.subtotal),
-                    'categoria': detalle.producto.categoria.nombre if detalle.producto.categoria else '',
-                    'marca': detalle.producto.marca or ''
-                })
-            
-            return Response(datos_factura)
-            
-        except Exception as e:
+            fecha = date.fromisoformat(request.query_params['fecha']) if request.query_params.get('fecha') \
+                else timezone.localdate()
+        except ValueError as e:
+            return _error_parametros(e)
+        return _respuesta_pdf(lambda: pdf.facturas_del_dia(fecha, formato),
+                              'facturas-', adjunto=True)
+
+    @action(detail=False, methods=['get'])
+    def huecos_numeracion(self, request):
+        """
+        Rangos de números sin factura en una serie (números consumidos por
+        ventas revertidas). GET /api/facturas/huecos_numeracion/?serie=FAC
+        """
+        from .models import SerieNumeracion
+        from .numeracion import huecos_numeracion
+        
+        serie = request.query_params.get('serie', 'FAC')
+        try:
+            huecos = huecos_numeracion(serie)
+        except SerieNumeracion.DoesNotExist:
             return Response(
-                {'error': f'Error al obtener datos de factura: {str(e)}'}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {'error': f'Serie de numeración inexistente: {serie}'},
+                status=status.HTTP_404_NOT_FOUND
             )
+        return Response({
+            'serie': serie,
+            'huecos': [{'desde': desde, 'hasta': hasta} for desde, hasta in huecos]
+        })
 # ViewSets para módulo de recepción de mercaderías
-from .models import Proveedor, OrdenCompra, RecepcionMercaderia
-from .serializers import ProveedorSerializer, OrdenCompraSerializer, RecepcionMercaderiaSerializer
+from django.db.models import Count, Prefetch
+from .models import Proveedor, OrdenCompra, RecepcionMercaderia, ProductoProveedor
+from .serializers import (ProveedorSerializer, ProveedorListSerializer, OrdenCompraSerializer,
+                          OrdenCompraListSerializer, RecepcionMercaderiaSerializer)
 
-class ProveedorViewSet(ModelViewSet):
+class ProveedorViewSet(CamposMixin, ModelViewSet):
     """
     API endpoint para gestión de proveedores.
     
@@ -203,6 +364,13 @@ class ProveedorViewSet(ModelViewSet):
     """
     queryset = Proveedor.objects.all()
     serializer_class = ProveedorSerializer
+    # Listado sin productos_suministrados; ?expand=productos_suministrados los incluye
+    serializer_class_listado = ProveedorListSerializer
+    campos_anidados = {
+        'productos_suministrados': Prefetch(
+            'productos_suministrados', queryset=ProductoProveedor.objects.select_related('producto')
+        ),
+    }
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['activo']
@@ -210,7 +378,7 @@ class ProveedorViewSet(ModelViewSet):
     ordering_fields = ['nombre', 'fecha_creacion']
 
 
-class OrdenCompraViewSet(ModelViewSet):
+class OrdenCompraViewSet(CamposMixin, ModelViewSet):
     """
     API endpoint para órdenes de compra.
     
@@ -219,8 +387,12 @@ class OrdenCompraViewSet(ModelViewSet):
     - estado: pendiente, parcial, completa, cancelada (ej: ?estado=pendiente)
     - fecha_orden: filtro por fecha (ej: ?fecha_orden__gte=2025-01-01)
     """
-    queryset = OrdenCompra.objects.all().order_by('-fecha_orden')
+    queryset = OrdenCompra.objects.order_by('-fecha_orden')
     serializer_class = OrdenCompraSerializer
+    # Listado con cantidad_items en lugar de las líneas; ?expand=detalles las incluye
+    serializer_class_listado = OrdenCompraListSerializer
+    campos_anidados = {'detalles': 'detalles'}
+    campos_anotados = {'cantidad_items': Count('detalles')}
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['proveedor', 'estado']
@@ -228,7 +400,7 @@ class OrdenCompraViewSet(ModelViewSet):
     ordering_fields = ['fecha_orden', 'fecha_esperada', 'total_estimado']
 
 
-class RecepcionMercaderiaViewSet(ModelViewSet):
+class RecepcionMercaderiaViewSet(CamposMixin, ModelViewSet):
     """
     API endpoint para recepción de mercaderías.
     
@@ -242,8 +414,9 @@ class RecepcionMercaderiaViewSet(ModelViewSet):
     - orden_compra: ID de la orden de compra (ej: ?orden_compra=1)
     - fecha_recepcion: filtro por fecha (ej: ?fecha_recepcion__gte=2025-01-01)
     """
-    queryset = RecepcionMercaderia.objects.all().order_by('-fecha_recepcion')
+    queryset = RecepcionMercaderia.objects.order_by('-fecha_recepcion')
     serializer_class = RecepcionMercaderiaSerializer
+    campos_anidados = {'detalles': 'detalles'}
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['proveedor', 'orden_compra']
@@ -255,7 +428,7 @@ class RecepcionMercaderiaViewSet(ModelViewSet):
 from .models import ProductoProveedor
 from .serializers import ProductoProveedorSerializer
 
-class ProductoProveedorViewSet(ModelViewSet):
+class ProductoProveedorViewSet(CamposMixin, ModelViewSet):
     """
     API endpoint para gestionar qué proveedores suministran cada producto.
     
@@ -271,7 +444,7 @@ class ProductoProveedorViewSet(ModelViewSet):
     - es_principal: true/false (ej: ?es_principal=true)
     - activo: true/false (ej: ?activo=true)
     """
-    queryset = ProductoProveedor.objects.all()
+    queryset = ProductoProveedor.objects.select_related('producto', 'proveedor')
     serializer_class = ProductoProveedorSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -282,7 +455,7 @@ class ProductoProveedorViewSet(ModelViewSet):
 # VIEWSET DE CLIENTES
 # ==========================================
 
-class ClienteViewSet(ModelViewSet):
+class ClienteViewSet(CamposMixin, ModelViewSet):
     """
     CRUD completo para gestion de clientes.
     Incluye busqueda por documento para autocompletado.
@@ -302,7 +475,10 @@ class ClienteViewSet(ModelViewSet):
         Busca cliente por numero de documento.
         Usado para autocompletado en facturacion.
         GET /api/clientes/buscar_por_documento/?documento=123456
+        Ignora guiones, puntos y espacios (80.012.345-6 = 80012345-6).
+        Se resuelve desde la caché compartida (ver cache.py).
         """
+        from . import cache
         documento = request.query_params.get('documento', '').strip()
         
         if not documento:
@@ -311,28 +487,52 @@ class ClienteViewSet(ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        try:
-            cliente = Cliente.objects.get(numero_documento=documento, activo=True)
-            serializer = ClienteDropdownSerializer(cliente)
-            return Response({
-                'encontrado': True,
-                'cliente': serializer.data
-            })
-        except Cliente.DoesNotExist:
+        cliente = cache.cliente_por_documento(documento)
+        if cliente is None:
             return Response({
                 'encontrado': False,
                 'mensaje': 'Cliente no registrado'
             })
+        return Response({
+            'encontrado': True,
+            'cliente': cliente
+        })
+    
+    @action(detail=False, methods=['get'])
+    def autocompletar(self, request):
+        """
+        Autocompletado de clientes mientras se escribe (ver clientes.py).
+        GET /api/clientes/autocompletar/?q=80012
+        Busca por prefijo de documento (sin guiones ni puntos) o de
+        teléfono y por nombre. Retorna hasta 10 clientes activos.
+        """
+        from .clientes import autocompletar
+        return Response(autocompletar(request.query_params.get('q', '')))
     
     @action(detail=False, methods=['get'])
     def dropdown(self, request):
         """
         Lista de clientes para selectores (sin paginacion).
+        Responde 304 si el cliente ya tiene la lista vigente (ver condicional.py).
         """
+        from .condicional import respuesta_condicional
         clientes = Cliente.objects.filter(activo=True).values(
             'id', 'nombre', 'numero_documento', 'tipo_documento'
         ).order_by('nombre')
-        return Response(list(clientes))
+        return respuesta_condicional(request, Cliente, lambda: list(clientes))
+    
+    @action(detail=False, methods=['get'])
+    def top(self, request):
+        """
+        Mejores clientes según sus contadores de compras (ver clientes.py).
+        GET /api/clientes/top/?limite=10&orden=monto|compras
+        """
+        from . import clientes
+        try:
+            limite, orden = clientes.parametros(request.query_params)
+        except ValueError as e:
+            return Response({'error': f'Parámetros inválidos: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(clientes.top(limite, orden))
     
     @action(detail=False, methods=['post'])
     def crear_desde_factura(self, request):
@@ -342,9 +542,10 @@ class ClienteViewSet(ModelViewSet):
         """
         data = request.data
         
-        # Verificar si ya existe
-        numero_doc = data.get('numero_documento', '').strip()
-        if numero_doc and Cliente.objects.filter(numero_documento=numero_doc).exists():
+        # Verificar si ya existe (documento normalizado, ver clientes.py)
+        from .clientes import normalizar
+        numero_doc = normalizar(data.get('numero_documento', '').strip())
+        if numero_doc and Cliente.objects.filter(documento_normalizado=numero_doc).exists():
             return Response(
                 {'error': 'Ya existe un cliente con ese documento'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -370,26 +571,48 @@ class ClienteViewSet(ModelViewSet):
 def productos_dropdown(request):
     """
     Retorna productos con campos mínimos para dropdowns.
-    Optimizado: usa .values() directo sin serializer pesado.
+    Optimizado: usa .values() directo sin serializer pesado, y responde
+    304 si el cliente ya tiene la lista vigente (ver condicional.py).
     """
+    from .condicional import respuesta_condicional
     productos = Producto.objects.filter(activo=True).values(
         'id', 'codigo', 'nombre', 'precio_costo', 'precio_unitario', 'stock_disponible'
     ).order_by('nombre')
-    return Response(list(productos))
+    return respuesta_condicional(request, Producto, lambda: list(productos))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def productos_cambios(request):
+    """
+    GET /api/productos/cambios/?desde=<token>
+    Productos creados, editados, dados de baja o con stock modificado
+    desde el token (ver sincronizacion.py). Sin `desde` retorna el
+    catálogo completo y el token para la próxima sincronización.
+    """
+    from .sincronizacion import cambios_desde, TokenInvalido
+    try:
+        return Response(cambios_desde(request.query_params.get('desde')))
+    except TokenInvalido:
+        return Response(
+            {'error': 'Parámetro "desde" inválido: debe ser el token recibido en la sincronización anterior'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def proveedores_dropdown(request):
     """
-    Retorna TODOS los proveedores para selectores.
+    Retorna TODOS los proveedores para selectores (304 si no cambiaron).
     """
     from .models import Proveedor
+    from .condicional import respuesta_condicional
     proveedores = Proveedor.objects.filter(activo=True).values(
         'id', 'nombre', 'telefono', 'email'
     ).order_by('nombre')
     
-    return Response(list(proveedores))
+    return respuesta_condicional(request, Proveedor, lambda: list(proveedores), espacio='proveedores')
 
 
 # ==========================================
@@ -466,11 +689,12 @@ def producto_rapido(request):
 @permission_classes([IsAuthenticated])
 def categorias_dropdown(request):
     """
-    Retorna TODAS las categorías para selectores.
+    Retorna TODAS las categorías para selectores (304 si no cambiaron).
     """
     from .models import Categoria
+    from .condicional import respuesta_condicional
     categorias = Categoria.objects.all().values('id', 'nombre').order_by('nombre')
-    return Response(list(categorias))
+    return respuesta_condicional(request, Categoria, lambda: list(categorias), espacio='categorias')
 
 
 # ==========================================
@@ -484,7 +708,7 @@ from .models import FacturaCompra
 from .serializers import FacturaCompraListSerializer, FacturaCompraDetailSerializer
 
 
-class FacturaCompraViewSet(ModelViewSet):
+class FacturaCompraViewSet(CamposMixin, ModelViewSet):
     """
     ViewSet para gestionar facturas de compra recibidas de proveedores.
     
@@ -499,11 +723,21 @@ class FacturaCompraViewSet(ModelViewSet):
         'proveedor', 
         'orden_compra', 
         'usuario_registro'
-    ).prefetch_related('detalles__producto')
+    )
+    serializer_class = FacturaCompraDetailSerializer
+    # Listado ligero; ?expand=detalles usa el serializer completo
+    serializer_class_listado = FacturaCompraListSerializer
+    campos_anidados = {'detalles': 'detalles__producto'}
+    campos_dependencias = {
+        'dias_vencimiento': ['fecha_vencimiento', 'estado'],
+        'esta_vencida': ['fecha_vencimiento', 'estado'],
+    }
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     search_fields = ['numero_factura', 'proveedor__nombre', 'timbrado']
     ordering_fields = ['fecha_emision', 'fecha_vencimiento', 'total', 'numero_factura']
     ordering = ['-fecha_emision', '-id']
+    # Keyset por (fecha_emision, id); con ?page=N usa paginación por número
+    pagination_class = KeysetFechaEmisionPagination
     
     # Filtros disponibles
     filterset_fields = {
@@ -513,14 +747,13 @@ class FacturaCompraViewSet(ModelViewSet):
         'fecha_emision': ['gte', 'lte', 'exact'],
         'fecha_vencimiento': ['gte', 'lte', 'exact'],
     }
-    
-    def get_serializer_class(self):
-        """
-        Usar serializer ligero para listados y completo para detalle
-        """
-        if self.action == 'list':
-            return FacturaCompraListSerializer
-        return FacturaCompraDetailSerializer
+
+    @action(detail=True, methods=['get'])
+    def pdf(self, request, pk=None):
+        """Resumen en PDF de la factura de compra (ver pdf.py)."""
+        from . import pdf
+        return _respuesta_pdf(lambda: pdf.factura_compra(int(pk)) if str(pk).isdigit() else None,
+                              'compra-')
     
     def get_queryset(self):
         """
@@ -597,33 +830,119 @@ class FacturaCompraViewSet(ModelViewSet):
     @action(detail=False, methods=['get'])
     def estadisticas(self, request):
         """
-        Retorna estadísticas de facturas de compra
+        Retorna estadísticas de facturas de compra: totales, antigüedad de
+        lo pendiente y saldo por proveedor, en una sola consulta cacheada
+        por día (ver cuentas_por_pagar.py)
         """
-        from django.db.models import Sum, Count, Q
         from django.utils import timezone
-        from datetime import timedelta
-        
-        hoy = timezone.now().date()
-        
-        stats = {
-            'total_facturas': self.get_queryset().count(),
-            'facturas_pendientes': self.get_queryset().filter(estado='pendiente').count(),
-            'facturas_pagadas': self.get_queryset().filter(estado='pagada').count(),
-            'facturas_vencidas': self.get_queryset().filter(
-                estado='pendiente',
-                fecha_vencimiento__lt=hoy
-            ).count(),
-            'facturas_proximas_vencer': self.get_queryset().filter(
-                estado='pendiente',
-                fecha_vencimiento__gte=hoy,
-                fecha_vencimiento__lte=hoy + timedelta(days=7)
-            ).count(),
-            'monto_total_pendiente': self.get_queryset().filter(
-                estado='pendiente'
-            ).aggregate(total=Sum('total'))['total'] or 0,
-            'monto_total_pagado': self.get_queryset().filter(
-                estado='pagada'
-            ).aggregate(total=Sum('total'))['total'] or 0,
-        }
-        
-        return Response(stats)
\ No newline at end of file
+        from . import cache, cuentas_por_pagar
+
+        hoy = timezone.localdate()
+        return Response(cache.obtener(
+            'facturas_compra', f'estadisticas:{hoy.isoformat()}',
+            lambda: cuentas_por_pagar.estadisticas(hoy)
+        ))
+
+# ==========================================
+# ENDPOINTS DE ANALYTICS (agregados en SQL)
+# ==========================================
+
+def _parametros_analytics(request):
+    """Lee ?desde/?hasta (o ?dias) y ?limite. Lanza ValueError si son inválidos."""
+    from .analytics import parametros
+    return parametros(request.query_params)
+
+
+def _error_parametros(error):
+    return Response({'error': f'Parámetros inválidos: {error}'}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def analytics_dashboard(request):
+    """
+    Dashboard completo en una sola respuesta: resumen, ventas por día,
+    top productos, marcas, clientes, margen por categoría y valorización.
+    GET /api/analytics/dashboard/?desde=2025-01-01&hasta=2025-01-31
+    """
+    from . import analytics
+    try:
+        desde, hasta, limite = _parametros_analytics(request)
+    except ValueError as e:
+        return _error_parametros(e)
+    return Response(analytics.dashboard(desde, hasta, limite))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def analytics_ventas_por_dia(request):
+    from . import analytics
+    try:
+        desde, hasta, _ = _parametros_analytics(request)
+    except ValueError as e:
+        return _error_parametros(e)
+    return Response(analytics.ventas_por_dia(desde, hasta))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def analytics_top_productos(request):
+    from . import analytics
+    try:
+        desde, hasta, limite = _parametros_analytics(request)
+    except ValueError as e:
+        return _error_parametros(e)
+    return Response(analytics.top_productos(desde, hasta, limite))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def analytics_margen_categorias(request):
+    from . import analytics
+    try:
+        desde, hasta, _ = _parametros_analytics(request)
+    except ValueError as e:
+        return _error_parametros(e)
+    return Response(analytics.margen_por_categoria(desde, hasta))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def analytics_valorizacion_stock(request):
+    """Valorización del inventario actual (no depende del rango de fechas)."""
+    from . import analytics
+    return Response(analytics.valorizacion_stock())
+
+
+# ==========================================
+# EXPORTACIÓN CSV (streaming)
+# ==========================================
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def exportar_csv(request, recurso):
+    """
+    Descarga CSV de productos, movimientos, facturas (una fila por línea)
+    o facturas-compra, generado por streaming (ver exportar.py).
+    GET /api/exportar/movimientos/?desde=2025-01-01&hasta=2025-12-31
+    GET /api/exportar/productos/?activos=true
+    """
+    from django.http import StreamingHttpResponse
+    from django.utils import timezone
+    from . import exportar
+
+    exportacion = exportar.EXPORTACIONES.get(recurso)
+    if exportacion is None:
+        return Response({'error': f"Exportación desconocida: '{recurso}'"}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        desde, hasta = exportar.rango_opcional(request.query_params)
+    except ValueError as e:
+        return _error_parametros(e)
+
+    encabezados, filas = exportacion(request.query_params, desde, hasta)
+    response = StreamingHttpResponse(
+        exportar.lineas_csv(encabezados, filas), content_type='text/csv; charset=utf-8'
+    )
+    nombre = f"{recurso}_{timezone.localdate().isoformat()}.csv"
+    response['Content-Disposition'] = f'attachment; filename="{nombre}"'
+    return response
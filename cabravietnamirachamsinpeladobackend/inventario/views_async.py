@@ -0,0 +1,120 @@
+"""
+Variantes async de los endpoints de lectura más usados.
+
+Se enrutan en lugar de las versiones DRF cuando el backend corre en modo
+ASGI (SERVIDOR=asgi, workers uvicorn): mientras esperan a la base no
+ocupan un worker, así pocas instancias atienden muchas cajas y
+dashboards a la vez. En modo WSGI se siguen usando las vistas de views.py.
+
+DRF 3.15 no tiene vistas async, por eso son vistas Django simples con la
+misma autenticación JWT y el mismo formato de respuesta (JSONRenderer
+de DRF) que sus equivalentes síncronas.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException, MethodNotAllowed, NotAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import cache, condicional
+from .models import Producto
+
+
+def _json(data, estado=status.HTTP_200_OK):
+    return HttpResponse(JSONRenderer().render(data), status=estado, content_type='application/json')
+
+
+def _no_autorizado(error):
+    """Misma respuesta 401 que arma el exception handler de DRF."""
+    data = error.detail if isinstance(error.detail, (list, dict)) else {'detail': error.detail}
+    respuesta = _json(data, status.HTTP_401_UNAUTHORIZED)
+    respuesta['WWW-Authenticate'] = 'Bearer realm="api"'
+    return respuesta
+
+
+def autenticado(vista):
+    """Equivalente async de @permission_classes([IsAuthenticated]) con JWT."""
+    autenticacion = JWTAuthentication()
+
+    async def envoltura(request, *args, **kwargs):
+        try:
+            resultado = await sync_to_async(autenticacion.authenticate)(request)
+        except APIException as e:
+            return _no_autorizado(e)
+        if resultado is None:
+            return _no_autorizado(NotAuthenticated())
+        request.user, request.auth = resultado
+        return await vista(request, *args, **kwargs)
+
+    envoltura.__name__ = vista.__name__
+    envoltura.__doc__ = vista.__doc__
+    return envoltura
+
+
+def solo_get(vista):
+    """Equivalente async de @api_view(['GET'])."""
+    async def envoltura(request, *args, **kwargs):
+        if request.method != 'GET':
+            return _json({'detail': MethodNotAllowed(request.method).detail}, status.HTTP_405_METHOD_NOT_ALLOWED)
+        return await vista(request, *args, **kwargs)
+
+    envoltura.__name__ = vista.__name__
+    envoltura.__doc__ = vista.__doc__
+    return envoltura
+
+
+@solo_get
+async def health_check(request):
+    """GET /api/health/ (sin autenticación), igual que views.health_check."""
+    from .conexiones import metricas
+    try:
+        pool = await sync_to_async(metricas)()
+        return _json({'status': 'healthy', 'database': 'connected', 'service': 'backend', 'pool': pool,
+                      'cache': cache.metricas()})
+    except Exception as e:
+        return _json({'status': 'unhealthy', 'database': 'disconnected', 'error': str(e)},
+                     status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+@solo_get
+@autenticado
+async def productos_dropdown(request):
+    """GET /api/productos/dropdown/ con el ORM async (304 si no cambió)."""
+    etag, ultima = await condicional.asello(Producto)
+    respuesta = condicional.no_modificado(request, etag, ultima)
+    if respuesta is None:
+        productos = Producto.objects.filter(activo=True).values(
+            'id', 'codigo', 'nombre', 'precio_costo', 'precio_unitario', 'stock_disponible'
+        ).order_by('nombre')
+        respuesta = _json([producto async for producto in productos])
+    return condicional.marcar(respuesta, etag, ultima)
+
+
+@solo_get
+@autenticado
+async def clientes_buscar_por_documento(request):
+    """GET /api/clientes/buscar_por_documento/?documento=123456"""
+    documento = request.GET.get('documento', '').strip()
+    if not documento:
+        return _json({'error': 'Parametro "documento" requerido'}, status.HTTP_400_BAD_REQUEST)
+
+    cliente = await sync_to_async(cache.cliente_por_documento)(documento)
+    if cliente is None:
+        return _json({'encontrado': False, 'mensaje': 'Cliente no registrado'})
+    return _json({'encontrado': True, 'cliente': cliente})
+
+
+@solo_get
+@autenticado
+async def analytics_dashboard(request):
+    """
+    GET /api/analytics/dashboard/ — las agregaciones corren en un hilo
+    aparte (sync_to_async) sin bloquear el event loop.
+    """
+    from . import analytics
+    try:
+        desde, hasta, limite = analytics.parametros(request.GET)
+    except ValueError as e:
+        return _json({'error': f'Parámetros inválidos: {e}'}, status.HTTP_400_BAD_REQUEST)
+    return _json(await sync_to_async(analytics.dashboard)(desde, hasta, limite))
@@ -56,6 +56,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero: comprime la respuesta ya terminada (listas y dropdowns JSON)
+    'django.middleware.gzip.GZipMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -90,6 +92,20 @@ WSGI_APPLICATION = 'inventario_ferreteria.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Servidor de aplicación (docker-entrypoint.sh):
+#   wsgi (por defecto): gunicorn con workers síncronos.
+#   asgi: gunicorn con workers uvicorn; los endpoints de lectura más usados
+#       se atienden con las vistas async de inventario/views_async.py.
+SERVIDOR = os.getenv('SERVIDOR', 'wsgi')
+
+# Modo de conexión (DB_POOL), ver inventario/conexiones.py:
+#   persistente (por defecto): cada worker de gunicorn reutiliza su conexión
+#       durante DB_CONN_MAX_AGE segundos, sin handshake por request.
+#   pgbouncer: conexión a PgBouncer (servicio `pgbouncer` de docker-compose,
+#       pool_mode=transaction), que mantiene el pool real contra PostgreSQL.
+#   ninguno: una conexión nueva por request (comportamiento anterior).
+DB_POOL = os.getenv('DB_POOL', 'persistente')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -102,11 +118,51 @@ DATABASES = {
             'connect_timeout': 10,
             'options': '-c statement_timeout=30000'  # 30 segundos
         },
-        'CONN_MAX_AGE': 0,  # Cerrar conexiones después de cada request para evitar conexiones obsoletas
+        # Segundos que una conexión se reutiliza entre requests (0 = cerrar al terminar cada request).
+        # En ASGI cada request async usa su propio hilo: las conexiones persistentes
+        # no se reutilizarían, por eso ahí se recomienda DB_POOL=pgbouncer.
+        'CONN_MAX_AGE': 0 if DB_POOL == 'ninguno' or SERVIDOR == 'asgi' else int(os.getenv('DB_CONN_MAX_AGE', '60')),
         'CONN_HEALTH_CHECKS': True,  # Django 4.1+ verifica la salud de las conexiones
     }
 }
 
+if DB_POOL == 'pgbouncer':
+    DATABASES['default'].update({
+        'HOST': os.getenv('PGBOUNCER_HOST', 'pgbouncer'),
+        'PORT': os.getenv('PGBOUNCER_PORT', '6432'),
+        # En modo transaction los cursores del servidor no sobreviven entre transacciones
+        'DISABLE_SERVER_SIDE_CURSORS': True,
+    })
+    # PgBouncer no acepta el parámetro de arranque `options`:
+    # el límite de 30 s lo aplica PgBouncer (query_timeout)
+    DATABASES['default']['OPTIONS'].pop('options')
+
+# Caché (inventario/cache.py): con REDIS_URL (ej. redis://redis:6379/0) es
+# compartida por todos los workers; sin REDIS_URL se usa memoria local del
+# proceso (desarrollo y tests). CACHE_TTL es el máximo que vive una entrada
+# aunque no se invalide (segundos).
+REDIS_URL = os.getenv('REDIS_URL', '')
+CACHE_TTL = int(os.getenv('CACHE_TTL', '300'))
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'inventario',
+            'TIMEOUT': CACHE_TTL,
+            'OPTIONS': {'socket_connect_timeout': 1, 'socket_timeout': 1},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'inventario',
+            'TIMEOUT': CACHE_TTL,
+        }
+    }
+
 # Password validation
 
 REST_FRAMEWORK = {
@@ -170,6 +226,11 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'mediafiles')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Numeración de facturas: cantidad de números que reserva cada worker por consulta
+# (1 = estrictamente correlativo; >1 reduce consultas pero deja huecos al reiniciar;
+# solo PostgreSQL, en otros motores se usa 1)
+NUMERACION_BLOQUE = int(os.getenv('NUMERACION_BLOQUE', 1))
+
 # CORS Configuration
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
@@ -14,14 +14,18 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from inventario.views import (ProtectedView, CategoriaViewSet, SubcategoriaViewSet, ProductoViewSet, 
-                            MovimientoViewSet, productos_stock_bajo, FacturaViewSet,
+                            MovimientoViewSet, productos_stock_bajo, lotes_por_vencer, lotes_trazabilidad,
+                            FacturaViewSet,
                             ProveedorViewSet, OrdenCompraViewSet, RecepcionMercaderiaViewSet, 
                             ProductoProveedorViewSet, ClienteViewSet, FacturaCompraViewSet, health_check,
-                            productos_dropdown, proveedores_dropdown, producto_rapido, categorias_dropdown)
+                            productos_dropdown, productos_cambios, proveedores_dropdown, producto_rapido, categorias_dropdown,
+                            analytics_dashboard, analytics_ventas_por_dia, analytics_top_productos,
+                            analytics_margen_categorias, analytics_valorizacion_stock, exportar_csv)
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -46,6 +50,7 @@ urlpatterns = [
     path('api/health/', health_check, name='health-check'),  # Healthcheck sin autenticación
     # Endpoints para dropdowns (sin paginacion)
     path('api/productos/dropdown/', productos_dropdown, name='productos-dropdown'),
+    path('api/productos/cambios/', productos_cambios, name='productos-cambios'),
     path('api/productos/rapido/', producto_rapido, name='producto-rapido'),
     path('api/categorias/dropdown/', categorias_dropdown, name='categorias-dropdown'),
     path('api/proveedores/dropdown/', proveedores_dropdown, name='proveedores-dropdown'),
@@ -53,6 +58,30 @@ urlpatterns = [
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     # path('api/protected/', ProtectedView.as_view(), name='protected'),
     path('api/productos/stock-bajo/', productos_stock_bajo, name='productos_stock_bajo'),
+    # Lotes: vencimientos y trazabilidad (ver inventario/lotes.py)
+    path('api/lotes/por-vencer/', lotes_por_vencer, name='lotes-por-vencer'),
+    path('api/lotes/trazabilidad/', lotes_trazabilidad, name='lotes-trazabilidad'),
+    # Endpoints de analytics (agregados en la base de datos)
+    path('api/analytics/dashboard/', analytics_dashboard, name='analytics-dashboard'),
+    path('api/analytics/ventas-por-dia/', analytics_ventas_por_dia, name='analytics-ventas-por-dia'),
+    path('api/analytics/top-productos/', analytics_top_productos, name='analytics-top-productos'),
+    path('api/analytics/margen-categorias/', analytics_margen_categorias, name='analytics-margen-categorias'),
+    path('api/analytics/valorizacion-stock/', analytics_valorizacion_stock, name='analytics-valorizacion-stock'),
+    # Exportación CSV por streaming
+    path('api/exportar/<str:recurso>/', exportar_csv, name='exportar-csv'),
     path('api/', include(router.urls)),
 ]
 
+if settings.SERVIDOR == 'asgi':
+    # Variantes async de los endpoints de lectura más usados (ver inventario/views_async.py).
+    # Van primero para tener prioridad sobre las rutas síncronas equivalentes.
+    from inventario import views_async
+
+    urlpatterns = [
+        path('api/health/', views_async.health_check, name='health-check-async'),
+        path('api/productos/dropdown/', views_async.productos_dropdown, name='productos-dropdown-async'),
+        path('api/clientes/buscar_por_documento/', views_async.clientes_buscar_por_documento,
+             name='clientes-buscar-por-documento-async'),
+        path('api/analytics/dashboard/', views_async.analytics_dashboard, name='analytics-dashboard-async'),
+    ] + urlpatterns
+
@@ -217,43 +217,23 @@ export class AnalyticsComponent implements OnInit, AfterViewInit {
   }
 
   cargarDatos() {
-    // Cargar estadísticas generales desde datos reales
-    this.analyticsService.getDashboardStats().subscribe({
-      next: (stats) => {
-        this.stats = stats;
-        this.promedioVentaDiaria = stats.ventas_mes / 30;
-      }
-    });
+    // Todo el dashboard en una sola petición, agregado en el backend
+    this.analyticsService.getDashboard(7).subscribe({
+      next: (data) => {
+        this.stats = data.resumen;
+        this.promedioVentaDiaria = data.resumen.ventas_mes / 30;
 
-    // Cargar tendencias de ventas desde datos reales
-    this.analyticsService.getVentasPorPeriodo(7).subscribe({
-      next: (ventas) => {
-        this.ventas = ventas;
+        this.ventas = data.ventas_por_dia;
         setTimeout(() => this.crearGraficoTendencias(), 0);
-      }
-    });
 
-    // Cargar productos más vendidos desde datos reales
-    this.analyticsService.getProductosMasVendidos().subscribe({
-      next: (productos) => {
-        this.productos = productos.slice(0, 10);
-        this.maxIngresos = Math.max(...productos.map(p => p.ingresos_totales));
+        this.productos = data.top_productos.slice(0, 10);
+        this.maxIngresos = Math.max(...this.productos.map(p => p.ingresos_totales));
         setTimeout(() => this.crearGraficoProductos(), 0);
-      }
-    });
 
-    // Cargar clientes frecuentes desde datos reales
-    this.analyticsService.getClientesFrecuentes().subscribe({
-      next: (clientes) => {
-        this.clientes = clientes.slice(0, 8);
+        this.clientes = data.clientes_frecuentes.slice(0, 8);
         setTimeout(() => this.crearGraficoClientes(), 0);
-      }
-    });
 
-    // Cargar marcas populares desde datos reales
-    this.analyticsService.getMarcasPopulares().subscribe({
-      next: (marcas) => {
-        this.marcas = marcas;
+        this.marcas = data.marcas_populares;
         setTimeout(() => this.crearGraficoMarcasPie(), 0);
       }
     });
@@ -1,8 +1,8 @@
 export interface VentaAnalytics {
   fecha: string;
   total: number;
+  facturas: number;
   cantidad_productos: number;
-  cliente: string;
 }
 
 export interface ProductoVendido {
@@ -33,4 +33,42 @@ export interface DashboardStats {
   clientes_unicos_mes: number;
   producto_mas_vendido: string;
   marca_mas_popular: string;
+  facturas_hoy?: number;
+}
+
+export interface MargenCategoria {
+  categoria_id: number;
+  categoria: string;
+  unidades: number;
+  ingresos: number;
+  costo: number;
+  margen: number;
+  margen_porcentaje: number;
+}
+
+export interface ValorizacionStock {
+  categorias: {
+    categoria_id: number;
+    categoria: string;
+    productos: number;
+    unidades: number;
+    valor_costo: number;
+    valor_venta: number;
+  }[];
+  total_unidades: number;
+  total_costo: number;
+  total_venta: number;
+}
+
+// Respuesta de GET /api/analytics/dashboard/
+export interface AnalyticsDashboard {
+  desde: string;
+  hasta: string;
+  resumen: DashboardStats;
+  ventas_por_dia: VentaAnalytics[];
+  top_productos: ProductoVendido[];
+  marcas_populares: MarcaPopular[];
+  clientes_frecuentes: ClienteFrecuente[];
+  margen_por_categoria: MargenCategoria[];
+  valorizacion_stock: ValorizacionStock;
 }
@@ -73,6 +73,11 @@ export class ApiService {
     return this.http.get<any>(`${this.facturasUrl}${id}/datos_completos/`);
   }
 
+  // Datos completos de varias facturas (reimpresion en lote)
+  getDatosCompletosFacturas(ids: number[]): Observable<any[]> {
+    return this.http.get<any[]>(`${this.facturasUrl}datos_completos/`, { params: { ids: ids.join(',') } });
+  }
+
   // Actualizar factura
   actualizarFactura(id: number, factura: any): Observable<any> {
     return this.http.put<any>(`${this.facturasUrl}${id}/`, factura);
@@ -92,6 +97,11 @@ export class ApiService {
     return this.http.get<any[]>('/api/productos/dropdown/');
   }
   
+  // Búsqueda de productos en el servidor (full-text, mejor coincidencia primero)
+  buscarProductos(q: string, limite: number = 20): Observable<any[]> {
+    return this.http.get<any[]>('/api/productos/buscar/', { params: { q, limite } });
+  }
+  
   // Obtener TODOS los proveedores para dropdowns
   getProveedoresDropdown(): Observable<any[]> {
     return this.http.get<any[]>('/api/proveedores/dropdown/');
@@ -56,9 +56,10 @@ export class ClienteService {
     );
   }
 
-  // Lista para dropdown (sin paginacion)
-  getClientesDropdown(): Observable<Cliente[]> {
-    return this.http.get<Cliente[]>(`${this.baseUrl}/dropdown/`);
+  // Autocompletado por documento, telefono o nombre (max. 10 resultados)
+  autocompletar(texto: string): Observable<Cliente[]> {
+    const params = new HttpParams().set('q', texto);
+    return this.http.get<Cliente[]>(`${this.baseUrl}/autocompletar/`, { params });
   }
 
   // Crear cliente desde factura
@@ -9,7 +9,7 @@ import { Factura, FacturaDetalle } from './factura.model';
 import { Router } from '@angular/router';
 import { SweetAlertService } from './sweetalert.service';
 import { PdfGeneratorService } from './pdf-generator.service';
-import { debounceTime, distinctUntilChanged, switchMap } from 'rxjs/operators';
+import { debounceTime, distinctUntilChanged, switchMap, catchError } from 'rxjs/operators';
 import { Subject, of } from 'rxjs';
 
 // Interfaz para la nueva factura mejorada
@@ -114,12 +114,14 @@ export class FacturacionComponent implements OnInit, OnDestroy {
         if (term.trim() === '') {
           return of(this.productos);
         }
-        const filtered = this.productos.filter(p => 
-          (p.nombre || '').toLowerCase().includes(term.toLowerCase()) ||
-          (p.marca || '').toLowerCase().includes(term.toLowerCase()) ||
-          (p.codigo || '').toLowerCase().includes(term.toLowerCase())
+        // Búsqueda en el servidor; si falla, filtrar la lista local
+        return this.api.buscarProductos(term.trim()).pipe(
+          catchError(() => of(this.productos.filter(p => 
+            (p.nombre || '').toLowerCase().includes(term.toLowerCase()) ||
+            (p.marca || '').toLowerCase().includes(term.toLowerCase()) ||
+            (p.codigo || '').toLowerCase().includes(term.toLowerCase())
+          )))
         );
-        return of(filtered);
       })
     ).subscribe(productos => {
       this.productosFiltrados = productos;
@@ -445,7 +447,7 @@ export class FacturacionComponent implements OnInit, OnDestroy {
       );
       
       if (result.isConfirmed) {
-        this.generarPDF(response.id);
+        this.generarPDF(response.id, response.numero_factura);
       }
       
       this.limpiarFormulario();
@@ -490,13 +492,10 @@ export class FacturacionComponent implements OnInit, OnDestroy {
   }
 
   // Generar PDF de la factura
-  async generarPDF(facturaId: number): Promise<void> {
+  async generarPDF(facturaId: number, numeroFactura?: string): Promise<void> {
     try {
-      // Obtener datos completos de la factura
-      const datosCompletos = await this.api.getDatosCompletosFactura(facturaId).toPromise();
-      
-      // Generar PDF usando el servicio
-      this.pdfService.generarFacturaPDF(datosCompletos);
+      // El backend genera el PDF (y lo reutiliza si ya existe)
+      await this.pdfService.descargarFacturaPDF(facturaId, numeroFactura);
       
     } catch (error) {
       console.error('Error al generar PDF:', error);
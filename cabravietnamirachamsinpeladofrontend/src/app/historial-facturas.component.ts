@@ -70,8 +70,16 @@ export class HistorialFacturasComponent implements OnInit {
     });
   }
 
+  // El listado no trae las lineas: se piden al abrir la factura
   verDetalles(factura: any): void {
-    this.facturaSeleccionada = factura;
+    this.api.getFactura(factura.id).subscribe({
+      next: (detalle: any) => {
+        this.facturaSeleccionada = detalle;
+      },
+      error: () => {
+        Swal.fire('Error', 'No se pudo cargar la factura', 'error');
+      }
+    });
   }
 
   cerrarDetalles(): void {
@@ -118,12 +126,19 @@ export class HistorialFacturasComponent implements OnInit {
   }
 
   abrirModalEditar(factura: any): void {
-    this.modoEdicion = true;
-    this.facturaActual = JSON.parse(JSON.stringify(factura));
-    if (!this.facturaActual.detalles || this.facturaActual.detalles.length === 0) {
-      this.facturaActual.detalles = [];
-    }
-    this.mostrarModal = true;
+    this.api.getFactura(factura.id).subscribe({
+      next: (detalle: any) => {
+        this.modoEdicion = true;
+        this.facturaActual = detalle;
+        if (!this.facturaActual.detalles || this.facturaActual.detalles.length === 0) {
+          this.facturaActual.detalles = [];
+        }
+        this.mostrarModal = true;
+      },
+      error: () => {
+        Swal.fire('Error', 'No se pudo cargar la factura', 'error');
+      }
+    });
   }
 
   cerrarModal(): void {
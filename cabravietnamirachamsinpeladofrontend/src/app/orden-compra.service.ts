@@ -25,6 +25,7 @@ export interface OrdenCompra {
   total_estimado?: string;
   observaciones?: string;
   usuario?: number;
+  cantidad_items?: number;  // solo en el listado (sin detalles)
   detalles: DetalleOrdenCompra[];
 }
 